@@ -2,9 +2,6 @@ from flask import Flask
 from config import Config
 from extensions import login_manager, csrf
 
-# Import db from models to avoid circular imports
-from models import db
-
 # Initialize other extensions (shared instances imported from extensions.py)
 # login_manager and csrf are imported above to avoid circular imports
 
@@ -12,10 +9,19 @@ def create_app():
     """
     Factory function untuk membuat aplikasi Flask
     Sistem Catatan Klien Personal Trainer
+    Modul ini tidak membuat aplikasi saat diimport: Gunicorn memakai wsgi:app,
+    CLI memakai `flask --app app` (factory ini ditemukan otomatis)
     """
+    # Model (dan SQLAlchemy) baru dimuat saat aplikasi dibuat
+    from models import db
+    
     app = Flask(__name__)
     app.config.from_object(Config)
     
+    # Pool koneksi terinstrumentasi (harus sebelum db.init_app)
+    from services.db_pool import configure_pool, init_pool_events
+    configure_pool(app)
+    
     # Initialize extensions with app
     db.init_app(app)
     csrf.init_app(app)
@@ -55,20 +61,41 @@ def create_app():
     app.register_blueprint(client_portal_bp, url_prefix='/client')
     app.register_blueprint(exercises_bp, url_prefix='/exercises')
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    # Helper template untuk URL foto (thumbnail/medium/original)
+    from services.photo_derivatives import photo_url
+    app.add_template_global(photo_url)
+    
+    # Batas waktu statement dan invalidasi pool saat koneksi putus
+    init_pool_events(app)
+    
+    # Penghitung query SQL per request dan budget per endpoint
+    from services.instrumentation import init_query_budget
+    init_query_budget(app)
+    
+    # Metrik Prometheus per endpoint (/metrics), aktif jika METRICS_ENABLED
+    from services.metrics import init_metrics
+    init_metrics(app)
+    
+    # Versi data per klien untuk conditional GET halaman detail
+    from services.page_versions import init_page_versions
+    init_page_versions(app)
+    
+    # Versi bucket (klien, bulan) untuk cache feed kalender sesi
+    from services.calendar_feed import init_calendar_feed
+    init_calendar_feed(app)
+    
+    # Register perintah CLI (db-upgrade, db-check-plans, dst)
+    from commands import register_commands
+    register_commands(app)
+    
+    # Skema dibuat lewat `flask db-upgrade`; startup tidak menyentuh database
+    # kecuali AUTO_MIGRATE diaktifkan (direktori upload dibuat saat upload pertama)
+    if app.config.get('AUTO_MIGRATE'):
+        from migrations import upgrade
+        with app.app_context():
+            upgrade(db.engine)
     
-    # Pastikan direktori uploads ada
-    import os
-    upload_folder = os.path.join(app.static_folder, 'uploads')
-    if not os.path.exists(upload_folder):
-        os.makedirs(upload_folder)
-        
     return app
 
-# Export app for WSGI servers (Gunicorn)
-app = create_app()
-
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=8083)
\ No newline at end of file
+    create_app().run(debug=True, host='0.0.0.0', port=8083)
\ No newline at end of file
@@ -0,0 +1 @@
+# Benchmark dan pengukuran performa Sistem Catatan Klien Personal Trainer
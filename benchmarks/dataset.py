@@ -0,0 +1,336 @@
+"""
+Generator dataset sintetis dengan volume realistis
+Mengisi database yang dikonfigurasi (SQLite atau MySQL, lihat MYSQL_DB) memakai
+skema models.py: klien, latihan, assessment, program latihan, sesi dan detail
+sesi. Data ditulis dengan insert massal per batch, lalu data turunan (counter,
+index nama, rollup volume) dibangun ulang lewat fungsi yang sama dengan CLI.
+
+Contoh:
+    MYSQL_DB=sqlite:////tmp/bench.db python -m benchmarks.dataset --scale small
+    python -m benchmarks.dataset --clients 20000 --plans 500 --sessions 200000
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert, func, select
+
+SCALES = {
+    # klien, program, sesi lepas (di luar program), detail per sesi (maks)
+    'small': {'clients': 500, 'plans': 40, 'sessions': 5000, 'details_per_session': 6},
+    'medium': {'clients': 5000, 'plans': 200, 'sessions': 50000, 'details_per_session': 6},
+    'large': {'clients': 20000, 'plans': 500, 'sessions': 250000, 'details_per_session': 8},
+}
+
+BATCH_SIZE = 5000
+
+BENCH_USERNAME = 'bench'
+BENCH_PASSWORD = 'bench12345'
+
+FIRST_NAMES = [
+    'Budi', 'Siti', 'Agus', 'Dewi', 'Andi', 'Rina', 'Joko', 'Sri', 'Eko', 'Wati', 'Rudi', 'Lestari',
+    'Bambang', 'Ayu', 'Hendra', 'Indah', 'Fajar', 'Putri', 'Dedi', 'Nur', 'Yusuf', 'Maya', 'Rizky',
+    'Intan', 'Arif', 'Fitri', 'Gilang', 'Kartika', 'Hadi', 'Mega', 'Iwan', 'Citra', 'Bayu', 'Ratna',
+]
+LAST_NAMES = [
+    'Santoso', 'Wijaya', 'Saputra', 'Pratama', 'Hidayat', 'Kusuma', 'Lestari', 'Setiawan', 'Nugroho',
+    'Purnomo', 'Siregar', 'Nasution', 'Halim', 'Gunawan', 'Susanto', 'Rahman', 'Aminah', 'Permata',
+    'Wibowo', 'Suryadi', 'Harahap', 'Sitompul', 'Tanjung', 'Utami', 'Yulianti', 'Firmansyah',
+]
+
+# (nama, kategori, jenis beban)
+EXERCISES = [
+    ('Back Squat', 'Legs', 'barbell'), ('Front Squat', 'Legs', 'barbell'), ('Leg Press', 'Legs', 'machine'),
+    ('Romanian Deadlift', 'Legs', 'barbell'), ('Walking Lunge', 'Legs', 'dumbbell'), ('Leg Curl', 'Legs', 'machine'),
+    ('Leg Extension', 'Legs', 'machine'), ('Calf Raise', 'Legs', 'machine'), ('Glute Bridge', 'Legs', 'band'),
+    ('Bench Press', 'Chest', 'barbell'), ('Incline Dumbbell Press', 'Chest', 'dumbbell'), ('Chest Fly', 'Chest', 'machine'),
+    ('Push Up', 'Chest', 'bodyweight'), ('Dips', 'Chest', 'bodyweight'), ('Cable Crossover', 'Chest', 'machine'),
+    ('Deadlift', 'Back', 'barbell'), ('Barbell Row', 'Back', 'barbell'), ('Lat Pulldown', 'Back', 'machine'),
+    ('Seated Cable Row', 'Back', 'machine'), ('Pull Up', 'Back', 'bodyweight'), ('Band Row', 'Back', 'band'),
+    ('Overhead Press', 'Shoulders', 'barbell'), ('Lateral Raise', 'Shoulders', 'dumbbell'),
+    ('Face Pull', 'Shoulders', 'band'), ('Rear Delt Fly', 'Shoulders', 'dumbbell'),
+    ('Biceps Curl', 'Arms', 'dumbbell'), ('Hammer Curl', 'Arms', 'dumbbell'), ('Triceps Pushdown', 'Arms', 'machine'),
+    ('Skull Crusher', 'Arms', 'barbell'), ('Plank', 'Core', 'bodyweight'), ('Hanging Leg Raise', 'Core', 'bodyweight'),
+    ('Russian Twist', 'Core', 'dumbbell'), ('Pallof Press', 'Core', 'band'), ('Kettlebell Swing', 'Full Body', 'dumbbell'),
+    ('Burpee', 'Full Body', 'bodyweight'), ('Rowing Machine', 'Cardio', 'bodyweight'),
+]
+
+BAND_COLORS = ['KUNING', 'MERAH', 'HIJAU', 'BIRU', 'UNGU', 'HITAM']
+BAND_LOADS = [5, 10, 15, 20, 25, 35]  # kg, dipetakan lewat Exercise.weight_options "WARNA=beban"
+DAY_NAMES = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu']
+REPS_OPTIONS = ['5', '6-8', '8', '8-10', '10', '12', '15', 'AMRAP']
+
+
+def weight_options(kind):
+    if kind == 'band':
+        return ','.join(f'{color}={load}' for color, load in zip(BAND_COLORS, BAND_LOADS))
+    if kind == 'barbell':
+        return ','.join(str(value) for value in range(20, 145, 5))
+    if kind in ('dumbbell', 'machine'):
+        return ','.join(str(value) for value in (2.5, 5, 7.5, 10, 12.5, 15, 17.5, 20, 22.5, 25, 30, 35, 40))
+    return ''
+
+
+def random_weight(rng, kind):
+    if kind == 'band':
+        return rng.choice(BAND_COLORS)
+    if kind == 'barbell':
+        return str(rng.randrange(20, 145, 5))
+    if kind in ('dumbbell', 'machine'):
+        value = rng.choice((5, 7.5, 10, 12.5, 15, 20, 25, 30))
+        return rng.choice((f'{value}', f'{value} kg'))
+    return None
+
+
+class IdSequence:
+    """
+    Id eksplisit untuk baris yang di-insert massal (lanjut dari id terbesar)
+    """
+    def __init__(self, db, model):
+        self.next_id = (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+    def take(self):
+        value = self.next_id
+        self.next_id += 1
+        return value
+
+
+class BatchWriter:
+    """
+    Kumpulkan baris per model dan tulis dengan insert massal setiap BATCH_SIZE baris
+    """
+    def __init__(self, db):
+        self.db = db
+        self.pending = {}
+        self.written = {}
+
+    def add(self, model, row):
+        rows = self.pending.setdefault(model, [])
+        rows.append(row)
+        if len(rows) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        # Model ditulis sesuai urutan pertama kali ditambahkan (induk sebelum anak),
+        # sehingga foreign key selalu menunjuk baris yang sudah ada
+        for model, rows in self.pending.items():
+            if rows:
+                self.db.session.execute(insert(model), rows)
+                self.written[model.__tablename__] = self.written.get(model.__tablename__, 0) + len(rows)
+                self.pending[model] = []
+        self.db.session.commit()
+
+
+def generate(db, clients, plans, sessions, details_per_session, seed=42, today=None, log=print):
+    """
+    Isi database dengan data sintetis; mengembalikan jumlah baris per tabel
+    """
+    from models import Client, Exercise, Assessment, WorkoutPlan, WorkoutPlanDetail, Session, SessionDetail
+    from services.weights import band_loads, normalize_weight
+
+    rng = random.Random(seed)
+    loads = {'band': band_loads(weight_options('band'))}
+    today = today or date.today()
+    writer = BatchWriter(db)
+
+    # Latihan (katalog kecil, ditulis lewat ORM agar unique name tetap dicek)
+    existing = {name for name, in db.session.execute(select(Exercise.name))}
+    for name, category, kind in EXERCISES:
+        if name not in existing:
+            db.session.add(Exercise(
+                name=name, category=category,
+                weight_options=weight_options(kind), reps_options=','.join(REPS_OPTIONS)
+            ))
+    db.session.commit()
+    kinds = {name: kind for name, _, kind in EXERCISES}
+    exercises = [
+        (exercise_id, name, kinds.get(name, 'bodyweight'))
+        for exercise_id, name in db.session.execute(select(Exercise.id, Exercise.name))
+    ]
+
+    # Klien dan assessment awal
+    client_ids = IdSequence(db, Client)
+    new_clients = []
+    for _ in range(clients):
+        client_id = client_ids.take()
+        created_at = datetime.utcnow() - timedelta(days=rng.randint(0, 730), seconds=rng.randint(0, 86399))
+        new_clients.append((client_id, created_at))
+        writer.add(Client, {
+            'id': client_id,
+            'name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            'gender': rng.choice(('Male', 'Female')),
+            'phone': f'08{rng.randint(10 ** 9, 10 ** 10 - 1)}',
+            'height': rng.randint(150, 195),
+            'start_weight': rng.randint(45, 110),
+            'created_at': created_at,
+            'updated_at': created_at,
+        })
+    writer.flush()
+
+    for client_id, created_at in new_clients:
+        writer.add(Assessment, {
+            'client_id': client_id,
+            'weight': rng.randint(45, 110),
+            'height': rng.randint(150, 195),
+            'body_fat': rng.randint(10, 35),
+            'date': created_at.date(),
+            'created_at': created_at,
+        })
+    writer.flush()
+    log(f'{clients} klien dan assessment ditulis')
+
+    session_ids = IdSequence(db, Session)
+
+    def add_session(client_id, day, workout_plan_id, plan_exercises):
+        session_id = session_ids.take()
+        past = day < today
+        writer.add(Session, {
+            'id': session_id,
+            'client_id': client_id,
+            'date': day,
+            'workout_plan_id': workout_plan_id,
+            'completed': past and rng.random() < 0.9,
+            'created_at': datetime.combine(day, datetime.min.time()) - timedelta(days=rng.randint(0, 14)),
+        })
+        for exercise_id, name, kind, sets, reps in plan_exercises:
+            weight = random_weight(rng, kind)
+            row = {
+                'session_id': session_id,
+                'exercise_id': exercise_id,
+                'exercise_name': name,
+                'sets': sets,
+                'reps': reps,
+                'weight': weight,
+                **normalize_weight(weight, loads.get(kind))._asdict(),
+            }
+            if past:
+                for set_number in range(1, min(sets, 4) + 1):
+                    row[f'actual_reps_{set_number}'] = rng.randint(5, 15)
+            writer.add(SessionDetail, row)
+
+    def pick_exercises(count):
+        return [
+            (exercise_id, name, kind, rng.randint(2, 4), rng.choice(REPS_OPTIONS))
+            for exercise_id, name, kind in rng.sample(exercises, count)
+        ]
+
+    # Program latihan beserta sesi terjadwalnya
+    plan_ids = IdSequence(db, WorkoutPlan)
+    all_client_ids = [client_id for client_id, _ in new_clients] or \
+        list(db.session.execute(select(Client.id)).scalars())
+    for _ in range(plans):
+        plan_id = plan_ids.take()
+        client_id = rng.choice(all_client_ids)
+        weeks = rng.randint(4, 16)
+        days = sorted(rng.sample(range(len(DAY_NAMES)), rng.randint(2, 4)))
+        start = today - timedelta(days=rng.randint(0, weeks * 7))
+        writer.add(WorkoutPlan, {
+            'id': plan_id,
+            'client_id': client_id,
+            'plan_name': f'Program {weeks} Minggu #{plan_id}',
+            'duration': weeks,
+            'days_per_week': len(days),
+            'start_date': start,
+        })
+        plan_exercises = pick_exercises(rng.randint(4, details_per_session))
+        for day_index in days:
+            for exercise_id, name, kind, sets, reps in plan_exercises:
+                writer.add(WorkoutPlanDetail, {
+                    'plan_id': plan_id, 'day_name': DAY_NAMES[day_index], 'exercise_id': exercise_id,
+                    'exercise': name, 'sets': sets, 'reps': reps,
+                })
+        for week in range(weeks):
+            for day_index in days:
+                day = start + timedelta(days=week * 7 + day_index)
+                add_session(client_id, day, plan_id, plan_exercises)
+    writer.flush()
+    log(f'{plans} program ditulis')
+
+    # Sesi lepas (tanpa program) tersebar dua tahun terakhir
+    for index in range(sessions):
+        client_id = rng.choice(all_client_ids)
+        day = today - timedelta(days=rng.randint(-14, 730))
+        add_session(client_id, day, None, pick_exercises(rng.randint(3, details_per_session)))
+        if index and index % 50000 == 0:
+            log(f'{index} sesi lepas ditulis')
+    writer.flush()
+
+    return writer.written
+
+
+def rebuild_derived(db, rollups=True, log=print):
+    """
+    Bangun ulang data turunan yang biasanya dipelihara oleh route
+    """
+    from services.counters import repair_counters
+    from services.client_search import rebuild_name_index
+    from services.analytics import rebuild_daily_rollups
+    from services.personal_records import rebuild_personal_records
+    from services.catalog import bump_catalog_version
+
+    repair_counters()
+    rebuild_name_index()
+    bump_catalog_version()
+    db.session.commit()
+    log('Counter, index nama dan versi katalog dibangun ulang')
+    if rollups:
+        count = rebuild_daily_rollups()
+        log(f'Rollup volume dibangun ulang untuk {count} pasangan (klien, tanggal)')
+        count = rebuild_personal_records()
+        log(f'{count} personal record dibangun ulang')
+
+
+def ensure_bench_user(db):
+    """
+    Pastikan user admin untuk benchmark ada
+    """
+    from models import User
+
+    user = User.query.filter_by(username=BENCH_USERNAME).first()
+    if not user:
+        user = User(username=BENCH_USERNAME, email='bench@gym.local', full_name='Benchmark', role='admin')
+        user.set_password(BENCH_PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+    return user
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Isi database dengan data sintetis.')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--clients', type=int)
+    parser.add_argument('--plans', type=int)
+    parser.add_argument('--sessions', type=int, help='Jumlah sesi lepas di luar program.')
+    parser.add_argument('--details-per-session', type=int)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-rollups', action='store_true', help='Jangan bangun ulang rollup volume harian.')
+    args = parser.parse_args()
+
+    options = dict(SCALES[args.scale])
+    for name in options:
+        value = getattr(args, name)
+        if value is not None:
+            options[name] = value
+
+    from app import create_app
+    app = create_app()
+    from models import db
+    from migrations import upgrade
+
+    started = time.perf_counter()
+    with app.app_context():
+        upgrade(db.engine)
+        ensure_bench_user(db)
+        written = generate(db, seed=args.seed, **options)
+        rebuild_derived(db, rollups=not args.skip_rollups)
+
+    for table, count in sorted(written.items()):
+        print(f'{table}: {count} baris')
+    print(f'Selesai dalam {time.perf_counter() - started:.1f} detik')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,404 @@
+"""
+Uji beban end-to-end: banyak trainer memakai aplikasi bersamaan
+Setiap user virtual berjalan di thread sendiri dengan cookie session sendiri dan
+menjalankan skenario: login, buka sesi hari ini, isi actual reps berulang kali
+(update_actual_reps), dan sesekali membuat program latihan baru. Hasilnya per
+route: p50/p95/p99 latensi, throughput, persentase error dan waktu tunggu lock
+database.
+
+Mode:
+    (bawaan)  request langsung ke app lewat Flask test client (in-process)
+    --serve   app dijalankan di server WSGI threaded lokal, user memakai HTTP
+    --url     server yang sudah berjalan (mis. Gunicorn); statistik database
+              per route tidak tersedia karena query terjadi di proses lain
+
+Waktu lock dihitung di proses app: lama statement INSERT/UPDATE/DELETE (tempat
+SQLite menunggu lock database dan InnoDB menunggu row lock), ditambah jumlah
+error lock (database is locked, lock wait timeout, deadlock). Untuk MySQL juga
+dilaporkan selisih Innodb_row_lock_waits/Innodb_row_lock_time selama uji.
+
+Catatan: skenario membuat program latihan baru di database yang dipakai.
+
+Contoh:
+    MYSQL_DB=sqlite:////tmp/bench.db python -m benchmarks.dataset --scale small
+    MYSQL_DB=sqlite:////tmp/bench.db python -m benchmarks.load --users 50 --duration 30
+"""
+
+import argparse
+import http.cookiejar
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from datetime import date
+from json import dumps
+from sqlalchemy import select, func, text
+
+from benchmarks.routes import percentile
+
+CSRF_PATTERN = re.compile(r'<input[^>]*name="csrf_token"[^>]*value="([^"]*)"')
+
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+LOCK_ERROR_MARKERS = ('database is locked', 'lock wait timeout', 'deadlock')
+
+
+class TestClientTransport:
+    """
+    Request langsung ke app lewat Flask test client (satu client per user)
+    """
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None, json=None):
+        response = self.client.open(path, method=method, data=data, json=json)
+        return response.status_code, response.get_data(as_text=True)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class HttpTransport:
+    """
+    Request HTTP sungguhan dengan cookie jar sendiri; redirect tidak diikuti
+    """
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect()
+        )
+
+    def request(self, method, path, data=None, json=None):
+        headers = {}
+        body = None
+        if json is not None:
+            body = dumps(json).encode()
+            headers['Content-Type'] = 'application/json'
+        elif data is not None:
+            body = urllib.parse.urlencode(data, doseq=True).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                return response.status, response.read().decode('utf-8', 'replace')
+        except urllib.error.HTTPError as error:
+            return error.code, error.read().decode('utf-8', 'replace')
+
+
+class RouteStats:
+    """
+    Latensi dan status per route dari sisi user virtual
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)   # route -> [detik]
+        self.errors = defaultdict(int)       # route -> jumlah status >= 400 / exception
+
+    def record(self, route, seconds, ok):
+        with self._lock:
+            self.latencies[route].append(seconds)
+            if not ok:
+                self.errors[route] += 1
+
+
+class DatabaseWaits:
+    """
+    Waktu statement tulis dan error lock per route, dicatat di proses app
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.write_seconds = defaultdict(float)
+        self.lock_errors = defaultdict(int)
+
+    def install(self, app):
+        from flask import g, has_request_context, request, request_finished
+        from sqlalchemy import event
+        from models import db
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(WRITE_PREFIXES):
+                conn.info['load_write_start'] = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            start = conn.info.pop('load_write_start', None)
+            if start is not None and has_request_context():
+                g.load_write_seconds = g.get('load_write_seconds', 0.0) + time.perf_counter() - start
+
+        def handle_error(context):
+            message = str(context.original_exception).lower()
+            if has_request_context() and any(marker in message for marker in LOCK_ERROR_MARKERS):
+                g.load_lock_errors = g.get('load_lock_errors', 0) + 1
+
+        def finished(sender, response, **extra):
+            route = f'{request.method} {request.endpoint}'
+            with self._lock:
+                self.write_seconds[route] += g.get('load_write_seconds', 0.0)
+                self.lock_errors[route] += g.get('load_lock_errors', 0)
+
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            event.listen(db.engine, 'after_cursor_execute', after_cursor_execute)
+            event.listen(db.engine, 'handle_error', handle_error)
+        # Fungsi lokal: blinker harus memegang referensi kuat
+        request_finished.connect(finished, app, weak=False)
+
+
+def innodb_row_locks(db):
+    """
+    Ambil Innodb_row_lock_waits dan Innodb_row_lock_time (ms); None jika bukan MySQL
+    """
+    if db.engine.dialect.name != 'mysql':
+        return None
+    rows = db.session.execute(text("SHOW GLOBAL STATUS LIKE 'Innodb_row_lock_%'")).all()
+    db.session.rollback()
+    return {name: int(value) for name, value in rows}
+
+
+def load_fixture(db, limit=500):
+    """
+    Detail sesi hari ini (atau sesi terbaru jika tidak ada) dan klien untuk skenario
+    """
+    from models import Client, Session, SessionDetail
+
+    today = date.today()
+    detail_ids = db.session.execute(
+        select(SessionDetail.id).join(Session).where(Session.date == today)
+        .order_by(SessionDetail.id).limit(limit)
+    ).scalars().all()
+    if not detail_ids:
+        latest = db.session.execute(select(func.max(Session.date))).scalar()
+        detail_ids = db.session.execute(
+            select(SessionDetail.id).join(Session).where(Session.date == latest)
+            .order_by(SessionDetail.id).limit(limit)
+        ).scalars().all()
+    client_ids = db.session.execute(select(Client.id).order_by(Client.id).limit(limit)).scalars().all()
+    if not detail_ids or not client_ids:
+        raise RuntimeError('Database kosong; jalankan benchmarks.dataset terlebih dahulu')
+    return {'detail_ids': detail_ids, 'client_ids': client_ids}
+
+
+class VirtualUser:
+    """
+    Satu trainer virtual yang menjalankan skenario berulang sampai waktu habis
+    """
+    def __init__(self, index, transport, fixture, stats, options):
+        self.index = index
+        self.transport = transport
+        self.fixture = fixture
+        self.stats = stats
+        self.options = options
+        self.rng = random.Random(options.seed + index)
+
+    def call(self, route, method, path, data=None, json=None, expect=(200, 302)):
+        start = time.perf_counter()
+        try:
+            status, body = self.transport.request(method, path, data=data, json=json)
+        except Exception:
+            self.stats.record(route, time.perf_counter() - start, ok=False)
+            return None, ''
+        self.stats.record(route, time.perf_counter() - start, ok=status in expect)
+        return status, body
+
+    def csrf_token(self, body):
+        match = CSRF_PATTERN.search(body)
+        return match.group(1) if match else ''
+
+    def login(self):
+        from benchmarks.dataset import BENCH_USERNAME, BENCH_PASSWORD
+
+        _, body = self.call('GET auth.login', 'GET', '/auth/login')
+        status, _ = self.call('POST auth.login', 'POST', '/auth/login', data={
+            'username': BENCH_USERNAME, 'password': BENCH_PASSWORD, 'csrf_token': self.csrf_token(body)
+        }, expect=(302,))
+        return status == 302
+
+    def log_sets(self):
+        for iteration in range(self.options.reps_per_visit):
+            self.call('POST sessions.update_actual_reps', 'POST', '/sessions/update_actual_reps', json={
+                'detail_id': self.rng.choice(self.fixture['detail_ids']),
+                'reps_num': str(self.rng.randint(1, 4)),
+                'value': self.rng.randint(5, 15),
+            })
+            self.think()
+
+    def create_plan(self):
+        client_id = self.rng.choice(self.fixture['client_ids'])
+        path = f'/workout-plans/client/{client_id}/add'
+        _, body = self.call('GET workout_plans.add', 'GET', path)
+        exercises = [exercise.id for exercise in self.options.catalog[:4]]
+        self.call('POST workout_plans.add', 'POST', path, data={
+            'csrf_token': self.csrf_token(body),
+            'plan_name': f'Load test {self.index}-{self.rng.randint(1, 10 ** 6)}',
+            'start_date': date.today().isoformat(),
+            'duration': '4',
+            'days_per_week': '3',
+            'selected_days[]': ['Senin', 'Rabu', 'Jumat'],
+            'exercise_id[]': [str(exercise_id) for exercise_id in exercises],
+            'sets[]': ['3'] * len(exercises),
+            'weight[]': ['20'] * len(exercises),
+            'reps[]': ['10'] * len(exercises),
+        }, expect=(302,))
+
+    def think(self):
+        if self.options.think_ms:
+            time.sleep(self.rng.uniform(0, self.options.think_ms) / 1000.0)
+
+    def run(self, deadline):
+        if not self.login():
+            return
+        visits = 0
+        while time.perf_counter() < deadline:
+            self.call('GET sessions.today', 'GET', '/sessions/today')
+            self.think()
+            self.log_sets()
+            visits += 1
+            if self.options.plan_every and visits % self.options.plan_every == 0:
+                self.create_plan()
+
+
+def serve(app):
+    """
+    Jalankan app di server WSGI threaded lokal (port acak); mengembalikan (server, url)
+    """
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def run(options):
+    """
+    Jalankan uji beban; mengembalikan (stats user, waits database, ringkasan global)
+    """
+    from app import create_app
+    app = create_app()
+    from models import db
+    from services.catalog import get_catalog
+    from services.db_pool import pool_stats
+    from benchmarks.dataset import ensure_bench_user
+
+    with app.app_context():
+        ensure_bench_user(db)
+        fixture = load_fixture(db)
+        options.catalog = get_catalog().exercises
+        row_locks_before = innodb_row_locks(db)
+        pool_before = pool_stats()
+
+    waits = None
+    server = None
+    if options.url:
+        base_url = options.url
+    else:
+        waits = DatabaseWaits()
+        waits.install(app)
+        if options.serve:
+            server, base_url = serve(app)
+
+    def transport():
+        return HttpTransport(base_url) if options.url or server else TestClientTransport(app)
+
+    stats = RouteStats()
+    users = [VirtualUser(index, transport(), fixture, stats, options) for index in range(options.users)]
+    start = time.perf_counter()
+    deadline = start + options.duration
+    threads = []
+    for user in users:
+        thread = threading.Thread(target=user.run, args=(deadline,), daemon=True)
+        thread.start()
+        threads.append(thread)
+        # Ramp-up bertahap agar login tidak menumpuk di detik pertama
+        if options.ramp_up:
+            time.sleep(options.ramp_up / options.users)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if server:
+        server.shutdown()
+
+    summary = {'elapsed': elapsed}
+    if not options.url:
+        with app.app_context():
+            pool_after = pool_stats()
+            row_locks_after = innodb_row_locks(db)
+        summary['pool_wait_seconds'] = pool_after['wait_seconds_total'] - pool_before['wait_seconds_total']
+        summary['pool_wait_max'] = pool_after['wait_seconds_max']
+        summary['pool_timeouts'] = pool_after['timeouts'] - pool_before['timeouts']
+        if row_locks_before is not None:
+            summary['innodb_row_lock_waits'] = (
+                row_locks_after['Innodb_row_lock_waits'] - row_locks_before['Innodb_row_lock_waits']
+            )
+            summary['innodb_row_lock_time_ms'] = (
+                row_locks_after['Innodb_row_lock_time'] - row_locks_before['Innodb_row_lock_time']
+            )
+    return stats, waits, summary
+
+
+def report(stats, waits, summary, max_error_rate):
+    """
+    Cetak tabel hasil; mengembalikan daftar route yang error-nya melebihi batas
+    """
+    elapsed = summary['elapsed']
+    failures = []
+    print(f"{'route':34} {'n':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'error %':>8} {'tulis ms':>9} {'lock err':>8}")
+    for route in sorted(stats.latencies):
+        latencies = [seconds * 1000 for seconds in stats.latencies[route]]
+        count = len(latencies)
+        error_rate = stats.errors[route] / count * 100
+        if error_rate > max_error_rate:
+            failures.append(route)
+        if waits is not None:
+            write_ms = f'{waits.write_seconds[route] * 1000 / count:9.2f}'
+            lock_errors = f'{waits.lock_errors[route]:8d}'
+        else:
+            write_ms, lock_errors = f"{'-':>9}", f"{'-':>8}"
+        print(f'{route:34} {count:7d} {count / elapsed:8.1f} {statistics.median(latencies):8.1f} '
+              f'{percentile(latencies, 0.95):8.1f} {percentile(latencies, 0.99):8.1f} '
+              f'{error_rate:8.2f} {write_ms} {lock_errors}')
+
+    total = sum(len(latencies) for latencies in stats.latencies.values())
+    print(f'Total {total} request dalam {elapsed:.1f} detik ({total / elapsed:.1f} req/s)')
+    if 'pool_wait_seconds' in summary:
+        print(f"Tunggu connection pool: total {summary['pool_wait_seconds']:.3f} s, "
+              f"maks {summary['pool_wait_max'] * 1000:.1f} ms, timeout {summary['pool_timeouts']}")
+    if 'innodb_row_lock_waits' in summary:
+        print(f"InnoDB row lock: {summary['innodb_row_lock_waits']} tunggu, "
+              f"{summary['innodb_row_lock_time_ms']} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Uji beban dengan banyak trainer virtual bersamaan.')
+    parser.add_argument('--users', type=int, default=50, help='Jumlah user virtual (thread).')
+    parser.add_argument('--duration', type=float, default=30, help='Lama uji dalam detik.')
+    parser.add_argument('--ramp-up', type=float, default=2, help='Detik untuk memulai semua user.')
+    parser.add_argument('--think-ms', type=float, default=0, help='Jeda acak maksimum antar aksi (ms).')
+    parser.add_argument('--reps-per-visit', type=int, default=5, help='update_actual_reps per kunjungan sesi hari ini.')
+    parser.add_argument('--plan-every', type=int, default=10, help='Buat program baru setiap N kunjungan (0 = tidak).')
+    parser.add_argument('--max-error-rate', type=float, default=1.0, help='Persentase error maksimum per route.')
+    parser.add_argument('--seed', type=int, default=42)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--serve', action='store_true', help='Jalankan app di server WSGI lokal dan pakai HTTP.')
+    mode.add_argument('--url', help='Uji server yang sudah berjalan, mis. http://127.0.0.1:8000')
+    options = parser.parse_args()
+
+    stats, waits, summary = run(options)
+    failures = report(stats, waits, summary, options.max_error_rate)
+    if failures:
+        print(f"ERROR DI ATAS BATAS: {', '.join(failures)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+Benchmark route utama dengan Flask test client dan batas jumlah query per route
+Jalankan setelah database diisi benchmarks.dataset. Setiap route diukur beberapa
+kali (median dan p95 dalam ms) dan jumlah query SQL per request dibandingkan
+dengan QUERY_CEILINGS; jika ada yang melebihi batas, skrip keluar dengan kode 1.
+
+Mode --check membuat database SQLite sementara berisi dataset small, mengaktifkan
+SQL_QUERY_BUDGET_STRICT (budget @query_budget yang terlampaui menjadi error 500)
+dan menjalankan satu iterasi per route. Cocok untuk CI atau sebelum commit.
+
+Contoh:
+    MYSQL_DB=sqlite:////tmp/bench.db python -m benchmarks.dataset --scale small
+    MYSQL_DB=sqlite:////tmp/bench.db python -m benchmarks.routes --iterations 20
+    python -m benchmarks.routes --check
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from sqlalchemy import select, func
+
+# Batas jumlah query per request (termasuk query user loader Flask-Login)
+QUERY_CEILINGS = {
+    'main.dashboard': 4,
+    'clients.index': 3,           # +1 saat cache jumlah total kedaluwarsa
+    'clients.index (search)': 3,
+    'clients.view': 7,
+    'sessions.index': 4,
+    'sessions.view': 5,
+    'sessions.calendar': 3,       # +1 saat bucket bulan basi dimuat ulang
+    'sessions.calendar_all': 3,
+    'workout_plans.add': 3,       # +1 saat versi katalog diperiksa ulang
+    'workout_plans.view': 5,
+    'sessions.update_actual_reps': 10,  # +1 saat rekor PR dikoreksi turun (riwayat dipindai)
+    'sessions.update_rest_time': 5,
+    'sessions.update_exercise_notes': 5,
+    'sessions.batch_update_details': 10,
+}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def load_fixture(db):
+    """
+    Pilih id contoh dari dataset: klien dengan program, sesi dan detailnya
+    """
+    from models import WorkoutPlan, Session, SessionDetail
+
+    plan_id, client_id = db.session.execute(
+        select(WorkoutPlan.id, WorkoutPlan.client_id).order_by(WorkoutPlan.id).limit(1)
+    ).one()
+    session_id = db.session.execute(
+        select(func.min(Session.id)).where(Session.workout_plan_id == plan_id)
+    ).scalar()
+    detail_id = db.session.execute(
+        select(func.min(SessionDetail.id)).where(SessionDetail.session_id == session_id)
+    ).scalar()
+    return {'client_id': client_id, 'plan_id': plan_id, 'session_id': session_id, 'detail_id': detail_id}
+
+
+def build_routes(fixture):
+    """
+    Daftar (nama, method, url, payload JSON) yang diukur
+    """
+    f = fixture
+    return [
+        ('main.dashboard', 'GET', '/dashboard', None),
+        ('clients.index', 'GET', '/clients/', None),
+        ('clients.index (search)', 'GET', '/clients/?search=budi', None),
+        ('clients.view', 'GET', f"/clients/{f['client_id']}", None),
+        ('sessions.index', 'GET', f"/sessions/client/{f['client_id']}", None),
+        ('sessions.view', 'GET', f"/sessions/{f['session_id']}", None),
+        ('sessions.calendar', 'GET', f"/sessions/client/{f['client_id']}/calendar", None),
+        ('sessions.calendar_all', 'GET', '/sessions/calendar', None),
+        ('workout_plans.add', 'GET', f"/workout-plans/client/{f['client_id']}/add", None),
+        ('workout_plans.view', 'GET', f"/workout-plans/{f['plan_id']}", None),
+        ('sessions.update_actual_reps', 'POST', '/sessions/update_actual_reps',
+         lambda i: {'detail_id': f['detail_id'], 'reps_num': '1', 'value': 8 + i % 4}),
+        ('sessions.update_rest_time', 'POST', '/sessions/update_rest_time',
+         lambda i: {'detail_id': f['detail_id'], 'rest_time': f'{60 + i % 3 * 30} detik'}),
+        ('sessions.update_exercise_notes', 'POST', '/sessions/update_exercise_notes',
+         lambda i: {'detail_id': f['detail_id'], 'notes': f'catatan {i}'}),
+        ('sessions.batch_update_details', 'POST', '/sessions/details/batch_update',
+         lambda i: {'updates': [
+             {'detail_id': f['detail_id'], 'actual_reps_2': 6 + i % 4, 'notes': f'batch {i}'},
+         ]}),
+    ]
+
+
+def run(app, iterations, only=None):
+    """
+    Ukur semua route; mengembalikan daftar hasil per route
+    """
+    from models import db
+    from services.instrumentation import count_queries
+    from benchmarks.dataset import ensure_bench_user, BENCH_USERNAME, BENCH_PASSWORD
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        ensure_bench_user(db)
+        fixture = load_fixture(db)
+
+    client = app.test_client()
+    response = client.post('/auth/login', data={'username': BENCH_USERNAME, 'password': BENCH_PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError(f'Login benchmark gagal (status {response.status_code})')
+
+    results = []
+    for name, method, url, payload in build_routes(fixture):
+        if only and name not in only:
+            continue
+        timings, query_counts, statuses = [], [], set()
+        # Iterasi pertama hanya pemanasan (cache katalog, count, dst)
+        for iteration in range(iterations + 1):
+            with count_queries() as counter:
+                start = time.perf_counter()
+                if method == 'GET':
+                    response = client.get(url)
+                else:
+                    response = client.post(url, json=payload(iteration))
+                elapsed = time.perf_counter() - start
+            statuses.add(response.status_code)
+            if iteration:
+                timings.append(elapsed * 1000)
+                query_counts.append(counter.count)
+        results.append({
+            'name': name,
+            'median_ms': statistics.median(timings),
+            'p95_ms': percentile(timings, 0.95),
+            'queries': max(query_counts),
+            'ceiling': QUERY_CEILINGS.get(name),
+            'statuses': sorted(statuses),
+        })
+    return results
+
+
+def report(results):
+    """
+    Cetak tabel hasil; mengembalikan 1 jika ada route yang melebihi batas atau gagal
+    """
+    failures = []
+    print(f"{'route':34} {'median ms':>10} {'p95 ms':>10} {'queries':>8} {'batas':>6}  status")
+    for result in results:
+        ceiling = result['ceiling']
+        over = ceiling is not None and result['queries'] > ceiling
+        bad_status = any(status >= 400 for status in result['statuses'])
+        if over or bad_status:
+            failures.append(result['name'])
+        print(f"{result['name']:34} {result['median_ms']:10.2f} {result['p95_ms']:10.2f} "
+              f"{result['queries']:8d} {ceiling if ceiling is not None else '-':>6}  "
+              f"{','.join(map(str, result['statuses']))}{'  <-- GAGAL' if over or bad_status else ''}")
+
+    if failures:
+        print(f"REGRESI: {', '.join(failures)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+
+def prepare_check_database(directory):
+    """
+    Arahkan aplikasi ke database SQLite baru di directory (harus sebelum app diimport)
+    """
+    os.environ['MYSQL_DB'] = f"sqlite:///{os.path.join(directory, 'check.db')}"
+    os.environ['SQL_QUERY_BUDGET_STRICT'] = 'True'
+
+
+def seed_check_database(app):
+    from models import db
+    from migrations import upgrade
+    from benchmarks.dataset import SCALES, generate, rebuild_derived
+
+    with app.app_context():
+        upgrade(db.engine)
+        generate(db, log=lambda *args: None, **SCALES['small'])
+        rebuild_derived(db, log=lambda *args: None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark route utama dan batas jumlah query.')
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--route', action='append', help='Hanya ukur route ini (bisa diulang).')
+    parser.add_argument('--check', action='store_true',
+                        help='Periksa batas query pada dataset small di database sementara.')
+    args = parser.parse_args()
+
+    if args.check:
+        with tempfile.TemporaryDirectory() as directory:
+            prepare_check_database(directory)
+            from app import create_app
+            app = create_app()
+            seed_check_database(app)
+            status = report(run(app, 1, only=args.route))
+            with app.app_context():
+                from models import db
+                db.engine.dispose()
+            return status
+
+    from app import create_app
+    return report(run(create_app(), args.iterations, only=args.route))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Ukur waktu cold start worker (import wsgi, termasuk create_app) di proses baru
+Secara default database diarahkan ke host MySQL yang tidak bisa dihubungi,
+sehingga startup yang membuka koneksi database akan gagal dan terdeteksi.
+
+Contoh:
+    python -m benchmarks.startup --runs 10 --max-seconds 1.5
+
+Keluar dengan kode 1 jika median melebihi --max-seconds atau startup gagal.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = (
+    'import time\n'
+    'start = time.perf_counter()\n'
+    'import wsgi\n'
+    'print(time.perf_counter() - start)\n'
+)
+
+# Port 1 tidak pernah menerima koneksi: startup harus tetap berhasil
+UNREACHABLE_DATABASE = {
+    'MYSQL_HOST': '127.0.0.1:1',
+    'MYSQL_DB': 'startup_probe',
+}
+
+
+def measure(runs, use_env):
+    """
+    Jalankan probe `runs` kali, masing-masing di interpreter baru
+    Mengembalikan daftar durasi (detik)
+    """
+    env = dict(os.environ)
+    if not use_env:
+        env.update(UNREACHABLE_DATABASE)
+    env['AUTO_MIGRATE'] = 'False'
+    env['PHOTO_SWEEP_INTERVAL'] = '0'
+
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE],
+            cwd=ROOT, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f'Startup gagal: {result.stderr.strip().splitlines()[-1]}')
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ukur waktu cold start aplikasi.')
+    parser.add_argument('--runs', type=int, default=5, help='Jumlah proses yang diukur.')
+    parser.add_argument('--max-seconds', type=float, default=1.5, help='Batas median waktu startup.')
+    parser.add_argument('--use-env', action='store_true',
+                        help='Pakai konfigurasi database dari environment, bukan host yang tidak bisa dihubungi.')
+    args = parser.parse_args()
+
+    try:
+        timings = measure(args.runs, args.use_env)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    median = statistics.median(timings)
+    print(f'runs={len(timings)} min={min(timings):.3f}s median={median:.3f}s max={max(timings):.3f}s')
+    if median > args.max_seconds:
+        print(f'REGRESI: median {median:.3f}s melebihi batas {args.max_seconds:.3f}s', file=sys.stderr)
+        return 1
+    print(f'OK: di bawah batas {args.max_seconds:.3f}s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
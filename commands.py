@@ -0,0 +1,221 @@
+"""
+Perintah CLI (flask <perintah>) untuk Sistem Catatan Klien Personal Trainer
+"""
+
+import click
+
+
+def register_commands(app):
+    """
+    Daftarkan semua perintah CLI ke aplikasi
+    """
+
+    @app.cli.command('db-upgrade')
+    def db_upgrade():
+        """Terapkan migrasi skema yang tertunda."""
+        from models import db
+        from migrations import upgrade
+
+        applied = upgrade(db.engine)
+        if not applied:
+            click.echo('Skema sudah versi terbaru.')
+        for migration in applied:
+            click.echo(f'Migrasi {migration.VERSION:04d} diterapkan: {migration.DESCRIPTION}')
+
+    @app.cli.command('db-check-plans')
+    @click.option('--client-id', default=1, help='ID klien contoh untuk query.')
+    @click.option('--workout-plan-id', default=1, help='ID workout plan contoh untuk query.')
+    @click.option('--session-id', default=1, help='ID sesi contoh untuk query.')
+    def db_check_plans(client_id, workout_plan_id, session_id):
+        """EXPLAIN semua hot query dan gagal jika ada full table scan."""
+        from services.query_plans import check_query_plans
+
+        results = check_query_plans(client_id=client_id, workout_plan_id=workout_plan_id, session_id=session_id)
+        for result in results:
+            status = 'FULL SCAN' if result['full_scan'] else 'OK'
+            click.echo(f"[{status}] {result['name']}")
+            for line in result['plan']:
+                click.echo(f'    {line}')
+
+        if any(result['full_scan'] for result in results):
+            raise SystemExit(1)
+
+    @app.cli.command('analytics-rebuild')
+    @click.option('--batch-size', default=500, help='Jumlah pasangan (klien, tanggal) per transaksi.')
+    def analytics_rebuild(batch_size):
+        """Bangun ulang rollup volume harian dari riwayat sesi."""
+        from services.analytics import rebuild_daily_rollups
+
+        count = rebuild_daily_rollups(batch_size=batch_size)
+        click.echo(f'Rollup dibangun ulang untuk {count} pasangan (klien, tanggal).')
+
+    @app.cli.command('records-rebuild')
+    @click.option('--batch-size', default=1000, help='Jumlah rekor per INSERT.')
+    def records_rebuild(batch_size):
+        """Bangun ulang personal record klien dari riwayat sesi (satu pass streaming)."""
+        from services.personal_records import rebuild_personal_records
+
+        count = rebuild_personal_records(batch_size=batch_size)
+        click.echo(f'{count} personal record dibangun ulang.')
+
+    @app.cli.command('weights-backfill')
+    @click.option('--batch-size', default=1000, help='Jumlah detail sesi per transaksi.')
+    @click.option('--exercise', 'exercise_id', type=int, default=None, help='Hanya detail latihan ini.')
+    @click.option('--all', 'all_rows', is_flag=True, help='Hitung ulang juga baris yang sudah dinormalisasi.')
+    @click.option('--no-rebuild', is_flag=True, help='Jangan bangun ulang rollup dan personal record.')
+    def weights_backfill(batch_size, exercise_id, all_rows, no_rebuild):
+        """Isi weight_kg/weight_unit/weight_band detail sesi dari kolom weight."""
+        from services.weights import backfill_weights
+        from services.analytics import rebuild_daily_rollups
+        from services.personal_records import rebuild_personal_records
+
+        count = backfill_weights(
+            batch_size=batch_size, exercise_id=exercise_id, all_rows=all_rows,
+            on_batch=lambda done: click.echo(f'  {done} detail diproses...')
+        )
+        click.echo(f'{count} detail sesi dinormalisasi.')
+        if count and not no_rebuild:
+            click.echo(f'Rollup dibangun ulang untuk {rebuild_daily_rollups()} pasangan (klien, tanggal).')
+            click.echo(f'{rebuild_personal_records()} personal record dibangun ulang.')
+
+    @app.cli.command('counters-repair')
+    @click.option('--dry-run', is_flag=True, help='Hanya laporkan drift, jangan perbaiki.')
+    def counters_repair(dry_run):
+        """Hitung ulang counter dashboard dari awal dan laporkan drift."""
+        from services.counters import repair_counters
+
+        drift = repair_counters(dry_run=dry_run)
+        if not drift:
+            click.echo('Semua counter sesuai.')
+        for name, (stored, actual) in sorted(drift.items()):
+            click.echo(f'{name}: tersimpan {stored}, sebenarnya {actual}')
+        if drift and dry_run:
+            raise SystemExit(1)
+
+    @app.cli.command('clients-reindex')
+    def clients_reindex():
+        """Bangun ulang index pencarian nama klien."""
+        from models import db
+        from services.client_search import rebuild_name_index
+
+        total = rebuild_name_index()
+        db.session.commit()
+        click.echo(f'Index nama dibangun ulang untuk {total} klien.')
+
+    @app.cli.command('photos-sweep')
+    @click.option('--grace', default=None, type=int, help='Lewati file yang lebih muda dari sekian detik.')
+    @click.option('--dry-run', is_flag=True, help='Hanya tampilkan file yatim, jangan hapus.')
+    def photos_sweep(grace, dry_run):
+        """Hapus file foto yang tidak lagi direferensikan klien."""
+        from flask import current_app
+        from services.photo_storage import sweep_orphans
+
+        if grace is None:
+            grace = current_app.config['PHOTO_ORPHAN_GRACE_SECONDS']
+        removed = sweep_orphans(grace_seconds=grace, dry_run=dry_run)
+        for name in removed:
+            click.echo(name)
+        click.echo(f'{len(removed)} foto yatim {"ditemukan" if dry_run else "dihapus"}.')
+
+    @app.cli.command('photos-derivatives')
+    def photos_derivatives():
+        """Buat thumbnail/medium yang belum ada untuk semua foto klien."""
+        from services.photo_storage import referenced_photos, photo_path
+        from services.photo_derivatives import SIZES, derivative_name, render_derivatives
+
+        created = 0
+        for name in sorted(referenced_photos()):
+            targets = {size: photo_path(derivative_name(name, size)) for size in SIZES}
+            try:
+                created += len(render_derivatives(photo_path(name), targets))
+            except (OSError, ValueError) as e:
+                click.echo(f'Gagal: {name} ({e})')
+        click.echo(f'{created} file turunan dibuat.')
+
+    @app.cli.command('import-data')
+    @click.argument('kind', type=click.Choice(['clients', 'exercises', 'assessments']))
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='Bawaan: dari ekstensi file.')
+    @click.option('--batch-size', default=1000, help='Jumlah baris per transaksi.')
+    @click.option('--errors', 'errors_path', type=click.Path(dir_okay=False), help='Tulis laporan error (CSV) ke file ini.')
+    @click.option('--job', help='Nama checkpoint; bawaan: jenis data + path file.')
+    @click.option('--restart', is_flag=True, help='Abaikan checkpoint dan mulai dari baris pertama.')
+    def import_data(kind, path, fmt, batch_size, errors_path, job, restart):
+        """Impor massal klien, latihan atau assessment dari CSV/JSON-lines."""
+        import csv
+        from services.bulk_import import run_import, reset_job, default_job_name
+
+        job = job or default_job_name(kind, path)
+        if restart:
+            reset_job(job)
+
+        report = open(errors_path, 'a', newline='', encoding='utf-8') if errors_path else None
+        writer = csv.writer(report) if report else None
+        if report and report.tell() == 0:
+            writer.writerow(['baris', 'error'])
+
+        def on_error(number, message):
+            if writer:
+                writer.writerow([number, message])
+            else:
+                click.echo(f'Baris {number}: {message}', err=True)
+
+        def on_batch(result):
+            if report:
+                report.flush()
+            click.echo(f'{result.resumed_from + result.processed} baris diproses, '
+                       f'{result.imported} diimpor, {result.errors} ditolak')
+
+        try:
+            result = run_import(kind, path, fmt=fmt, batch_size=batch_size, job=job,
+                                on_error=on_error, on_batch=on_batch)
+        finally:
+            if report:
+                report.close()
+
+        if result.resumed_from:
+            click.echo(f'Dilanjutkan dari baris ke-{result.resumed_from + 1}.')
+        click.echo(f'Selesai: {result.imported} {kind} diimpor, {result.errors} baris ditolak.')
+
+    @app.cli.command('export-history')
+    @click.option('--client-id', type=int, help='Hanya klien ini; bawaan: semua klien.')
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default='csv')
+    @click.option('--from', 'date_from', type=click.DateTime(['%Y-%m-%d']), help='Tanggal awal (inklusif).')
+    @click.option('--to', 'date_to', type=click.DateTime(['%Y-%m-%d']), help='Tanggal akhir (inklusif).')
+    @click.option('--sections', default='sessions,assessments', help='Bagian yang diekspor, pisahkan dengan koma.')
+    @click.option('--output', type=click.File('w', encoding='utf-8'), default='-', help='File tujuan; bawaan: stdout.')
+    def export_history_command(client_id, fmt, date_from, date_to, sections, output):
+        """Ekspor riwayat sesi, detail sesi dan assessment secara streaming."""
+        from services.history_export import export_history, SECTIONS
+
+        sections = [section for section in sections.split(',') if section]
+        if any(section not in SECTIONS for section in sections):
+            raise click.BadParameter(f'pilihan: {", ".join(SECTIONS)}', param_hint='--sections')
+        for chunk in export_history(
+            fmt, client_id=client_id,
+            date_from=date_from.date() if date_from else None,
+            date_to=date_to.date() if date_to else None,
+            sections=sections
+        ):
+            output.write(chunk)
+
+    @app.cli.command('plans-clone')
+    @click.argument('plan_id', type=int)
+    @click.option('--to', 'target_client_ids', required=True, help='ID klien tujuan, pisahkan dengan koma.')
+    @click.option('--start-date', type=click.DateTime(['%Y-%m-%d']), help='Tanggal mulai salinan.')
+    @click.option('--shift-days', type=int, help='Geser semua tanggal sesi sekian hari.')
+    def plans_clone(plan_id, target_client_ids, start_date, shift_days):
+        """Salin workout plan beserta sesi dan detailnya ke banyak klien."""
+        from models import db, WorkoutPlan
+        from services.plan_cloning import clone_plan, shift_for_start
+
+        plan = db.session.get(WorkoutPlan, plan_id)
+        if plan is None:
+            raise click.BadParameter(f'workout plan {plan_id} tidak ditemukan', param_hint='PLAN_ID')
+        if shift_days is None:
+            shift_days = shift_for_start(plan, start_date.date() if start_date else None)
+        ids = [int(client_id) for client_id in target_client_ids.split(',') if client_id.strip()]
+        clone = clone_plan(plan, ids, shift_days=shift_days)
+        db.session.commit()
+        click.echo(f'{len(clone.plans)} program dibuat: {clone.plan_details} detail program, '
+                   f'{clone.sessions} sesi, {clone.session_details} detail sesi.')
@@ -31,12 +31,31 @@ class Config:
         # MySQL configuration
         SQLALCHEMY_DATABASE_URI = f'mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DB}'
     
+    # Jalankan migrasi skema saat startup (default: tidak; gunakan `flask db-upgrade`)
+    AUTO_MIGRATE = os.environ.get('AUTO_MIGRATE', 'False').lower() == 'true'
+    
     # SQLAlchemy configuration
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Connection pool (lihat services/db_pool.py)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # Detik menunggu koneksi bebas
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 300))
+    # False: tanpa ping per checkout, pool diinvalidasi saat terdeteksi koneksi putus
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))  # 0 = tanpa batas (MySQL)
+    
     SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_recycle': 300,
-        'pool_pre_ping': True
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': DB_POOL_PRE_PING
     }
+    if not MYSQL_DB.startswith('sqlite:'):
+        SQLALCHEMY_ENGINE_OPTIONS.update({
+            'pool_size': DB_POOL_SIZE,
+            'max_overflow': DB_MAX_OVERFLOW,
+            'pool_timeout': DB_POOL_TIMEOUT
+        })
     
     # Upload configuration
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
@@ -50,6 +69,37 @@ class Config:
     
     # Pagination
     CLIENTS_PER_PAGE = int(os.environ.get('CLIENTS_PER_PAGE', 10))
+    SESSIONS_PER_PAGE = int(os.environ.get('SESSIONS_PER_PAGE', 15))
+    PAGINATION_COUNT_TTL = int(os.environ.get('PAGINATION_COUNT_TTL', 60))  # Cache jumlah total (detik)
+    
+    # Sweeper foto yatim di proses wsgi (detik, 0 = nonaktif). Setiap worker Gunicorn
+    # menjalankan sweeper sendiri, jadi untuk beberapa worker pakai `flask photos-sweep` dari cron
+    PHOTO_SWEEP_INTERVAL = int(os.environ.get('PHOTO_SWEEP_INTERVAL', 0))
+    PHOTO_ORPHAN_GRACE_SECONDS = int(os.environ.get('PHOTO_ORPHAN_GRACE_SECONDS', 3600))
+    
+    # Jumlah worker pembuat thumbnail/medium foto
+    PHOTO_DERIVATIVE_WORKERS = int(os.environ.get('PHOTO_DERIVATIVE_WORKERS', 2))
+    
+    # Conditional GET (ETag/Last-Modified) untuk halaman detail
+    CONDITIONAL_GET_ENABLED = os.environ.get('CONDITIONAL_GET_ENABLED', 'True').lower() == 'true'
+    
+    # Interval pemeriksaan versi cache katalog latihan antar worker (detik)
+    EXERCISE_CATALOG_CHECK_SECONDS = int(os.environ.get('EXERCISE_CATALOG_CHECK_SECONDS', 5))
+    
+    # Feed kalender sesi: jumlah bucket (klien, bulan) di cache proses dan rentang maksimum (hari)
+    CALENDAR_CACHE_BUCKETS = int(os.environ.get('CALENDAR_CACHE_BUCKETS', 2000))
+    CALENDAR_MAX_DAYS = int(os.environ.get('CALENDAR_MAX_DAYS', 400))
+    
+    # Metrik Prometheus di /metrics (lihat services/metrics.py)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'False').lower() == 'true'
+    # Token scraper /metrics (header Authorization: Bearer <token>); jika kosong,
+    # /metrics hanya bisa dibuka admin yang sedang login
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 200))
+    
+    # Budget query SQL per request (lihat services/instrumentation.py)
+    SQL_QUERY_COUNT_HEADER = os.environ.get('SQL_QUERY_COUNT_HEADER', 'False').lower() == 'true'
+    SQL_QUERY_BUDGET_STRICT = os.environ.get('SQL_QUERY_BUDGET_STRICT', 'False').lower() == 'true'
     
     @staticmethod
     def init_app(app):
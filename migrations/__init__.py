@@ -0,0 +1,88 @@
+"""
+Migrasi skema berversi untuk Sistem Catatan Klien Personal Trainer
+Setiap modul mNNNN_*.py mendefinisikan VERSION, DESCRIPTION dan fungsi
+upgrade(connection). Versi yang sudah diterapkan dicatat di tabel
+schema_migrations sehingga setiap migrasi hanya dijalankan sekali.
+
+Migrasi baseline membuat tabel sesuai models.py saat ini, jadi migrasi
+berikutnya harus idempoten (gunakan helper *_if_missing di bawah).
+"""
+
+import importlib
+import pkgutil
+from datetime import datetime
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, inspect, select, insert, text
+
+metadata = MetaData()
+
+schema_migrations = Table(
+    'schema_migrations', metadata,
+    Column('version', Integer, primary_key=True),
+    Column('description', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+
+def load_migrations():
+    """
+    Muat semua modul migrasi, diurutkan berdasarkan VERSION
+    """
+    modules = []
+    for module_info in pkgutil.iter_modules(__path__):
+        if module_info.name.startswith('m') and module_info.name[1:5].isdigit():
+            modules.append(importlib.import_module(f'{__name__}.{module_info.name}'))
+    return sorted(modules, key=lambda module: module.VERSION)
+
+
+def applied_versions(engine):
+    """
+    Ambil daftar versi migrasi yang sudah diterapkan
+    """
+    with engine.begin() as connection:
+        schema_migrations.create(connection, checkfirst=True)
+        return set(connection.scalars(select(schema_migrations.c.version)))
+
+
+def pending_migrations(engine):
+    """
+    Daftar migrasi yang belum diterapkan
+    """
+    done = applied_versions(engine)
+    return [migration for migration in load_migrations() if migration.VERSION not in done]
+
+
+def upgrade(engine):
+    """
+    Terapkan semua migrasi yang tertunda, masing-masing dalam transaksinya sendiri
+    Mengembalikan daftar modul migrasi yang diterapkan
+    """
+    applied = []
+    for migration in pending_migrations(engine):
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+            connection.execute(insert(schema_migrations).values(
+                version=migration.VERSION,
+                description=migration.DESCRIPTION,
+                applied_at=datetime.utcnow()
+            ))
+        applied.append(migration)
+    return applied
+
+
+def add_column_if_missing(connection, table_name, column):
+    """
+    Tambah kolom (objek Column SQLAlchemy, nullable) jika belum ada di tabel
+    """
+    existing = {existing_column['name'] for existing_column in inspect(connection).get_columns(table_name)}
+    if column.name not in existing:
+        column_type = column.type.compile(dialect=connection.dialect)
+        connection.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}'))
+
+
+def create_index_if_missing(connection, table_name, index_name, columns):
+    """
+    Buat index jika belum ada di tabel
+    """
+    existing = {index['name'] for index in inspect(connection).get_indexes(table_name)}
+    if index_name not in existing:
+        connection.execute(text(f'CREATE INDEX {index_name} ON {table_name} ({", ".join(columns)})'))
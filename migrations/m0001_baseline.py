@@ -0,0 +1,11 @@
+"""
+Skema awal: semua tabel yang didefinisikan di models.py
+"""
+
+VERSION = 1
+DESCRIPTION = 'Skema awal dari models.py'
+
+
+def upgrade(connection):
+    from models import db
+    db.metadata.create_all(bind=connection)
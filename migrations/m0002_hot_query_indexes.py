@@ -0,0 +1,25 @@
+"""
+Index komposit untuk query per-klien yang difilter berdasarkan klien
+dan diurutkan berdasarkan tanggal
+"""
+
+from migrations import create_index_if_missing
+
+VERSION = 2
+DESCRIPTION = 'Index komposit untuk query per-klien'
+
+INDEXES = [
+    ('clients', 'ix_clients_created_at', ['created_at']),
+    ('assessments', 'ix_assessments_client_created', ['client_id', 'created_at']),
+    ('workout_plans', 'ix_workout_plans_client_created', ['client_id', 'created_at']),
+    ('sessions', 'ix_sessions_client_date', ['client_id', 'date', 'id']),
+    ('sessions', 'ix_sessions_plan_date', ['workout_plan_id', 'date']),
+    ('sessions', 'ix_sessions_date', ['date']),
+    ('sessions', 'ix_sessions_created_at', ['created_at']),
+    ('session_details', 'ix_session_details_session', ['session_id']),
+]
+
+
+def upgrade(connection):
+    for table_name, index_name, columns in INDEXES:
+        create_index_if_missing(connection, table_name, index_name, columns)
@@ -0,0 +1,12 @@
+"""
+Tabel rollup harian untuk API analitik klien
+Isi data historis dengan: flask analytics-rebuild
+"""
+
+VERSION = 3
+DESCRIPTION = 'Tabel rollup daily_training_volumes'
+
+
+def upgrade(connection):
+    from models import DailyTrainingVolume
+    DailyTrainingVolume.__table__.create(bind=connection, checkfirst=True)
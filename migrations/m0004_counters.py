@@ -0,0 +1,21 @@
+"""
+Tabel counters untuk dashboard, diisi dari data yang sudah ada
+"""
+
+VERSION = 4
+DESCRIPTION = 'Tabel counters dashboard'
+
+
+def upgrade(connection):
+    from sqlalchemy import insert, select, func
+    from models import Counter
+    from services.counters import compute_counters
+
+    Counter.__table__.create(bind=connection, checkfirst=True)
+    if connection.execute(select(func.count()).select_from(Counter.__table__)).scalar():
+        return
+
+    counts = compute_counters(connection)
+    rows = [{'name': name, 'value': value} for name, value in counts.items() if value]
+    if rows:
+        connection.execute(insert(Counter.__table__), rows)
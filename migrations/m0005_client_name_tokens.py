@@ -0,0 +1,14 @@
+"""
+Index pencarian nama klien, diisi dari data klien yang sudah ada
+"""
+
+VERSION = 5
+DESCRIPTION = 'Tabel client_name_tokens untuk pencarian klien'
+
+
+def upgrade(connection):
+    from models import ClientNameToken
+    from services.client_search import rebuild_name_index
+
+    ClientNameToken.__table__.create(bind=connection, checkfirst=True)
+    rebuild_name_index(connection)
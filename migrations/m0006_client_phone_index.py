@@ -0,0 +1,12 @@
+"""
+Index nomor telepon klien untuk mencocokkan baris impor assessment ke klien
+"""
+
+from migrations import create_index_if_missing
+
+VERSION = 6
+DESCRIPTION = 'Index nomor telepon klien'
+
+
+def upgrade(connection):
+    create_index_if_missing(connection, 'clients', 'ix_clients_phone', ['phone'])
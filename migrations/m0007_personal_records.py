@@ -0,0 +1,12 @@
+"""
+Tabel personal record per klien per latihan
+Isi data historis dengan: flask records-rebuild
+"""
+
+VERSION = 7
+DESCRIPTION = 'Tabel personal_records'
+
+
+def upgrade(connection):
+    from models import PersonalRecord
+    PersonalRecord.__table__.create(bind=connection, checkfirst=True)
@@ -0,0 +1,17 @@
+"""
+Kolom beban ternormalisasi di session_details (weight_kg, weight_unit, weight_band)
+Isi data historis dengan: flask weights-backfill
+"""
+
+from sqlalchemy import Column, Numeric, String, Enum
+from migrations import add_column_if_missing, create_index_if_missing
+
+VERSION = 8
+DESCRIPTION = 'Kolom beban ternormalisasi session_details'
+
+
+def upgrade(connection):
+    add_column_if_missing(connection, 'session_details', Column('weight_kg', Numeric(8, 2)))
+    add_column_if_missing(connection, 'session_details', Column('weight_unit', Enum('kg', 'lb', 'band', 'bodyweight')))
+    add_column_if_missing(connection, 'session_details', Column('weight_band', String(30)))
+    create_index_if_missing(connection, 'session_details', 'ix_session_details_exercise', ['exercise_id'])
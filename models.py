@@ -51,6 +51,10 @@ class Client(db.Model):
     Model untuk data klien
     """
     __tablename__ = 'clients'
+    __table_args__ = (
+        db.Index('ix_clients_created_at', 'created_at'),
+        db.Index('ix_clients_phone', 'phone'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -97,6 +101,9 @@ class Assessment(db.Model):
     Model untuk assessment awal klien
     """
     __tablename__ = 'assessments'
+    __table_args__ = (
+        db.Index('ix_assessments_client_created', 'client_id', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=False)
@@ -127,6 +134,9 @@ class WorkoutPlan(db.Model):
     Model untuk rencana latihan
     """
     __tablename__ = 'workout_plans'
+    __table_args__ = (
+        db.Index('ix_workout_plans_client_created', 'client_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=False)
@@ -174,6 +184,12 @@ class Session(db.Model):
     Model untuk sesi latihan
     """
     __tablename__ = 'sessions'
+    __table_args__ = (
+        db.Index('ix_sessions_client_date', 'client_id', 'date', 'id'),
+        db.Index('ix_sessions_plan_date', 'workout_plan_id', 'date'),
+        db.Index('ix_sessions_date', 'date'),
+        db.Index('ix_sessions_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=False)
@@ -204,6 +220,10 @@ class SessionDetail(db.Model):
     Model untuk detail latihan yang dilakukan dalam sesi
     """
     __tablename__ = 'session_details'
+    __table_args__ = (
+        db.Index('ix_session_details_session', 'session_id'),
+        db.Index('ix_session_details_exercise', 'exercise_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.Integer, db.ForeignKey('sessions.id'), nullable=False)
@@ -212,6 +232,10 @@ class SessionDetail(db.Model):
     sets = db.Column(db.Integer, nullable=True)
     reps = db.Column(db.String(20), nullable=True)  # String untuk mendukung format "6-8", "AMRAP", dll
     weight = db.Column(db.String(50), nullable=True)  # bisa berupa nilai numerik atau string (seperti "UNGU" untuk band)
+    # Hasil normalisasi weight (lihat services/weights.py): beban dalam kg, satuan asli, warna band
+    weight_kg = db.Column(Numeric(8, 2), nullable=True)
+    weight_unit = db.Column(db.Enum('kg', 'lb', 'band', 'bodyweight'), nullable=True)
+    weight_band = db.Column(db.String(30), nullable=True)
     rest_time = db.Column(db.String(20), nullable=True)  # contoh: "60 detik"
     notes = db.Column(db.Text, nullable=True)
     actual_reps_1 = db.Column(db.Integer, nullable=True)
@@ -223,4 +247,98 @@ class SessionDetail(db.Model):
     exercise = db.relationship('Exercise', foreign_keys=[exercise_id])
     
     def __repr__(self):
-        return f'<SessionDetail {self.exercise_name} - {self.session_id}>'
\ No newline at end of file
+        return f'<SessionDetail {self.exercise_name} - {self.session_id}>'
+
+class DailyTrainingVolume(db.Model):
+    """
+    Rollup harian volume latihan per klien per latihan
+    Diperbarui setiap kali SessionDetail ditulis, dipakai oleh API analitik
+    """
+    __tablename__ = 'daily_training_volumes'
+    __table_args__ = (
+        db.Index('ix_daily_training_volumes_client_date', 'client_id', 'date'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey('exercises.id'), nullable=True)
+    exercise_name = db.Column(db.String(100), nullable=False)
+    sets_done = db.Column(db.Integer, nullable=False, default=0)  # Jumlah set dengan actual reps
+    total_reps = db.Column(db.Integer, nullable=False, default=0)
+    volume = db.Column(Numeric(12, 2), nullable=False, default=0)  # reps x beban, dalam kg
+    top_weight = db.Column(Numeric(8, 2), nullable=True)  # Beban terberat yang dikerjakan, dalam kg
+    
+    def __repr__(self):
+        return f'<DailyTrainingVolume {self.client_id} - {self.date} - {self.exercise_name}>'
+
+
+class PersonalRecord(db.Model):
+    """
+    Personal record (PR) per klien per latihan
+    Diperbarui secara inkremental setiap kali actual reps ditulis; setiap rekor
+    menyimpan detail sesi sumbernya agar koreksi nilai bisa dihitung ulang
+    """
+    __tablename__ = 'personal_records'
+    __table_args__ = (
+        db.Index('ix_personal_records_client_exercise', 'client_id', 'exercise_name', unique=True),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey('exercises.id'), nullable=True)
+    exercise_name = db.Column(db.String(100), nullable=False)
+    # Beban terberat (kg) dan reps terbanyak pada beban itu
+    best_weight = db.Column(Numeric(8, 2), nullable=True)
+    best_weight_reps = db.Column(db.Integer, nullable=True)
+    best_weight_date = db.Column(db.Date, nullable=True)
+    best_weight_detail_id = db.Column(db.Integer, nullable=True)
+    # Reps terbanyak dalam satu set dan bebannya (None untuk band/bodyweight)
+    best_reps = db.Column(db.Integer, nullable=True)
+    best_reps_weight = db.Column(Numeric(8, 2), nullable=True)
+    best_reps_date = db.Column(db.Date, nullable=True)
+    best_reps_detail_id = db.Column(db.Integer, nullable=True)
+    # Estimasi 1RM tertinggi (rumus Epley) beserta set asalnya
+    best_e1rm = db.Column(Numeric(8, 2), nullable=True)
+    best_e1rm_weight = db.Column(Numeric(8, 2), nullable=True)
+    best_e1rm_reps = db.Column(db.Integer, nullable=True)
+    best_e1rm_date = db.Column(db.Date, nullable=True)
+    best_e1rm_detail_id = db.Column(db.Integer, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<PersonalRecord {self.client_id} - {self.exercise_name}>'
+
+
+class Counter(db.Model):
+    """
+    Penghitung ringkasan (total dan per bulan) untuk dashboard
+    Diperbarui dalam transaksi yang sama dengan penulisan data
+    """
+    __tablename__ = 'counters'
+    
+    name = db.Column(db.String(100), primary_key=True)  # contoh: 'sessions', 'sessions:2024-02'
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Counter {self.name}={self.value}>'
+
+
+class ClientNameToken(db.Model):
+    """
+    Index pencarian nama klien: satu baris per kata (dinormalisasi) dari nama
+    Dipakai untuk autocomplete dan pencarian klien berbasis prefix
+    """
+    __tablename__ = 'client_name_tokens'
+    __table_args__ = (
+        db.Index('ix_client_name_tokens_client', 'client_id', 'token'),
+        db.Index('ix_client_name_tokens_position', 'position', 'token', 'client_id'),
+    )
+    
+    token = db.Column(db.String(100), primary_key=True)  # Kata dalam huruf kecil tanpa aksen
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), primary_key=True)
+    position = db.Column(db.Integer, nullable=False, default=0)  # Urutan kata dalam nama (0 = kata pertama)
+    
+    def __repr__(self):
+        return f'<ClientNameToken {self.token} - {self.client_id}>'
@@ -1,9 +1,10 @@
 from flask import Blueprint, render_template, request, flash, redirect, url_for, current_app
 from flask_login import login_required
-from werkzeug.utils import secure_filename
-import os
 from models import Assessment, Client, db
 from forms import AssessmentForm
+from services.counters import count_assessments
+from services.photo_storage import save_photo
+from services.page_versions import conditional_page
 from datetime import datetime
 from sqlalchemy import desc
 
@@ -58,6 +59,7 @@ def add(client_id):
                 notes=form.notes.data
             )
             db.session.add(assessment)
+            count_assessments(1)
             db.session.commit()
             flash(f'Assessment untuk {client.name} berhasil ditambahkan!', 'success')
             return redirect(url_for('assessments.view', id=assessment.id))
@@ -71,6 +73,7 @@ def add(client_id):
 
 @assessments_bp.route('/<int:id>')
 @login_required
+@conditional_page('assessment')
 def view(id):
     """
     Lihat detail assessment
@@ -93,19 +96,8 @@ def edit(id):
             if 'photo' in request.files:
                 file = request.files['photo']
                 if file and file.filename != '' and allowed_file(file.filename):
-                    # Delete old photo if exists
-                    if assessment.photo:
-                        old_file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], assessment.photo)
-                        if os.path.exists(old_file_path):
-                            os.remove(old_file_path)
-                    
-                    # Save new photo
-                    filename = secure_filename(file.filename)
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-                    filename = timestamp + filename
-                    file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-                    file.save(file_path)
-                    assessment.photo = filename
+                    # Simpan foto baru (file lama dibiarkan untuk sweeper foto yatim)
+                    assessment.photo = save_photo(file)
             
             # Update assessment data
             assessment.weight = float(request.form.get('weight')) if request.form.get('weight') else None
@@ -148,13 +140,9 @@ def delete(id):
     client_id = assessment.client_id
     
     try:
-        # Delete photo file if exists
-        if assessment.photo:
-            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], assessment.photo)
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        
+        # File foto dihapus nanti oleh sweeper foto yatim
         db.session.delete(assessment)
+        count_assessments(1, sign=-1)
         db.session.commit()
         
         flash('Assessment berhasil dihapus.', 'success')
@@ -1,8 +1,9 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask import Blueprint, render_template, request, flash, redirect, url_for, current_app
 from flask_login import login_required, current_user
 from models import User, Client, Assessment, Session, WorkoutPlan, db
 from datetime import datetime, timedelta
 from sqlalchemy import desc
+from services.pagination import keyset_paginate, cached_count
 
 client_portal_bp = Blueprint('client_portal', __name__)
 
@@ -84,7 +85,8 @@ def my_sessions():
     client = Client.query.get_or_404(current_user.client_id)
     
     # Pagination and filtering
-    page = request.args.get('page', 1, type=int)
+    after = request.args.get('after', '', type=str)
+    before = request.args.get('before', '', type=str)
     month = request.args.get('month', '', type=str)
     
     query = Session.query.filter_by(client_id=client.id)
@@ -103,8 +105,12 @@ def my_sessions():
         except ValueError:
             pass
     
-    sessions = query.order_by(desc(Session.date)).paginate(
-        page=page, per_page=15, error_out=False
+    # Keyset pagination pada (date, id); total di-cache
+    total = cached_count(('sessions', client.id, month), query, ttl=current_app.config['PAGINATION_COUNT_TTL'])
+    sessions = keyset_paginate(
+        query, [Session.date, Session.id],
+        per_page=current_app.config['SESSIONS_PER_PAGE'],
+        after=after, before=before, total=total
     )
     
     return render_template('client_portal/sessions.html', 
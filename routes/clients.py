@@ -1,7 +1,17 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
-from flask_login import login_required
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app, abort, Response, stream_with_context
+from flask_login import login_required, current_user
 from models import Client, Assessment, Session, WorkoutPlan, db, Exercise, SessionDetail
 from forms import ClientForm
+from services.analytics import client_analytics
+from services.personal_records import client_personal_records
+from services.counters import count_clients, read_counter
+from services.pagination import keyset_paginate, cached_count
+from services.client_search import index_client_names, matching_client_ids, search_clients
+from services.photo_storage import save_photo
+from services.photo_derivatives import schedule_derivatives
+from services.page_versions import conditional_page
+from services.history_export import export_history, SECTIONS
+from services.deletion import delete_client
 from datetime import datetime
 from sqlalchemy import desc, func
 from werkzeug.datastructures import FileStorage
@@ -14,16 +24,25 @@ def index():
     """
     Halaman daftar semua klien
     """
-    page = request.args.get('page', 1, type=int)
+    after = request.args.get('after', '', type=str)
+    before = request.args.get('before', '', type=str)
     search = request.args.get('search', '', type=str)
     
     query = Client.query
     
+    # Jumlah total dari counter dashboard, atau COUNT yang di-cache saat mencari
     if search:
-        query = query.filter(Client.name.contains(search))
+        # Pencarian memakai index prefix kata (ClientNameToken), bukan LIKE '%...%'
+        query = query.filter(Client.id.in_(matching_client_ids(search)))
+        total = cached_count(('clients', search), query, ttl=current_app.config['PAGINATION_COUNT_TTL'])
+    else:
+        total = read_counter('clients')
     
-    clients_data = query.order_by(desc(Client.created_at)).paginate(
-        page=page, per_page=10, error_out=False
+    # Keyset pagination pada (created_at, id), halaman dalam tetap semurah halaman pertama
+    clients_data = keyset_paginate(
+        query, [Client.created_at, Client.id],
+        per_page=current_app.config['CLIENTS_PER_PAGE'],
+        after=after, before=before, total=total
     )
     
     # Hitung umur untuk setiap klien
@@ -60,29 +79,15 @@ def add():
             
             # Proses upload foto jika ada
             if form.photo.data and hasattr(form.photo.data, 'filename') and form.photo.data.filename:
-                import os
-                from werkzeug.utils import secure_filename
-                import uuid
-                from werkzeug.datastructures import FileStorage
-                
-                # Pastikan direktori uploads ada
-                upload_folder = os.path.join('static', 'uploads')
-                if not os.path.exists(upload_folder):
-                    os.makedirs(upload_folder)
-                
-                # Simpan file dengan nama unik
-                filename = secure_filename(form.photo.data.filename)
-                unique_filename = f"{uuid.uuid4().hex}_{filename}"
-                
-                # Simpan file ke path yang benar
-                save_path = os.path.join(upload_folder, unique_filename)
-                form.photo.data.save(save_path)
-                
-                # Simpan nama file ke database
-                client.photo = unique_filename
+                # Simpan file berdasarkan hash isinya (foto identik disimpan sekali)
+                client.photo = save_photo(form.photo.data)
             
             db.session.add(client)
+            db.session.flush()
+            index_client_names([(client.id, client.name)])
+            count_clients([client.created_at])
             db.session.commit()
+            schedule_derivatives(client.photo)
             
             flash(f'Klien {client.name} berhasil ditambahkan!', 'success')
             return redirect(url_for('clients.view', id=client.id))
@@ -96,6 +101,7 @@ def add():
 
 @clients_bp.route('/<int:id>')
 @login_required
+@conditional_page('client')
 def view(id):
     """
     Lihat detail klien
@@ -106,6 +112,7 @@ def view(id):
     latest_assessment = Assessment.query.filter_by(client_id=id).order_by(desc(Assessment.created_at)).first()
     recent_sessions = Session.query.filter_by(client_id=id).order_by(desc(Session.date)).limit(5).all()
     workout_plans = WorkoutPlan.query.filter_by(client_id=id).order_by(desc(WorkoutPlan.created_at)).all()
+    personal_records = client_personal_records(id)
     
     # Hitung umur jika ada tanggal lahir
     age = None
@@ -119,6 +126,7 @@ def view(id):
                          latest_assessment=latest_assessment,
                          recent_sessions=recent_sessions,
                          workout_plans=workout_plans,
+                         personal_records=personal_records,
                          now=datetime.now())
 
 @clients_bp.route('/<int:id>/edit', methods=['GET', 'POST'])
@@ -132,46 +140,25 @@ def edit(id):
     
     if form.validate_on_submit():
         try:
-            # Update data dari form
+            # Update data dari form (kolom photo diproses terpisah di bawah)
+            current_photo = previous_photo = client.photo
             form.populate_obj(client)
+            client.photo = current_photo
             
             # Proses upload foto jika ada
             if form.photo.data:
                 # Cek apakah ini adalah objek file yang valid
                 from werkzeug.datastructures import FileStorage
                 if isinstance(form.photo.data, FileStorage) and form.photo.data.filename:
-                    import os
-                    from werkzeug.utils import secure_filename
-                    import uuid
-                    
-                    # Pastikan direktori uploads ada
-                    upload_folder = os.path.join('static', 'uploads')
-                    if not os.path.exists(upload_folder):
-                        os.makedirs(upload_folder)
-                    
-                    # Simpan file dengan nama unik
-                    filename = secure_filename(form.photo.data.filename)
-                    unique_filename = f"{uuid.uuid4().hex}_{filename}"
-                    
-                    # Simpan file ke path yang benar
-                    save_path = os.path.join(upload_folder, unique_filename)
-                    form.photo.data.save(save_path)
-                    
-                    # Hapus foto lama jika ada
-                    if client.photo and isinstance(client.photo, str) and not client.photo.startswith('<FileStorage'):
-                        old_photo_path = os.path.join(upload_folder, client.photo)
-                        if os.path.exists(old_photo_path):
-                            try:
-                                os.remove(old_photo_path)
-                            except:
-                                pass
-                    
-                    # Simpan nama file baru ke database (pastikan ini string)
-                    client.photo = unique_filename
+                    # Foto lama tidak dihapus di sini; sweeper menghapusnya jika tidak lagi dipakai
+                    client.photo = save_photo(form.photo.data)
             
             client.updated_at = datetime.utcnow()
+            index_client_names([(client.id, client.name)])
             
             db.session.commit()
+            if client.photo != previous_photo:
+                schedule_derivatives(client.photo)
             
             flash(f'Data klien {client.name} berhasil diperbarui!', 'success')
             return redirect(url_for('clients.view', id=client.id))
@@ -193,10 +180,12 @@ def delete(id):
     
     try:
         client_name = client.name
-        db.session.delete(client)
+        
+        # DELETE massal per tabel; counter, rollup dan index nama ikut diperbarui
+        counts = delete_client(client)
         db.session.commit()
         
-        flash(f'Klien {client_name} berhasil dihapus.', 'success')
+        flash(f'Klien {client_name} berhasil dihapus beserta {counts["sessions"]} sesi dan {counts["assessments"]} assessment.', 'success')
         return redirect(url_for('clients.index'))
         
     except Exception as e:
@@ -214,7 +203,8 @@ def api_search():
     if len(query) < 2:
         return jsonify([])
     
-    clients = Client.query.filter(Client.name.contains(query)).limit(10).all()
+    # Hasil diurutkan berdasarkan relevansi dari index prefix nama
+    clients = search_clients(query, limit=10)
     
     results = []
     for client in clients:
@@ -254,4 +244,65 @@ def api_client_exercises(client_id):
             'name': exercise_name
         })
     
-    return jsonify(result)
\ No newline at end of file
+    return jsonify(result)
+
+@clients_bp.route('/api/<int:client_id>/analytics')
+@login_required
+def api_analytics(client_id):
+    """
+    API data analitik latihan klien untuk grafik di halaman detail klien
+    Parameter: time (jumlah hari, default 30) dan exercise (ID latihan atau 'all')
+    """
+    Client.query.get_or_404(client_id)
+    
+    days = request.args.get('time', 30, type=int)
+    days = max(1, min(days or 30, 365))
+    exercise = request.args.get('exercise', 'all', type=str)
+    exercise_id = int(exercise) if exercise.isdigit() else None
+    
+    return jsonify(client_analytics(client_id, days=days, exercise_id=exercise_id))
+
+
+def _export_response(client_id=None, name='semua-klien'):
+    """
+    Response streaming riwayat latihan; parameter: format (csv/jsonl), from, to, sections
+    """
+    if not current_user.is_admin():
+        abort(403)
+
+    fmt = request.args.get('format', 'csv', type=str)
+    if fmt not in ('csv', 'jsonl'):
+        abort(400)
+    try:
+        date_from = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else None
+        date_to = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else None
+    except ValueError:
+        abort(400)
+    sections = [section for section in request.args.get('sections', ','.join(SECTIONS)).split(',') if section]
+    if not sections or any(section not in SECTIONS for section in sections):
+        abort(400)
+
+    filename = '-'.join(['riwayat', name] + [str(value) for value in (date_from, date_to) if value])
+    body = export_history(fmt, client_id=client_id, date_from=date_from, date_to=date_to, sections=sections)
+    return Response(
+        stream_with_context(body),
+        mimetype='text/csv' if fmt == 'csv' else 'application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{fmt}"'}
+    )
+
+@clients_bp.route('/<int:id>/export')
+@login_required
+def export(id):
+    """
+    Unduh riwayat latihan satu klien (sesi, detail sesi dan assessment)
+    """
+    Client.query.get_or_404(id)
+    return _export_response(client_id=id, name=f'klien-{id}')
+
+@clients_bp.route('/export')
+@login_required
+def export_all():
+    """
+    Unduh riwayat latihan semua klien
+    """
+    return _export_response()
@@ -1,11 +1,19 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app
 from flask_login import login_required
 from models import Exercise, db
+from services.catalog import get_catalog, bump_catalog_version
+from services.weights import band_loads, apply_band_loads
+from services.analytics import refresh_daily_rollups
+from services.personal_records import recompute_personal_records
+from services.page_versions import bump_client_versions
 from sqlalchemy import desc
 from datetime import datetime
 
 exercises_bp = Blueprint('exercises', __name__)
 
+# Jumlah pasangan (klien, tanggal) per refresh rollup saat beban band diubah
+ROLLUP_CHUNK = 500
+
 @exercises_bp.route('/')
 @login_required
 def index():
@@ -67,6 +75,7 @@ def add():
         )
         
         db.session.add(exercise)
+        bump_catalog_version()
         db.session.commit()
         
         flash(f'Latihan "{name}" berhasil ditambahkan.', 'success')
@@ -108,12 +117,23 @@ def edit(id):
             return redirect(url_for('exercises.edit', id=id))
         
         # Update latihan
+        loads_changed = band_loads(exercise.weight_options) != band_loads(weight_options)
         exercise.name = name
         exercise.description = description
         exercise.category = category
         exercise.weight_options = weight_options if weight_options else None
         exercise.reps_options = reps_options if reps_options else None
         exercise.updated_at = datetime.utcnow()
+        bump_catalog_version()
+        
+        if loads_changed:
+            # Label atau beban band berubah: detail sesi, rollup volume dan PR ikut diperbarui
+            rollup_keys, record_keys = apply_band_loads(exercise.id, weight_options)
+            rollup_keys = sorted(rollup_keys)
+            for start in range(0, len(rollup_keys), ROLLUP_CHUNK):
+                refresh_daily_rollups(rollup_keys[start:start + ROLLUP_CHUNK])
+            recompute_personal_records(record_keys)
+            bump_client_versions({client_id for client_id, _ in rollup_keys})
         
         db.session.commit()
         
@@ -140,7 +160,30 @@ def delete(id):
         return redirect(url_for('exercises.index'))
     
     db.session.delete(exercise)
+    bump_catalog_version()
     db.session.commit()
     
     flash(f'Latihan "{exercise.name}" berhasil dihapus.', 'success')
-    return redirect(url_for('exercises.index'))
\ No newline at end of file
+    return redirect(url_for('exercises.index'))
+
+@exercises_bp.route('/api/catalog')
+@login_required
+def api_catalog():
+    """
+    API katalog latihan (JSON) dengan ETag berdasarkan versi katalog
+    Browser dapat menyimpan hasilnya dan cukup memvalidasi ulang (304 jika tidak berubah)
+    """
+    catalog = get_catalog()
+    
+    if request.if_none_match.contains(catalog.etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(catalog.as_json())
+    
+    response.set_etag(catalog.etag)
+    if request.args.get('v') == str(catalog.version):
+        # URL berversi (dipakai plan builder): isinya tidak berubah, boleh dipakai dari cache tanpa validasi
+        response.headers['Cache-Control'] = 'private, max-age=86400'
+    else:
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
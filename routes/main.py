@@ -1,8 +1,11 @@
-from flask import Blueprint, render_template, request, redirect, url_for
+from flask import Blueprint, render_template, request, redirect, url_for, jsonify, abort, current_app, send_from_directory
 from flask_login import login_required, current_user
 from models import Client, Assessment, Session, db
-from sqlalchemy import func, desc
-from datetime import datetime, timedelta
+from sqlalchemy import desc
+from sqlalchemy.orm import joinedload
+from services.counters import dashboard_counters
+from services.db_pool import pool_stats
+from services.photo_storage import TEMP_DIR
 
 main_bp = Blueprint('main', __name__)
 
@@ -30,43 +33,44 @@ def dashboard():
         flash('Akses tidak diizinkan.', 'error')
         return redirect(url_for('auth.logout'))
     
-    # Dashboard untuk admin
-    total_clients = Client.query.count()
-    total_assessments = Assessment.query.count()
-    total_sessions = Session.query.count()
+    # Dashboard untuk admin: semua total dan statistik bulanan dari tabel counters
+    counters = dashboard_counters()
     
     # Recent clients (5 terbaru)
     recent_clients = Client.query.order_by(desc(Client.created_at)).limit(5).all()
     
     # Recent sessions (5 terbaru)
-    recent_sessions = Session.query.order_by(desc(Session.created_at)).limit(5).all()
-    
-    
-    # Monthly statistics
-    current_month = datetime.now().replace(day=1)
-    last_month = (current_month - timedelta(days=1)).replace(day=1)
-    
-    # New clients this month
-    new_clients_this_month = Client.query.filter(Client.created_at >= current_month).count()
-    new_clients_last_month = Client.query.filter(
-        Client.created_at >= last_month,
-        Client.created_at < current_month
-    ).count()
-    
-    # Sessions this month
-    sessions_this_month = Session.query.filter(Session.date >= current_month.date()).count()
-    sessions_last_month = Session.query.filter(
-        Session.date >= last_month.date(),
-        Session.date < current_month.date()
-    ).count()
+    recent_sessions = Session.query.options(joinedload(Session.client))\
+        .order_by(desc(Session.created_at)).limit(5).all()
     
     return render_template('dashboard.html',
-                         total_clients=total_clients,
-                         total_assessments=total_assessments,
-                         total_sessions=total_sessions,
                          recent_clients=recent_clients,
                          recent_sessions=recent_sessions,
-                         new_clients_this_month=new_clients_this_month,
-                         new_clients_last_month=new_clients_last_month,
-                         sessions_this_month=sessions_this_month,
-                         sessions_last_month=sessions_last_month)
\ No newline at end of file
+                         **counters)
+
+@main_bp.route('/internal/pool')
+@login_required
+def pool_status():
+    """
+    Statistik connection pool untuk worker yang melayani request ini (khusus admin)
+    """
+    if not current_user.is_admin():
+        abort(403)
+    return jsonify(pool_stats())
+
+# Nama file foto berbasis hash isi, jadi boleh di-cache browser lama (detik)
+PHOTO_CACHE_MAX_AGE = 30 * 24 * 3600
+
+@main_bp.route('/photos/<path:name>')
+@login_required
+def photo(name):
+    """
+    Sajikan file foto dari UPLOAD_FOLDER (lokasinya bisa di luar direktori static)
+    """
+    if name.split('/', 1)[0] == TEMP_DIR:
+        abort(404)
+    response = send_from_directory(current_app.config['UPLOAD_FOLDER'], name, max_age=PHOTO_CACHE_MAX_AGE)
+    # Foto klien hanya untuk user yang login: jangan disimpan cache bersama (proxy)
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
@@ -1,9 +1,17 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app, abort
 from flask_login import login_required
-from models import Session, Client, db
+from models import Session, SessionDetail, Client, db
 from forms import SessionForm
-from datetime import datetime, date
-from sqlalchemy import desc, asc
+from services.analytics import refresh_daily_rollups
+from services.counters import count_sessions
+from services.instrumentation import query_budget
+from services.pagination import keyset_paginate, cached_count
+from services.page_versions import conditional_page
+from services.session_navigation import session_neighbours
+from services.calendar_feed import calendar_feed
+from services.personal_records import record_sets, records_from_details, recompute_personal_records
+from datetime import datetime, date, timedelta
+from sqlalchemy.orm import joinedload, selectinload, contains_eager
 import json
 from extensions import csrf
 
@@ -18,7 +26,8 @@ def index(client_id):
     client = Client.query.get_or_404(client_id)
     
     # Pagination and filtering
-    page = request.args.get('page', 1, type=int)
+    after = request.args.get('after', '', type=str)
+    before = request.args.get('before', '', type=str)
     month = request.args.get('month', '', type=str)
     
     query = Session.query.filter_by(client_id=client_id)
@@ -37,8 +46,12 @@ def index(client_id):
         except ValueError:
             pass
     
-    sessions = query.order_by(desc(Session.date)).paginate(
-        page=page, per_page=15, error_out=False
+    # Keyset pagination pada (date, id) dengan index (client_id, date, id); total di-cache
+    total = cached_count(('sessions', client_id, month), query, ttl=current_app.config['PAGINATION_COUNT_TTL'])
+    sessions = keyset_paginate(
+        query.options(joinedload(Session.workout_plan)), [Session.date, Session.id],
+        per_page=current_app.config['SESSIONS_PER_PAGE'],
+        after=after, before=before, total=total
     )
     
     return render_template('sessions/index.html', client=client, sessions=sessions, selected_month=month)
@@ -69,6 +82,7 @@ def add(client_id):
             )
             
             db.session.add(session)
+            count_sessions([session.date])
             db.session.commit()
             
             flash(f'Sesi latihan untuk {client.name} berhasil ditambahkan!', 'success')
@@ -82,24 +96,23 @@ def add(client_id):
 
 @sessions_bp.route('/<int:id>')
 @login_required
+@query_budget(6)
+@conditional_page('session')
 def view(id):
     """
     Lihat detail sesi latihan
     """
-    session = Session.query.get_or_404(id)
-    
-    # Mencari sesi sebelumnya dan selanjutnya untuk klien yang sama
-    prev_session = Session.query.filter(
-        Session.client_id == session.client_id,
-        Session.date < session.date
-    ).order_by(desc(Session.date)).first()
+    session = Session.query.options(
+        joinedload(Session.client),
+        joinedload(Session.workout_plan),
+        selectinload(Session.details)
+    ).filter_by(id=id).first_or_404()
     
-    next_session = Session.query.filter(
-        Session.client_id == session.client_id,
-        Session.date > session.date
-    ).order_by(asc(Session.date)).first()
+    # Sesi sebelumnya dan selanjutnya untuk klien yang sama, urut (tanggal, id), dalam satu query
+    prev_session_id, next_session_id = session_neighbours(session)
     
-    return render_template('sessions/view.html', session=session, prev_session=prev_session, next_session=next_session)
+    return render_template('sessions/view.html', session=session,
+                         prev_session_id=prev_session_id, next_session_id=next_session_id)
 
 @sessions_bp.route('/<int:id>/edit', methods=['GET', 'POST'])
 @login_required
@@ -126,9 +139,15 @@ def edit(id):
                 return render_template('sessions/edit.html', session=session)
             
             # Update session data
+            rollup_keys = {(session.client_id, session.date), (session.client_id, session_date)}
+            record_keys = records_from_details(SessionDetail.session_id == session.id)
+            count_sessions([session.date], sign=-1)
+            count_sessions([session_date])
             session.date = session_date
             session.exercises_done = exercises_done
             session.comments = request.form.get('comments', '').strip()
+            refresh_daily_rollups(rollup_keys)
+            recompute_personal_records(record_keys)
             
             db.session.commit()
             
@@ -153,7 +172,12 @@ def delete(id):
     client_id = session.client_id
     
     try:
+        rollup_keys = [(session.client_id, session.date)]
+        record_keys = records_from_details(SessionDetail.session_id == session.id)
         db.session.delete(session)
+        count_sessions([session.date], sign=-1)
+        refresh_daily_rollups(rollup_keys)
+        recompute_personal_records(record_keys)
         db.session.commit()
         
         flash('Sesi latihan berhasil dihapus.', 'success')
@@ -164,36 +188,54 @@ def delete(id):
         flash('Terjadi kesalahan saat menghapus data.', 'error')
         return redirect(url_for('sessions.view', id=id))
 
-@sessions_bp.route('/client/<int:client_id>/calendar')
-@login_required
-def calendar(client_id):
+def _calendar_response(client_id=None):
     """
-    Tampilan kalender sesi latihan klien
+    Response JSON feed kalender; parameter: start dan end (YYYY-MM-DD, inklusif)
+    atau month (YYYY-MM). Tanpa parameter: bulan berjalan
     """
-    client = Client.query.get_or_404(client_id)
-    
-    # Get current month or requested month
-    month_str = request.args.get('month', datetime.now().strftime('%Y-%m'))
     try:
-        current_month = datetime.strptime(month_str, '%Y-%m')
-    except ValueError:
-        current_month = datetime.now().replace(day=1)
+        if request.args.get('start') or request.args.get('end'):
+            start_date = datetime.strptime(request.args['start'], '%Y-%m-%d').date()
+            end_date = datetime.strptime(request.args['end'], '%Y-%m-%d').date()
+        else:
+            start_date = datetime.strptime(request.args.get('month', date.today().strftime('%Y-%m')), '%Y-%m').date()
+            end_date = (start_date + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    except (KeyError, ValueError):
+        abort(400)
+    if end_date < start_date or (end_date - start_date).days >= current_app.config['CALENDAR_MAX_DAYS']:
+        abort(400)
     
-    # Get sessions for the month
-    start_date = current_month.date()
-    if current_month.month == 12:
-        end_date = date(current_month.year + 1, 1, 1)
+    feed = calendar_feed(start_date, end_date, client_id=client_id)
+    if request.if_none_match.contains(feed.etag):
+        response = current_app.response_class(status=304)
     else:
-        end_date = date(current_month.year, current_month.month + 1, 1)
-    
-    sessions = Session.query.filter_by(client_id=client_id)\
-        .filter(Session.date >= start_date, Session.date < end_date)\
-        .order_by(asc(Session.date)).all()
+        response = jsonify(feed.as_json())
     
-    return render_template('sessions/calendar.html', 
-                         client=client, 
-                         sessions=sessions, 
-                         current_month=current_month)
+    response.set_etag(feed.etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@sessions_bp.route('/calendar')
+@login_required
+@query_budget(4)
+def calendar_all():
+    """
+    Feed kalender sesi seluruh gym (JSON), opsional difilter dengan client_id
+    """
+    client_id = request.args.get('client_id', type=int)
+    if client_id is not None:
+        Client.query.get_or_404(client_id)
+    return _calendar_response(client_id)
+
+@sessions_bp.route('/client/<int:client_id>/calendar')
+@login_required
+@query_budget(4)
+def calendar(client_id):
+    """
+    Feed kalender sesi latihan klien (JSON)
+    """
+    Client.query.get_or_404(client_id)
+    return _calendar_response(client_id)
 
 @sessions_bp.route('/<int:id>/toggle_complete', methods=['POST'])
 @login_required
@@ -216,30 +258,10 @@ def toggle_complete(id):
         flash('Terjadi kesalahan saat mengubah status sesi.', 'error')
     
     return redirect(url_for('sessions.view', id=id))
-    
-    if start_date:
-        query = query.filter(Session.date >= datetime.strptime(start_date, '%Y-%m-%d').date())
-    if end_date:
-        query = query.filter(Session.date <= datetime.strptime(end_date, '%Y-%m-%d').date())
-    
-    sessions = query.order_by(asc(Session.date)).all()
-    
-    # Format data for calendar
-    events = []
-    for session in sessions:
-        events.append({
-            'id': session.id,
-            'title': f'Sesi Latihan - {session.client.name}',
-            'date': session.date.strftime('%Y-%m-%d'),
-            'exercises': session.exercises_done[:100] + '...' if len(session.exercises_done) > 100 else session.exercises_done,
-            'comments': session.comments[:100] + '...' if session.comments and len(session.comments) > 100 else session.comments,
-            'url': url_for('sessions.view', id=session.id)
-        })
-    
-    return jsonify(events)
 
 @sessions_bp.route('/today')
 @login_required
+@query_budget(3)
 def today():
     """
     Sesi latihan hari ini untuk semua klien
@@ -247,6 +269,7 @@ def today():
     today_date = date.today()
     today_sessions = Session.query.filter_by(date=today_date)\
         .join(Client)\
+        .options(contains_eager(Session.client))\
         .order_by(Client.name).all()
     
     return render_template('sessions/today.html', 
@@ -261,25 +284,20 @@ def update_actual_reps():
     """
     Menerima update reps dari AJAX dan menyimpan ke database sebagai string
     """
-    from models import SessionDetail, db
-    import sys
     data = request.get_json()
-    print('DEBUG update_actual_reps:', data, file=sys.stderr)
     detail_id = data.get('detail_id')
     reps_num = data.get('reps_num')
     value = data.get('value')
 
     # Validasi input
     if not detail_id or not reps_num:
-        print('DEBUG: Data tidak lengkap', file=sys.stderr)
         return {'success': False, 'message': 'Data tidak lengkap'}, 400
     if reps_num not in ['1', '2', '3', '4']:
-        print('DEBUG: Nomor reps tidak valid', file=sys.stderr)
         return {'success': False, 'message': 'Nomor reps tidak valid'}, 400
 
-    detail = db.session.get(SessionDetail, detail_id)
+    # Sesi ikut dimuat karena dibutuhkan untuk kunci rollup
+    detail = db.session.get(SessionDetail, detail_id, options=[joinedload(SessionDetail.session)])
     if not detail:
-        print('DEBUG: Detail tidak ditemukan', file=sys.stderr)
         return {'success': False, 'message': 'Detail tidak ditemukan'}, 404
 
     try:
@@ -288,12 +306,12 @@ def update_actual_reps():
             setattr(detail, f'actual_reps_{reps_num}', None)
         else:
             setattr(detail, f'actual_reps_{reps_num}', str(value))
+        refresh_daily_rollups([(detail.session.client_id, detail.session.date)])
+        record_sets([detail])
         db.session.commit()
-        print('DEBUG: Berhasil update actual reps', file=sys.stderr)
         return {'success': True, 'message': 'Berhasil update actual reps'}
     except Exception as e:
         db.session.rollback()
-        print(f'DEBUG: Gagal update: {str(e)}', file=sys.stderr)
         return {'success': False, 'message': f'Gagal update: {str(e)}'}, 500
 
 @sessions_bp.route('/<int:id>/update_notes', methods=['POST'])
@@ -318,21 +336,16 @@ def update_rest_time():
     """
     Menerima update rest_time dari AJAX dan menyimpan ke database
     """
-    from models import SessionDetail, db
-    import sys
     data = request.get_json()
-    print('DEBUG update_rest_time:', data, file=sys.stderr)
     detail_id = data.get('detail_id')
     rest_time = data.get('rest_time')
 
     # Validasi input
     if not detail_id:
-        print('DEBUG: Data tidak lengkap', file=sys.stderr)
         return {'success': False, 'message': 'Data tidak lengkap'}, 400
 
     detail = db.session.get(SessionDetail, detail_id)
     if not detail:
-        print('DEBUG: Detail tidak ditemukan', file=sys.stderr)
         return {'success': False, 'message': 'Detail tidak ditemukan'}, 404
 
     try:
@@ -342,11 +355,9 @@ def update_rest_time():
         else:
             detail.rest_time = rest_time
         db.session.commit()
-        print('DEBUG: Berhasil update rest time', file=sys.stderr)
         return {'success': True, 'message': 'Berhasil update rest time'}
     except Exception as e:
         db.session.rollback()
-        print(f'DEBUG: Gagal update: {str(e)}', file=sys.stderr)
         return {'success': False, 'message': f'Gagal update: {str(e)}'}, 500
 
 @sessions_bp.route('/update_exercise_notes', methods=['POST'])
@@ -356,29 +367,83 @@ def update_exercise_notes():
     """
     Menerima update notes untuk exercise dari AJAX dan menyimpan ke database
     """
-    from models import SessionDetail, db
-    import sys
     data = request.get_json()
-    print('DEBUG update_exercise_notes:', data, file=sys.stderr)
     detail_id = data.get('detail_id')
     notes = data.get('notes')
 
     # Validasi input
     if not detail_id:
-        print('DEBUG: Data tidak lengkap', file=sys.stderr)
         return {'success': False, 'message': 'Data tidak lengkap'}, 400
 
     detail = db.session.get(SessionDetail, detail_id)
     if not detail:
-        print('DEBUG: Detail tidak ditemukan', file=sys.stderr)
         return {'success': False, 'message': 'Detail tidak ditemukan'}, 404
 
     try:
         detail.notes = notes
         db.session.commit()
-        print('DEBUG: Berhasil update notes', file=sys.stderr)
         return {'success': True, 'message': 'Berhasil update notes'}
     except Exception as e:
         db.session.rollback()
-        print(f'DEBUG: Gagal update: {str(e)}', file=sys.stderr)
-        return {'success': False, 'message': f'Gagal update: {str(e)}'}, 500
\ No newline at end of file
+        return {'success': False, 'message': f'Gagal update: {str(e)}'}, 500
+
+
+# Field SessionDetail yang boleh diubah lewat batch update
+BATCH_UPDATE_FIELDS = ('actual_reps_1', 'actual_reps_2', 'actual_reps_3', 'actual_reps_4', 'rest_time', 'notes')
+
+
+@sessions_bp.route('/details/batch_update', methods=['POST'])
+@csrf.exempt
+@login_required
+def batch_update_details():
+    """
+    Menerima banyak update SessionDetail sekaligus dari AJAX dan menyimpannya dalam satu transaksi
+    Format: {"updates": [{"detail_id": 1, "actual_reps_1": 10, "rest_time": "60s", "notes": "..."}]}
+    """
+    data = request.get_json(silent=True) or {}
+    updates = data.get('updates')
+    
+    # Validasi input
+    if not isinstance(updates, list) or not updates:
+        return {'success': False, 'message': 'Data tidak lengkap'}, 400
+    
+    changes = {}
+    for update in updates:
+        if not isinstance(update, dict) or not str(update.get('detail_id', '')).isdigit():
+            return {'success': False, 'message': 'Data tidak lengkap'}, 400
+        
+        fields = changes.setdefault(int(update['detail_id']), {})
+        for field in BATCH_UPDATE_FIELDS:
+            if field not in update:
+                continue
+            value = update[field]
+            if value == '' or value is None:
+                value = None
+            elif field.startswith('actual_reps_'):
+                if not str(value).strip().isdigit():
+                    return {'success': False, 'message': f'Nilai reps tidak valid: {value}'}, 400
+                value = int(value)
+            fields[field] = value
+    
+    details = SessionDetail.query.options(joinedload(SessionDetail.session))\
+        .filter(SessionDetail.id.in_(changes.keys())).all()
+    if len(details) != len(changes):
+        return {'success': False, 'message': 'Detail tidak ditemukan'}, 404
+    
+    try:
+        rollup_keys = set()
+        reps_details = []
+        for detail in details:
+            for field, value in changes[detail.id].items():
+                setattr(detail, field, value)
+            if any(field.startswith('actual_reps_') for field in changes[detail.id]):
+                rollup_keys.add((detail.session.client_id, detail.session.date))
+                reps_details.append(detail)
+        
+        refresh_daily_rollups(rollup_keys)
+        record_sets(reps_details)
+        db.session.commit()
+        return {'success': True, 'message': 'Berhasil update detail latihan', 'updated': len(details)}
+    except Exception as e:
+        db.session.rollback()
+        return {'success': False, 'message': f'Gagal update: {str(e)}'}, 500
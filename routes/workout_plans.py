@@ -1,9 +1,15 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app
 from flask_login import login_required
-from models import Client, WorkoutPlan, WorkoutPlanDetail, Exercise, Session, db
+from models import Client, WorkoutPlan, WorkoutPlanDetail, Session, SessionDetail, db
+from services.schedule import compute_session_dates, load_exercise_names, materialize_sessions
+from services.instrumentation import query_budget
+from services.catalog import get_catalog
+from services.page_versions import conditional_page
+from services.plan_cloning import clone_plan, shift_for_start
+from services.deletion import delete_plan
 from datetime import datetime
-from sqlalchemy import desc
-import math
+from sqlalchemy import desc, func, select
+from sqlalchemy.orm import joinedload
 
 workout_plans_bp = Blueprint('workout_plans', __name__)
 
@@ -25,14 +31,16 @@ def add(client_id):
     Tambah workout plan baru untuk klien
     """
     client = Client.query.get_or_404(client_id)
-    exercises = Exercise.query.order_by(Exercise.name).all()
+    catalog = get_catalog()
+    # Dropdown latihan dimuat browser dari API katalog; versi di URL menjadi kunci cache
+    catalog_url = url_for('exercises.api_catalog', v=catalog.version)
     
     if request.method == 'POST':
         try:
             plan_name = request.form.get('plan_name', '').strip()
             if not plan_name:
                 flash('Nama program latihan harus diisi.', 'error')
-                return render_template('workout_plans/add.html', client=client, exercises=exercises)
+                return render_template('workout_plans/add.html', client=client, catalog_url=catalog_url)
             
             # Parse form data
             duration = request.form.get('duration')
@@ -54,7 +62,6 @@ def add(client_id):
             
             # Process selected days
             selected_days = request.form.getlist('selected_days[]')
-            print(f"Selected days: {selected_days}")
             
             # Ambil data latihan yang dipilih dari form
             exercise_ids = request.form.getlist('exercise_id[]')
@@ -62,92 +69,40 @@ def add(client_id):
             weight_values = request.form.getlist('weight[]')
             reps_values = request.form.getlist('reps[]')
             
+            # Ambil nama semua latihan yang dipilih dalam satu query
+            exercise_names = load_exercise_names(
+                [int(exercise_id) for exercise_id in exercise_ids if exercise_id and exercise_id != '0']
+            )
+            
             # Simpan data latihan yang dipilih untuk digunakan nanti
             selected_exercises = []
             for i in range(len(exercise_ids)):
-                if i < len(exercise_ids) and exercise_ids[i] and exercise_ids[i] != '0':
+                if exercise_ids[i] and exercise_ids[i] != '0':
+                    exercise_id = int(exercise_ids[i])
+                    if exercise_id not in exercise_names:
+                        continue
+                    
                     # Simpan weight sebagai string asli, bukan mencoba mengkonversi ke float
                     weight_value = None
                     if i < len(weight_values) and weight_values[i]:
                         weight_value = weight_values[i]  # Simpan nilai asli
                     
-                    exercise_data = {
-                        'exercise_id': int(exercise_ids[i]),
+                    selected_exercises.append({
+                        'exercise_id': exercise_id,
+                        'exercise_name': exercise_names[exercise_id],
                         'sets': int(sets_list[i]) if i < len(sets_list) and sets_list[i] else 0,
                         'weight': weight_value,
                         'reps': reps_values[i] if i < len(reps_values) and reps_values[i] else None
-                    }
-                    # Ambil nama latihan dari database
-                    exercise = db.session.get(Exercise, exercise_data['exercise_id'])
-                    if exercise:
-                        exercise_data['exercise_name'] = exercise.name
-                        selected_exercises.append(exercise_data)
+                    })
             
-            # Create sessions automatically based on workout plan
-            if workout_plan.start_date and workout_plan.duration and workout_plan.days_per_week and selected_days:
-                from models import Session, SessionDetail
-                from datetime import timedelta
-                
-                # Map day names to day numbers (0 = Sunday, 1 = Monday, etc.)
-                day_name_to_number = {
-                    'Minggu': 0,
-                    'Senin': 1,
-                    'Selasa': 2,
-                    'Rabu': 3,
-                    'Kamis': 4,
-                    'Jumat': 5,
-                    'Sabtu': 6
-                }
-                
-                # Convert selected days to day numbers
-                selected_day_numbers = [day_name_to_number[day] for day in selected_days]
-                selected_day_numbers.sort()
-                
-                # Generate sessions
-                total_sessions = workout_plan.duration * workout_plan.days_per_week
-                session_date = workout_plan.start_date
-                session_count = 0
-                
-                while session_count < total_sessions:
-                    current_day_number = session_date.weekday()  # 0 = Monday in Python
-                    if current_day_number == 6:  # Convert to 0 = Sunday format
-                        current_day_number = 0
-                    else:
-                        current_day_number += 1
-                    
-                    if current_day_number in selected_day_numbers:
-                        # Create new session
-                        session = Session(
-                            client_id=client_id,
-                            date=session_date,
-                            workout_plan_id=workout_plan.id,
-                            completed=False,
-                            notes=""
-                        )
-                        db.session.add(session)
-                        db.session.flush()  # Dapatkan ID sesi
-                        
-                        # Tambahkan detail latihan ke sesi
-                        for exercise_data in selected_exercises:
-                            # Periksa nilai weight, jika nan, ubah menjadi None
-                            weight_value = exercise_data['weight']
-                            if isinstance(weight_value, float) and math.isnan(weight_value):
-                                weight_value = None
-                                
-                            session_detail = SessionDetail(
-                                session_id=session.id,
-                                exercise_id=exercise_data['exercise_id'],
-                                exercise_name=exercise_data['exercise_name'],
-                                sets=exercise_data['sets'],
-                                weight=weight_value,
-                                reps=exercise_data['reps']
-                            )
-                            db.session.add(session_detail)
-                        
-                        session_count += 1
-                    
-                    # Move to next day
-                    session_date += timedelta(days=1)
+            # Buat sesi otomatis berdasarkan workout plan (kalender dihitung di awal, ditulis secara batch)
+            session_dates = compute_session_dates(
+                workout_plan.start_date,
+                workout_plan.duration,
+                workout_plan.days_per_week,
+                selected_days
+            )
+            materialize_sessions(workout_plan, session_dates, selected_exercises)
             
             db.session.commit()
             
@@ -156,42 +111,51 @@ def add(client_id):
             
         except ValueError as e:
             flash(f'Data tidak valid: {str(e)}. Periksa kembali input Anda.', 'error')
-        except Exception as e:
+        except Exception:
             db.session.rollback()
-            print(f"Error: {str(e)}")
+            current_app.logger.exception('Gagal menyimpan program latihan')
             flash('Terjadi kesalahan saat menyimpan data.', 'error')
     
     # Jika tidak ada latihan tersedia, tampilkan pesan
-    if not exercises:
+    if not catalog.exercises:
         flash('Belum ada data latihan. Silakan tambahkan latihan terlebih dahulu.', 'warning')
         
-    return render_template('workout_plans/add.html', client=client, exercises=exercises)
+    return render_template('workout_plans/add.html', client=client, catalog_url=catalog_url)
 
 @workout_plans_bp.route('/<int:id>')
 @login_required
+@query_budget(6)
+@conditional_page('workout_plan')
 def view(id):
     """
     Lihat detail workout plan
     """
-    workout_plan = WorkoutPlan.query.get_or_404(id)
+    workout_plan = WorkoutPlan.query.options(joinedload(WorkoutPlan.client)).filter_by(id=id).first_or_404()
     
-    # Mengambil semua sesi latihan yang terkait dengan workout plan ini
+    # Mengambil semua sesi latihan yang terkait dengan workout plan ini dalam satu query
     # Mengurutkan berdasarkan tanggal terdekat (tanggal yang akan datang dulu, kemudian yang sudah lewat)
     from datetime import date
     today = date.today()
+    plan_sessions = Session.query.filter_by(workout_plan_id=id).order_by(Session.date.asc(), Session.id.asc()).all()
     
-    # Ambil sesi yang belum lewat (tanggal >= hari ini), urutkan dari terdekat
-    upcoming_sessions = Session.query.filter_by(workout_plan_id=id).filter(Session.date >= today).order_by(Session.date.asc()).all()
-    
-    # Ambil sesi yang sudah lewat (tanggal < hari ini), urutkan dari yang paling baru
-    past_sessions = Session.query.filter_by(workout_plan_id=id).filter(Session.date < today).order_by(Session.date.desc()).all()
-    
-    # Gabungkan keduanya: upcoming dulu, baru past
+    # Sesi yang belum lewat (tanggal >= hari ini) dari terdekat, lalu sesi yang sudah lewat dari yang paling baru
+    upcoming_sessions = [session for session in plan_sessions if session.date >= today]
+    past_sessions = [session for session in plan_sessions if session.date < today][::-1]
     sessions = upcoming_sessions + past_sessions
     
+    # Jumlah latihan per sesi dalam satu query GROUP BY
+    detail_counts = dict(
+        db.session.query(SessionDetail.session_id, func.count(SessionDetail.id))
+        .join(Session, Session.id == SessionDetail.session_id)
+        .filter(Session.workout_plan_id == id)
+        .group_by(SessionDetail.session_id)
+        .all()
+    )
+    
     return render_template('workout_plans/view.html', 
                          workout_plan=workout_plan,
-                         sessions=sessions)
+                         sessions=sessions,
+                         detail_counts=detail_counts)
 
 @workout_plans_bp.route('/<int:id>/edit', methods=['GET', 'POST'])
 @login_required
@@ -246,12 +210,9 @@ def delete(id):
     try:
         plan_name = workout_plan.plan_name
         
-        # Cari semua sesi yang terkait dengan workout plan ini
-        related_sessions = Session.query.filter_by(workout_plan_id=id).all()
-        session_count = len(related_sessions)
-        
-        # Hapus workout plan (akan otomatis menghapus sesi terkait karena cascade='all, delete-orphan')
-        db.session.delete(workout_plan)
+        # Sesi dan detailnya dihapus dengan DELETE massal, tanpa dimuat ke memori
+        counts = delete_plan(workout_plan)
+        session_count = counts['sessions']
         db.session.commit()
         
         flash(f'Program latihan "{plan_name}" berhasil dihapus. {session_count} sesi terkait telah dihapus.', 'success')
@@ -266,48 +227,43 @@ def delete(id):
 @login_required
 def copy_plan(id):
     """
-    Copy workout plan untuk klien lain
+    Copy workout plan beserta sesi dan detail sesinya untuk satu atau banyak klien
+    Form: target_client_ids (boleh berulang) atau target_client_id, start_date opsional
     """
     original_plan = WorkoutPlan.query.get_or_404(id)
-    target_client_id = request.form.get('target_client_id')
+    target_client_ids = request.form.getlist('target_client_ids') or request.form.getlist('target_client_id')
+    target_client_ids = [int(client_id) for client_id in target_client_ids if client_id.isdigit()]
     
-    if not target_client_id:
+    if not target_client_ids:
         flash('Pilih klien tujuan.', 'error')
         return redirect(url_for('workout_plans.view', id=id))
     
-    target_client = Client.query.get_or_404(target_client_id)
+    targets = dict(db.session.execute(
+        select(Client.id, Client.name).where(Client.id.in_(target_client_ids))
+    ).all())
+    if len(targets) != len(set(target_client_ids)):
+        flash('Klien tujuan tidak ditemukan.', 'error')
+        return redirect(url_for('workout_plans.view', id=id))
     
     try:
-        # Create new workout plan
-        new_plan = WorkoutPlan(
-            client_id=target_client_id,
-            plan_name=f"{original_plan.plan_name} (Copy)",
-            notes=original_plan.notes
-        )
-        
-        db.session.add(new_plan)
-        db.session.flush()
-        
-        # Copy all details
-        for detail in original_plan.details:
-            new_detail = WorkoutPlanDetail(
-                plan_id=new_plan.id,
-                day_name=detail.day_name,
-                exercise=detail.exercise,
-                sets=detail.sets,
-                reps=detail.reps,
-                weight=detail.weight,
-                rest_time=detail.rest_time,
-                notes=detail.notes
-            )
-            db.session.add(new_detail)
+        start_date = request.form.get('start_date')
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
         
+        # Semua sesi dan detailnya disalin dengan INSERT ... SELECT
+        clone = clone_plan(original_plan, target_client_ids, shift_days=shift_for_start(original_plan, start_date))
         db.session.commit()
         
-        flash(f'Program latihan berhasil disalin ke {target_client.name}!', 'success')
-        return redirect(url_for('workout_plans.view', id=new_plan.id))
+        if len(clone.plans) == 1:
+            client_id, plan_id = clone.plans[0]
+            flash(f'Program latihan berhasil disalin ke {targets[client_id]} ({clone.sessions} sesi)!', 'success')
+            return redirect(url_for('workout_plans.view', id=plan_id))
+        flash(f'Program latihan berhasil disalin ke {len(clone.plans)} klien ({clone.sessions} sesi)!', 'success')
+        return redirect(url_for('workout_plans.view', id=id))
         
+    except ValueError as e:
+        flash(f'Data tidak valid: {str(e)}.', 'error')
+        return redirect(url_for('workout_plans.view', id=id))
     except Exception as e:
         db.session.rollback()
         flash('Terjadi kesalahan saat menyalin program latihan.', 'error')
-        return redirect(url_for('workout_plans.view', id=id))
\ No newline at end of file
+        return redirect(url_for('workout_plans.view', id=id))
@@ -0,0 +1 @@
+# Services package for Personal Trainer Client Management System
\ No newline at end of file
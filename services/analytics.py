@@ -0,0 +1,163 @@
+"""
+Analitik latihan klien berbasis rollup harian
+Volume (reps x beban) dihitung per (klien, tanggal, latihan) saat SessionDetail
+ditulis dan disimpan di DailyTrainingVolume, sehingga grafik di halaman klien
+cukup membaca rollup tanpa memindai semua detail sesi. Agregasinya berjalan di
+SQL (INSERT ... SELECT ... GROUP BY) memakai kolom weight_kg hasil normalisasi
+services/weights.py.
+"""
+
+from datetime import date, timedelta
+from sqlalchemy import select, delete, func, insert, tuple_, case, or_, literal
+from models import db, Exercise, Session, SessionDetail, DailyTrainingVolume
+from services.page_versions import bump_client_versions
+
+ACTUAL_REPS_FIELDS = ('actual_reps_1', 'actual_reps_2', 'actual_reps_3', 'actual_reps_4')
+
+ROLLUP_COLUMNS = ['client_id', 'date', 'exercise_id', 'exercise_name', 'sets_done', 'total_reps', 'volume', 'top_weight']
+
+
+def rollup_select():
+    """
+    SELECT agregat rollup per (klien, tanggal, latihan), dihitung seluruhnya di SQL
+    Hanya set yang sudah diisi actual reps yang dihitung; volume = weight_kg x reps
+    (detail tanpa beban numerik, misal band tanpa beban, menyumbang volume 0)
+    """
+    reps_columns = [getattr(SessionDetail, field) for field in ACTUAL_REPS_FIELDS]
+    sets_done = sum(case((column.isnot(None), 1), else_=0) for column in reps_columns)
+    total_reps = sum(func.coalesce(column, 0) for column in reps_columns)
+    return (
+        select(
+            Session.client_id, Session.date, SessionDetail.exercise_id, SessionDetail.exercise_name,
+            func.sum(sets_done), func.sum(total_reps),
+            func.coalesce(func.sum(SessionDetail.weight_kg * total_reps), literal(0)),
+            func.max(SessionDetail.weight_kg)
+        )
+        .join(SessionDetail, SessionDetail.session_id == Session.id)
+        .where(or_(*[column.isnot(None) for column in reps_columns]))
+        .group_by(Session.client_id, Session.date, SessionDetail.exercise_id, SessionDetail.exercise_name)
+    )
+
+
+def refresh_daily_rollups(keys):
+    """
+    Hitung ulang rollup untuk pasangan (client_id, tanggal) yang berubah
+    Dipanggil di dalam transaksi penulisan, sebelum commit
+    """
+    keys = {(client_id, day) for client_id, day in keys if client_id and day}
+    if not keys:
+        return
+
+    db.session.flush()
+    db.session.execute(
+        delete(DailyTrainingVolume).where(
+            tuple_(DailyTrainingVolume.client_id, DailyTrainingVolume.date).in_(keys)
+        )
+    )
+    db.session.execute(
+        insert(DailyTrainingVolume.__table__).from_select(
+            ROLLUP_COLUMNS, rollup_select().where(tuple_(Session.client_id, Session.date).in_(keys))
+        )
+    )
+
+
+def rollup_keys_for_sessions(session_filter):
+    """
+    Ambil pasangan (client_id, tanggal) untuk sesi yang cocok dengan filter
+    """
+    return set(db.session.execute(
+        select(Session.client_id, Session.date).where(session_filter).distinct()
+    ).all())
+
+
+def rebuild_daily_rollups(batch_size=500):
+    """
+    Bangun ulang seluruh rollup dari riwayat SessionDetail
+    Versi halaman semua klien yang rollupnya lama atau baru ikut dinaikkan.
+    Mengembalikan jumlah pasangan (klien, tanggal) yang diproses
+    """
+    client_ids = set(db.session.scalars(select(DailyTrainingVolume.client_id).distinct()))
+    db.session.execute(delete(DailyTrainingVolume))
+    keys = db.session.execute(
+        select(Session.client_id, Session.date)
+        .join(SessionDetail, SessionDetail.session_id == Session.id)
+        .distinct()
+    ).all()
+
+    for start in range(0, len(keys), batch_size):
+        refresh_daily_rollups(keys[start:start + batch_size])
+        db.session.commit()
+    bump_client_versions(client_ids | {client_id for client_id, _ in keys})
+    db.session.commit()
+    return len(keys)
+
+
+def client_analytics(client_id, days=30, exercise_id=None, today=None):
+    """
+    Data grafik analitik klien untuk periode `days` hari terakhir
+    Berisi volume per hari, volume per kategori latihan dan tren beban terberat per latihan
+    """
+    end_date = today or date.today()
+    start_date = end_date - timedelta(days=days - 1)
+
+    filters = [
+        DailyTrainingVolume.client_id == client_id,
+        DailyTrainingVolume.date >= start_date,
+        DailyTrainingVolume.date <= end_date
+    ]
+    if exercise_id:
+        filters.append(DailyTrainingVolume.exercise_id == exercise_id)
+
+    volume_rows = db.session.execute(
+        select(DailyTrainingVolume.date, func.sum(DailyTrainingVolume.volume))
+        .where(*filters)
+        .group_by(DailyTrainingVolume.date)
+        .order_by(DailyTrainingVolume.date)
+    ).all()
+
+    category_rows = db.session.execute(
+        select(Exercise.category, func.sum(DailyTrainingVolume.volume))
+        .select_from(DailyTrainingVolume)
+        .outerjoin(Exercise, Exercise.id == DailyTrainingVolume.exercise_id)
+        .where(*filters)
+        .group_by(Exercise.category)
+        .order_by(func.sum(DailyTrainingVolume.volume).desc())
+    ).all()
+
+    trend_rows = db.session.execute(
+        select(
+            DailyTrainingVolume.exercise_id,
+            DailyTrainingVolume.exercise_name,
+            DailyTrainingVolume.date,
+            func.max(DailyTrainingVolume.top_weight)
+        )
+        .where(*filters, DailyTrainingVolume.top_weight.isnot(None))
+        .group_by(DailyTrainingVolume.exercise_id, DailyTrainingVolume.exercise_name, DailyTrainingVolume.date)
+        .order_by(DailyTrainingVolume.exercise_name, DailyTrainingVolume.date)
+    ).all()
+
+    exercises = {}
+    for row_exercise_id, exercise_name, day, top_weight in trend_rows:
+        exercise = exercises.setdefault(exercise_name, {
+            'exercise_id': row_exercise_id,
+            'name': exercise_name,
+            'top_weight': 0.0,
+            'trend': []
+        })
+        exercise['trend'].append({'date': day.isoformat(), 'top_weight': float(top_weight)})
+        exercise['top_weight'] = max(exercise['top_weight'], float(top_weight))
+
+    return {
+        'days': days,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'volume': [
+            {'date': day.isoformat(), 'volume': float(volume or 0)}
+            for day, volume in volume_rows
+        ],
+        'categories': [
+            {'category': category or 'Lainnya', 'volume': float(volume or 0)}
+            for category, volume in category_rows
+        ],
+        'exercises': list(exercises.values())
+    }
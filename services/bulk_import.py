@@ -0,0 +1,307 @@
+"""
+Impor massal klien, latihan dan assessment dari file CSV atau JSON-lines
+File dibaca baris demi baris dan diproses per batch, jadi memori tetap kecil
+berapa pun ukuran file. Setiap baris divalidasi dengan aturan yang sama seperti
+form (ClientForm / AssessmentForm, aturan route tambah latihan); baris yang
+tidak valid dilewati dan dicatat di laporan error beserta nomor barisnya.
+
+Setiap batch ditulis dalam satu transaksi bersama data turunannya (counter
+dashboard, index nama klien, versi katalog, versi halaman klien). Jumlah baris
+yang sudah diproses disimpan di counter 'import:<job>' pada transaksi yang sama,
+sehingga impor yang gagal di tengah jalan bisa dilanjutkan tanpa duplikasi.
+"""
+
+import csv
+import json
+import os
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import select, insert, delete
+from werkzeug.datastructures import MultiDict
+from models import db, Client, Exercise, Assessment, Counter
+from forms import ClientForm, AssessmentForm
+from services.counters import increment, read_counter, count_clients, count_assessments
+from services.client_search import index_client_names
+from services.catalog import bump_catalog_version
+from services.page_versions import bump_client_versions
+
+KINDS = ('clients', 'exercises', 'assessments')
+
+JOB_PREFIX = 'import:'
+
+CLIENT_FIELDS = ('name', 'email', 'phone', 'birth_date', 'gender', 'height', 'start_weight', 'medical_notes')
+ASSESSMENT_FIELDS = (
+    'date', 'weight', 'height', 'body_fat', 'muscle_mass', 'chest', 'waist', 'hips', 'arm', 'thigh',
+    'neck', 'squat_max', 'bench_max', 'deadlift_max', 'pushup_test', 'pullup_test', 'notes'
+)
+
+# Pemisah opsi weight/reps latihan di kolom CSV, contoh: "5|7.5|10"
+OPTION_SEPARATOR = '|'
+
+
+class ImportResult:
+    """
+    Ringkasan satu kali impor
+    """
+    def __init__(self, job, resumed_from=0):
+        self.job = job
+        self.resumed_from = resumed_from
+        self.processed = 0
+        self.imported = 0
+        self.errors = 0
+
+
+def detect_format(path):
+    return 'jsonl' if path.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def default_job_name(kind, path):
+    """
+    Nama job untuk checkpoint: jenis data + path absolut file
+    """
+    name = f'{kind}:{os.path.abspath(path)}'
+    return name[-(100 - len(JOB_PREFIX)):]
+
+
+def read_rows(path, fmt):
+    """
+    Baca file baris demi baris; menghasilkan (nomor baris, dict atau None, pesan error)
+    """
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        if fmt == 'csv':
+            reader = csv.DictReader(handle)
+            for row in reader:
+                yield reader.line_num, row, None
+        else:
+            for number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield number, None, f'JSON tidak valid: {e}'
+                    continue
+                if not isinstance(row, dict):
+                    yield number, None, 'Baris harus berupa objek JSON'
+                    continue
+                yield number, row, None
+
+
+def _formdata(row, fields):
+    """
+    Ubah satu baris menjadi formdata untuk WTForms (semua nilai sebagai string)
+    """
+    data = MultiDict()
+    for field in fields:
+        value = row.get(field)
+        data[field] = '' if value is None else str(value).strip()
+    return data
+
+
+def _form_errors(form):
+    return '; '.join(f'{field}: {", ".join(messages)}' for field, messages in form.errors.items())
+
+
+def _blank_to_none(value):
+    return None if value == '' else value
+
+
+def _split_options(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, list):
+        options = [str(option).strip() for option in value]
+    else:
+        options = [option.strip() for option in str(value).split(OPTION_SEPARATOR)]
+    options = [option for option in options if option]
+    return options or None
+
+
+def import_clients(batch):
+    """
+    Validasi dan tulis satu batch klien; mengembalikan (jumlah diimpor, daftar error)
+    """
+    errors = []
+    rows = []
+    # Tanpa mikrodetik agar sama persis dengan nilai DATETIME yang tersimpan di MySQL
+    now = datetime.utcnow().replace(microsecond=0)
+    for number, row in batch:
+        form = ClientForm(formdata=_formdata(row, CLIENT_FIELDS), meta={'csrf': False})
+        if not form.validate():
+            errors.append((number, _form_errors(form)))
+            continue
+        values = {field: _blank_to_none(form[field].data) for field in CLIENT_FIELDS}
+        rows.append({**values, 'created_at': now, 'updated_at': now})
+
+    if rows:
+        # Satu INSERT multi-baris (ORM add_all + flush mengirim satu INSERT per baris di MySQL)
+        db.session.execute(insert(Client.__table__), rows)
+        # ID baru diambil dengan satu query, tidak ditebak dari urutan auto-increment.
+        # Klien lain dengan created_at dan nama yang sama ikut terindeks ulang, dan itu aman.
+        inserted = db.session.execute(
+            select(Client.id, Client.name)
+            .where(Client.created_at == now, Client.name.in_({row['name'] for row in rows}))
+        ).all()
+        index_client_names(inserted)
+        count_clients([now] * len(rows))
+    return len(rows), errors
+
+
+def import_exercises(batch):
+    """
+    Validasi dan tulis satu batch latihan; nama latihan harus unik
+    """
+    errors = []
+    rows = []
+    names = [str(row.get('name') or '').strip() for _, row in batch]
+    existing = set(db.session.execute(
+        select(Exercise.name).where(Exercise.name.in_([name for name in names if name]))
+    ).scalars())
+    now = datetime.utcnow()
+    for (number, row), name in zip(batch, names):
+        if not name:
+            errors.append((number, 'name: Nama latihan wajib diisi.'))
+            continue
+        if len(name) > 100:
+            errors.append((number, 'name: Nama latihan maksimal 100 karakter.'))
+            continue
+        if name in existing:
+            errors.append((number, f'name: Latihan dengan nama "{name}" sudah ada.'))
+            continue
+        existing.add(name)
+        rows.append({
+            'name': name,
+            'description': _blank_to_none(row.get('description')),
+            'category': _blank_to_none(row.get('category')),
+            'weight_options': _split_options(row.get('weight_options')),
+            'reps_options': _split_options(row.get('reps_options')),
+            'created_at': now,
+            'updated_at': now,
+        })
+
+    if rows:
+        db.session.execute(insert(Exercise.__table__), rows)
+        bump_catalog_version()
+    return len(rows), errors
+
+
+def _resolve_clients(batch):
+    """
+    Cocokkan baris assessment ke klien lewat client_id atau client_phone (satu query per kolom)
+    """
+    ids = set()
+    phones = set()
+    for _, row in batch:
+        client_id = str(row.get('client_id') or '').strip()
+        if client_id.isdigit():
+            ids.add(int(client_id))
+        elif row.get('client_phone'):
+            phones.add(str(row['client_phone']).strip())
+
+    known_ids = set()
+    if ids:
+        known_ids = set(db.session.execute(select(Client.id).where(Client.id.in_(ids))).scalars())
+    by_phone = {}
+    if phones:
+        for client_id, phone in db.session.execute(
+            select(Client.id, Client.phone).where(Client.phone.in_(phones)).order_by(Client.id)
+        ):
+            by_phone.setdefault(phone, client_id)
+    return known_ids, by_phone
+
+
+def import_assessments(batch):
+    """
+    Validasi dan tulis satu batch assessment; klien dicari lewat client_id atau client_phone
+    """
+    errors = []
+    rows = []
+    known_ids, by_phone = _resolve_clients(batch)
+    now = datetime.utcnow()
+    for number, row in batch:
+        client_id = str(row.get('client_id') or '').strip()
+        if client_id.isdigit():
+            client_id = int(client_id) if int(client_id) in known_ids else None
+        else:
+            client_id = by_phone.get(str(row.get('client_phone') or '').strip())
+        if client_id is None:
+            errors.append((number, 'client: Klien tidak ditemukan (isi client_id atau client_phone)'))
+            continue
+
+        form = AssessmentForm(formdata=_formdata(row, ASSESSMENT_FIELDS), meta={'csrf': False})
+        if not form.validate():
+            errors.append((number, _form_errors(form)))
+            continue
+        values = {field: _blank_to_none(form[field].data) for field in ASSESSMENT_FIELDS}
+        rows.append({'client_id': client_id, 'created_at': now, **values})
+
+    if rows:
+        db.session.execute(insert(Assessment.__table__), rows)
+        count_assessments(len(rows))
+        bump_client_versions(row['client_id'] for row in rows)
+    return len(rows), errors
+
+
+IMPORTERS = {
+    'clients': import_clients,
+    'exercises': import_exercises,
+    'assessments': import_assessments,
+}
+
+
+def reset_job(job):
+    """
+    Hapus checkpoint job agar impor berikutnya mulai dari baris pertama
+    """
+    db.session.execute(delete(Counter).where(Counter.name == JOB_PREFIX + job))
+    db.session.commit()
+
+
+def run_import(kind, path, fmt=None, batch_size=1000, job=None, on_error=None, on_batch=None):
+    """
+    Impor file ke tabel sesuai `kind`, melanjutkan dari checkpoint job jika ada
+    on_error(nomor baris, pesan) dipanggil untuk setiap baris yang ditolak,
+    on_batch(ImportResult) setelah setiap batch di-commit
+    """
+    importer = IMPORTERS[kind]
+    fmt = fmt or detect_format(path)
+    job = job or default_job_name(kind, path)
+    job_key = JOB_PREFIX + job
+
+    done = read_counter(job_key)
+    db.session.rollback()
+    result = ImportResult(job, resumed_from=done)
+
+    rows = islice(read_rows(path, fmt), done, None)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+
+        batch = []
+        errors = []
+        for number, row, error in chunk:
+            if error:
+                errors.append((number, error))
+            else:
+                batch.append((number, row))
+
+        try:
+            imported, row_errors = importer(batch) if batch else (0, [])
+            # Checkpoint ikut transaksi batch: commit gagal = batch diulang seluruhnya
+            increment({job_key: len(chunk)})
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        errors.extend(row_errors)
+        result.processed += len(chunk)
+        result.imported += imported
+        result.errors += len(errors)
+        if on_error:
+            for number, message in sorted(errors):
+                on_error(number, message)
+        if on_batch:
+            on_batch(result)
+    return result
@@ -0,0 +1,257 @@
+"""
+Feed kalender sesi latihan (JSON) untuk satu klien atau seluruh gym
+Event disimpan di cache proses per bucket (klien, bulan); bucket seluruh gym
+memakai klien 'all'. Setiap perubahan sesi menaikkan counter
+'calendar:<klien>:<YYYY-MM>' dan 'calendar:all:<YYYY-MM>' di transaksi yang sama,
+jadi satu request cukup membaca versi semua bulan dalam rentang (satu query
+kecil) dan hanya memuat ulang bulan yang berubah. Bulan yang tidak berubah
+dilayani dari memori, atau dijawab 304 oleh browser lewat ETag.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import event, select, inspect
+from models import db, Counter, Client, Session
+from services.counters import increment
+
+CALENDAR_PREFIX = 'calendar:'
+ALL_CLIENTS = 'all'
+
+# Dinaikkan saat nama klien berubah (nama ikut di feed seluruh gym)
+CLIENT_NAMES_KEY = 'calendar:client_names'
+
+# Kolom sesi yang tampil di event; perubahan kolom lain (catatan, feedback) tidak membuat bucket basi
+EVENT_COLUMNS = ('client_id', 'date', 'start_time', 'completed', 'workout_plan_id', 'session_type')
+
+
+def month_start(value):
+    return value.replace(day=1)
+
+
+def month_buckets(start, end):
+    """
+    Tanggal awal setiap bulan yang tercakup rentang [start, end]
+    """
+    months = []
+    current = month_start(start)
+    while current <= end:
+        months.append(current)
+        current = (current + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def calendar_key(scope, month):
+    """
+    Kunci counter versi bucket, contoh: calendar_key(12, date(2024, 2, 1)) -> 'calendar:12:2024-02'
+    """
+    return f'{CALENDAR_PREFIX}{scope}:{str(month)[:7]}'
+
+
+def bump_calendar_buckets(pairs):
+    """
+    Naikkan versi bucket untuk pasangan (client_id, tanggal atau 'YYYY-MM')
+    Panggil manual untuk penulisan massal sesi yang tidak lewat ORM (insert()/delete())
+    """
+    keys = set()
+    for client_id, value in pairs:
+        if client_id and value:
+            keys.add(calendar_key(client_id, value))
+            keys.add(calendar_key(ALL_CLIENTS, value))
+    increment({key: 1 for key in keys})
+
+
+def _history_values(state, name):
+    history = state.attrs[name].history
+    return [value for value in (*history.added, *history.unchanged, *history.deleted) if value is not None]
+
+
+def _before_flush(flush_session, flush_context, instances):
+    pairs = set()
+    names_changed = False
+    for instance in (*flush_session.new, *flush_session.deleted, *flush_session.dirty):
+        if isinstance(instance, Session):
+            state = inspect(instance)
+            if instance in flush_session.dirty and not any(
+                state.attrs[name].history.has_changes() for name in EVENT_COLUMNS
+            ):
+                continue
+            # Tanggal/klien lama dan baru: sesi yang dipindah mengubah dua bucket
+            for client_id in _history_values(state, 'client_id'):
+                for session_date in _history_values(state, 'date'):
+                    pairs.add((client_id, session_date))
+        elif isinstance(instance, Client) and instance in flush_session.dirty:
+            names_changed = names_changed or inspect(instance).attrs.name.history.has_changes()
+
+    bump_calendar_buckets(pairs)
+    if names_changed:
+        increment({CLIENT_NAMES_KEY: 1})
+
+
+def _event(row, with_client):
+    """
+    Event ringkas: kolom kosong tidak dikirim
+    """
+    item = {'id': row.id, 'date': row.date.isoformat(), 'done': bool(row.completed)}
+    if with_client:
+        item['client'] = row.client_id
+    if row.start_time:
+        item['time'] = row.start_time.strftime('%H:%M')
+    if row.workout_plan_id:
+        item['plan'] = row.workout_plan_id
+    if row.session_type:
+        item['type'] = row.session_type
+    return item
+
+
+def calendar_query(start, end, client_id=None):
+    """
+    SELECT kolom event untuk sesi dengan start <= tanggal < end (satu klien atau seluruh gym)
+    """
+    statement = (
+        select(Session.id, Session.client_id, Session.date, Session.start_time, Session.completed,
+               Session.workout_plan_id, Session.session_type)
+        .where(Session.date >= start, Session.date < end)
+        .order_by(Session.date, Session.start_time, Session.id)
+    )
+    if client_id:
+        statement = statement.where(Session.client_id == client_id)
+    return statement
+
+
+class CalendarCache:
+    """
+    Cache LRU event per (scope, bulan) beserta versi bucket saat dimuat
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def get(self, scope, month, version):
+        with self._lock:
+            entry = self._buckets.get((scope, month))
+            if entry is None or entry[0] != version:
+                return None
+            self._buckets.move_to_end((scope, month))
+            return entry[1]
+
+    def put(self, scope, month, version, events, limit):
+        with self._lock:
+            self._buckets[(scope, month)] = (version, events)
+            self._buckets.move_to_end((scope, month))
+            while len(self._buckets) > limit:
+                self._buckets.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+_cache = CalendarCache()
+
+
+class CalendarFeed:
+    """
+    Feed untuk satu rentang; versi bucket sudah dibaca, event dimuat saat diminta
+    """
+    def __init__(self, start, end, client_id, versions, names_version):
+        self.start = start
+        self.end = end
+        self.client_id = client_id
+        self.scope = client_id or ALL_CLIENTS
+        self.versions = versions                # {bulan: versi}
+        self.names_version = names_version
+
+    @property
+    def etag(self):
+        stamp = ','.join(f'{str(month)[:7]}={version}' for month, version in sorted(self.versions.items()))
+        return hashlib.sha1(
+            f'{self.scope}:{self.start}:{self.end}:{self.names_version}:{stamp}'.encode()
+        ).hexdigest()
+
+    def _load(self, months):
+        """
+        Muat bulan-bulan yang basi dengan satu query rentang lalu isi cache per bulan
+        """
+        end = (months[-1] + timedelta(days=32)).replace(day=1)
+        loaded = {month: [] for month in months}
+        for row in db.session.execute(calendar_query(months[0], end, self.client_id)):
+            bucket = loaded.get(month_start(row.date))
+            if bucket is not None:
+                bucket.append(_event(row, with_client=not self.client_id))
+
+        limit = current_app.config['CALENDAR_CACHE_BUCKETS']
+        for month, events in loaded.items():
+            _cache.put(self.scope, month, self.versions[month], events, limit)
+        return loaded
+
+    def events(self):
+        """
+        Event dalam rentang, diurutkan per tanggal
+        """
+        buckets = {}
+        stale = []
+        for month in sorted(self.versions):
+            events = _cache.get(self.scope, month, self.versions[month])
+            if events is None:
+                stale.append(month)
+            else:
+                buckets[month] = events
+        if stale:
+            buckets.update(self._load(stale))
+
+        start, end = self.start.isoformat(), self.end.isoformat()
+        return [
+            item
+            for month in sorted(buckets)
+            for item in buckets[month]
+            if start <= item['date'] <= end
+        ]
+
+    def as_json(self):
+        events = self.events()
+        feed = {
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'client_id': self.client_id,
+            'events': events,
+        }
+        if not self.client_id:
+            # Nama klien dikirim sekali per klien, bukan di setiap event
+            client_ids = {item['client'] for item in events}
+            feed['clients'] = {
+                str(client_id): name
+                for client_id, name in db.session.execute(
+                    select(Client.id, Client.name).where(Client.id.in_(client_ids))
+                )
+            } if client_ids else {}
+        return feed
+
+
+def calendar_feed(start, end, client_id=None):
+    """
+    Siapkan feed kalender untuk rentang [start, end]; client_id None = seluruh gym
+    Hanya membaca versi bucket (satu query); event dimuat lewat CalendarFeed.events()
+    """
+    scope = client_id or ALL_CLIENTS
+    months = month_buckets(start, end)
+    keys = {calendar_key(scope, month): month for month in months}
+    names = [] if client_id else [CLIENT_NAMES_KEY]
+    stored = dict(db.session.execute(
+        select(Counter.name, Counter.value).where(Counter.name.in_([*keys, *names]))
+    ).all())
+    versions = {month: stored.get(key, 0) for key, month in keys.items()}
+    return CalendarFeed(start, end, client_id, versions, stored.get(CLIENT_NAMES_KEY, 0))
+
+
+def clear_calendar_cache():
+    _cache.clear()
+
+
+def init_calendar_feed(app):
+    """
+    Pasang listener yang menaikkan versi bucket kalender setiap kali sesi di-flush
+    """
+    event.listen(db.session, 'before_flush', _before_flush)
@@ -0,0 +1,87 @@
+"""
+Cache katalog latihan per proses dengan version stamp
+Katalog (termasuk weight_options dan reps_options) disimpan di memori proses.
+Setiap create/edit/delete latihan menaikkan versi di tabel counters, sehingga
+worker lain cukup membaca satu baris kecil (paling sering setiap
+EXERCISE_CATALOG_CHECK_SECONDS detik) untuk tahu apakah cache-nya basi.
+"""
+
+import threading
+import time
+from collections import namedtuple
+from flask import current_app
+from models import db, Exercise
+from services.counters import increment, read_counter
+
+CATALOG_VERSION_KEY = 'exercise_catalog_version'
+
+CatalogExercise = namedtuple(
+    'CatalogExercise',
+    ['id', 'name', 'description', 'category', 'weight_options', 'reps_options']
+)
+
+
+class CatalogSnapshot:
+    """
+    Isi katalog pada satu versi (tidak diubah setelah dibuat)
+    """
+    def __init__(self, version, exercises):
+        self.version = version
+        self.exercises = exercises
+        self.by_id = {exercise.id: exercise for exercise in exercises}
+
+    @property
+    def etag(self):
+        return f'exercise-catalog-{self.version}'
+
+    def as_json(self):
+        return [exercise._asdict() for exercise in self.exercises]
+
+
+_lock = threading.Lock()
+_snapshot = None
+_checked_at = 0.0
+
+
+def _load_snapshot(version):
+    exercises = [
+        CatalogExercise(
+            id=exercise.id,
+            name=exercise.name,
+            description=exercise.description,
+            category=exercise.category,
+            weight_options=exercise.weight_options,
+            reps_options=exercise.reps_options
+        )
+        for exercise in Exercise.query.order_by(Exercise.name).all()
+    ]
+    return CatalogSnapshot(version, exercises)
+
+
+def get_catalog():
+    """
+    Ambil katalog latihan dari cache proses, muat ulang jika versinya berubah
+    """
+    global _snapshot, _checked_at
+
+    max_age = current_app.config.get('EXERCISE_CATALOG_CHECK_SECONDS', 5)
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - _checked_at < max_age:
+        return snapshot
+
+    with _lock:
+        version = read_counter(CATALOG_VERSION_KEY)
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = _load_snapshot(version)
+        _checked_at = time.monotonic()
+        return _snapshot
+
+
+def bump_catalog_version():
+    """
+    Naikkan versi katalog; dipanggil di dalam transaksi penulisan latihan, sebelum commit
+    """
+    global _checked_at
+    increment({CATALOG_VERSION_KEY: 1})
+    # Paksa proses ini memeriksa versi lagi pada akses berikutnya
+    _checked_at = 0.0
@@ -0,0 +1,159 @@
+"""
+Pencarian nama klien berbasis index prefix kata
+Setiap kata dari nama klien dinormalisasi (huruf kecil, tanpa aksen) dan
+disimpan di ClientNameToken. Pencarian memakai range scan pada index
+(token >= kata AND token < kata berikutnya) alih-alih LIKE '%kata%'.
+"""
+
+import re
+import unicodedata
+from sqlalchemy import select, delete, insert, and_
+from sqlalchemy.orm import aliased
+from models import db, Client, ClientNameToken
+
+NON_ALNUM = re.compile(r'[^a-z0-9]+')
+TOKEN_MAX_LENGTH = 100
+
+# Posisi kata yang diberi peringkat sendiri; posisi setelahnya digabung
+MAX_RANKED_POSITION = 3
+
+
+def normalize_words(text):
+    """
+    Pecah teks menjadi kata huruf kecil tanpa aksen, contoh: "José  Ávila" -> ['jose', 'avila']
+    """
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode().lower()
+    return [word[:TOKEN_MAX_LENGTH] for word in NON_ALNUM.split(text) if word]
+
+
+def name_tokens(client_id, name):
+    """
+    Baris ClientNameToken untuk satu klien (kata duplikat memakai posisi pertama)
+    """
+    tokens = {}
+    for position, word in enumerate(normalize_words(name)):
+        tokens.setdefault(word, position)
+    return [
+        {'token': token, 'client_id': client_id, 'position': position}
+        for token, position in tokens.items()
+    ]
+
+
+def index_client_names(clients):
+    """
+    Perbarui index nama untuk daftar (client_id, nama)
+    Dipanggil di dalam transaksi penulisan klien, sebelum commit
+    """
+    clients = list(clients)
+    if not clients:
+        return
+    db.session.execute(
+        delete(ClientNameToken).where(ClientNameToken.client_id.in_([client_id for client_id, _ in clients]))
+    )
+    rows = [row for client_id, name in clients for row in name_tokens(client_id, name)]
+    if rows:
+        db.session.execute(insert(ClientNameToken), rows)
+
+
+def unindex_client(client_id):
+    """
+    Hapus index nama klien
+    """
+    db.session.execute(delete(ClientNameToken).where(ClientNameToken.client_id == client_id))
+
+
+def rebuild_name_index(executor=None, batch_size=1000):
+    """
+    Bangun ulang seluruh index nama dari tabel clients
+    `executor` boleh berupa session atau connection (dipakai juga oleh migrasi)
+    """
+    executor = executor or db.session
+    executor.execute(delete(ClientNameToken))
+
+    total = 0
+    last_id = 0
+    while True:
+        batch = executor.execute(
+            select(Client.id, Client.name).where(Client.id > last_id).order_by(Client.id).limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        rows = [row for client_id, name in batch for row in name_tokens(client_id, name)]
+        if rows:
+            executor.execute(insert(ClientNameToken), rows)
+        total += len(batch)
+        last_id = batch[-1][0]
+    return total
+
+
+def _prefix(word, table=ClientNameToken):
+    """
+    Kondisi range untuk token yang diawali `word`
+    Token hanya berisi [a-z0-9], jadi karakter terakhir bisa dinaikkan satu
+    """
+    upper = word[:-1] + chr(ord(word[-1]) + 1)
+    return and_(table.token >= word, table.token < upper)
+
+
+def _require_words(statement, words):
+    """
+    Syarat bahwa klien juga punya kata yang cocok untuk setiap kata lainnya
+    Dicek per klien lewat index (client_id, token)
+    """
+    for word in words:
+        other = aliased(ClientNameToken)
+        statement = statement.where(
+            select(other.client_id)
+            .where(other.client_id == ClientNameToken.client_id, _prefix(word, other))
+            .exists()
+        )
+    return statement
+
+
+def matching_client_ids(query):
+    """
+    Subquery ID klien yang setiap kata pencariannya cocok dengan prefix kata di nama
+    Mengembalikan list kosong jika query tidak berisi kata (tidak ada klien yang cocok)
+    """
+    words = normalize_words(query)
+    if not words:
+        return []
+
+    statement = select(ClientNameToken.client_id).where(_prefix(words[0]))
+    return _require_words(statement, words[1:]).distinct()
+
+
+def search_clients(query, limit=10):
+    """
+    Cari klien untuk autocomplete, diurutkan berdasarkan relevansi:
+    kata yang cocok paling awal di nama, lalu kata yang cocok secara alfabetis
+    (kata yang persis sama lebih dulu dari kata yang lebih panjang)
+
+    Setiap posisi kata dicari dengan satu query yang mengikuti urutan index
+    (position, token, client_id) dan berhenti setelah `limit` baris.
+    """
+    words = normalize_words(query)
+    if not words:
+        return []
+
+    client_ids = []
+    for position in range(MAX_RANKED_POSITION + 1):
+        condition = ClientNameToken.position == position
+        if position == MAX_RANKED_POSITION:
+            condition = ClientNameToken.position >= position
+
+        statement = select(ClientNameToken.client_id).where(condition, _prefix(words[0]))
+        if client_ids:
+            statement = statement.where(ClientNameToken.client_id.notin_(client_ids))
+        statement = _require_words(statement, words[1:])\
+            .order_by(ClientNameToken.position, ClientNameToken.token, ClientNameToken.client_id)\
+            .limit(limit - len(client_ids))
+
+        for client_id in db.session.execute(statement).scalars():
+            if client_id not in client_ids:
+                client_ids.append(client_id)
+        if len(client_ids) >= limit:
+            break
+
+    clients = {client.id: client for client in Client.query.filter(Client.id.in_(client_ids)).all()} if client_ids else {}
+    return [clients[client_id] for client_id in client_ids if client_id in clients]
@@ -0,0 +1,193 @@
+"""
+Penghitung ringkasan dashboard yang dipelihara secara inkremental
+Setiap insert/delete klien, assessment dan sesi memperbarui baris di tabel
+counters dalam transaksi yang sama, sehingga dashboard cukup membaca satu
+query kecil alih-alih menjalankan COUNT pada tabel besar.
+
+Kunci: 'clients', 'assessments', 'sessions' (total), 'clients:YYYY-MM'
+(berdasarkan created_at) dan 'sessions:YYYY-MM' (berdasarkan tanggal sesi).
+"""
+
+from collections import Counter as Tally
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import db, Counter, Client, Assessment, Session
+
+TOTAL_KEYS = ('clients', 'assessments', 'sessions')
+
+# Jumlah kunci per statement upsert (batas parameter SQLite)
+UPSERT_BATCH = 500
+
+
+def month_key(name, value):
+    """
+    Kunci counter bulanan, contoh: month_key('sessions', date(2024, 2, 5)) -> 'sessions:2024-02'
+    """
+    return f'{name}:{str(value)[:7]}'
+
+
+def increment(deltas):
+    """
+    Tambahkan delta ke counter, contoh: increment({'sessions': 3, 'sessions:2024-02': 3})
+    Menggunakan upsert atomik (value = value + delta) agar aman untuk penulisan paralel;
+    semua kunci ditulis dalam satu statement multi-baris per UPSERT_BATCH kunci
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    table = Counter.__table__
+    now = datetime.utcnow()
+    dialect = db.session.get_bind().dialect.name
+    # Urutan kunci tetap agar dua transaksi paralel mengunci baris dengan urutan yang sama
+    rows = [{'name': name, 'value': delta, 'updated_at': now} for name, delta in sorted(deltas.items())]
+
+    if dialect not in ('mysql', 'sqlite'):
+        for row in rows:
+            result = db.session.execute(
+                update(table).where(table.c.name == row['name']).values(value=table.c.value + row['value'], updated_at=now)
+            )
+            if not result.rowcount:
+                db.session.execute(table.insert().values(**row))
+        return
+
+    for start in range(0, len(rows), UPSERT_BATCH):
+        batch = rows[start:start + UPSERT_BATCH]
+        if dialect == 'mysql':
+            statement = mysql_insert(table).values(batch)
+            statement = statement.on_duplicate_key_update(value=table.c.value + statement.inserted.value, updated_at=now)
+        else:
+            statement = sqlite_insert(table).values(batch)
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.name],
+                set_={'value': table.c.value + statement.excluded.value, 'updated_at': now}
+            )
+        db.session.execute(statement)
+
+
+def count_clients(created_ats, sign=1):
+    """
+    Catat klien yang ditambah (sign=1) atau dihapus (sign=-1) berdasarkan created_at
+    """
+    deltas = Tally()
+    for created_at in created_ats:
+        deltas['clients'] += sign
+        deltas[month_key('clients', created_at or datetime.utcnow())] += sign
+    increment(deltas)
+
+
+def count_assessments(total, sign=1):
+    """
+    Catat sejumlah assessment yang ditambah atau dihapus
+    """
+    increment({'assessments': sign * total})
+
+
+def count_sessions(dates, sign=1):
+    """
+    Catat sesi yang ditambah atau dihapus berdasarkan tanggal sesi
+    """
+    deltas = Tally()
+    for session_date in dates:
+        deltas['sessions'] += sign
+        deltas[month_key('sessions', session_date)] += sign
+    increment(deltas)
+
+
+def session_month_tally(session_filter):
+    """
+    Hitung sesi yang cocok dengan filter per bulan dalam satu query GROUP BY
+    Mengembalikan dict {kunci counter: jumlah} termasuk total 'sessions'
+    """
+    rows = db.session.execute(
+        select(Session.date, func.count(Session.id)).where(session_filter).group_by(Session.date)
+    ).all()
+    tally = Tally()
+    for session_date, total in rows:
+        tally['sessions'] += total
+        tally[month_key('sessions', session_date)] += total
+    return tally
+
+
+def discount(tally):
+    """
+    Kurangi counter sesuai tally (untuk penghapusan massal)
+    """
+    increment({name: -total for name, total in tally.items()})
+
+
+def compute_counters(executor=None):
+    """
+    Hitung semua counter dari awal dengan query GROUP BY
+    `executor` boleh berupa session atau connection (dipakai juga oleh migrasi)
+    """
+    executor = executor or db.session
+    counts = Tally()
+
+    counts['clients'] = executor.execute(select(func.count(Client.id))).scalar()
+    counts['assessments'] = executor.execute(select(func.count(Assessment.id))).scalar()
+    counts['sessions'] = executor.execute(select(func.count(Session.id))).scalar()
+
+    created_day = func.date(Client.created_at)
+    for day, total in executor.execute(
+        select(created_day, func.count(Client.id)).where(Client.created_at.isnot(None)).group_by(created_day)
+    ):
+        counts[month_key('clients', day)] += total
+
+    for session_date, total in executor.execute(
+        select(Session.date, func.count(Session.id)).group_by(Session.date)
+    ):
+        counts[month_key('sessions', session_date)] += total
+
+    return counts
+
+
+def repair_counters(dry_run=False):
+    """
+    Hitung ulang semua counter dari awal dan perbaiki yang menyimpang
+    Mengembalikan dict {nama: (nilai tersimpan, nilai sebenarnya)} untuk counter yang drift
+    """
+    actual = compute_counters()
+    stored = dict(db.session.execute(select(Counter.name, Counter.value)).all())
+
+    drift = {}
+    for name in set(actual) | {name for name in stored if name.split(':')[0] in TOTAL_KEYS}:
+        if stored.get(name, 0) != actual.get(name, 0):
+            drift[name] = (stored.get(name, 0), actual.get(name, 0))
+
+    if drift and not dry_run:
+        increment({name: actual_value - stored_value for name, (stored_value, actual_value) in drift.items()})
+        db.session.commit()
+    return drift
+
+
+def read_counter(name):
+    """
+    Baca satu counter (0 jika belum ada)
+    """
+    return db.session.execute(select(Counter.value).where(Counter.name == name)).scalar() or 0
+
+
+def dashboard_counters(now=None):
+    """
+    Baca semua counter untuk dashboard admin dalam satu query
+    """
+    now = now or datetime.now()
+    current_month = now.replace(day=1)
+    last_month = (current_month - timedelta(days=1)).replace(day=1)
+
+    keys = {
+        'total_clients': 'clients',
+        'total_assessments': 'assessments',
+        'total_sessions': 'sessions',
+        'new_clients_this_month': month_key('clients', current_month.date()),
+        'new_clients_last_month': month_key('clients', last_month.date()),
+        'sessions_this_month': month_key('sessions', current_month.date()),
+        'sessions_last_month': month_key('sessions', last_month.date())
+    }
+    values = dict(db.session.execute(
+        select(Counter.name, Counter.value).where(Counter.name.in_(keys.values()))
+    ).all())
+    return {field: values.get(name, 0) for field, name in keys.items()}
@@ -0,0 +1,126 @@
+"""
+Connection pool yang bisa dikonfigurasi beserta statistiknya
+Ukuran pool, overflow, timeout dan recycle diatur lewat environment (lihat
+config.py). Pre-ping bisa diganti dengan invalidasi pool saat error koneksi
+(DB_POOL_PRE_PING=False) untuk menghemat satu round trip per checkout.
+Statistik (checked-out, overflow, waktu tunggu) dicatat per proses worker.
+"""
+
+import logging
+import os
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from models import db
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """
+    Statistik checkout connection pool untuk satu proses
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self.invalidations = 0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.wait_seconds_total += seconds
+                self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+
+stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool yang mencatat lama menunggu koneksi (termasuk membuka koneksi baru)
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        stats.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def _uses_memory_sqlite(uri):
+    return uri.startswith('sqlite') and (uri in ('sqlite://', 'sqlite:///') or ':memory:' in uri)
+
+
+def configure_pool(app):
+    """
+    Pilih kelas pool yang terinstrumentasi; dipanggil sebelum db.init_app(app)
+    """
+    if _uses_memory_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+        return
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    options.setdefault('poolclass', InstrumentedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def init_pool_events(app):
+    """
+    Pasang batas waktu statement (MySQL) dan pencatatan invalidasi koneksi
+    """
+    statement_timeout = app.config.get('DB_STATEMENT_TIMEOUT_MS', 0)
+
+    with app.app_context():
+        engine = db.engine
+
+    if statement_timeout and engine.dialect.name == 'mysql':
+        @event.listens_for(engine, 'connect')
+        def set_statement_timeout(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            # Hanya berlaku untuk SELECT (MySQL 5.7.8+)
+            cursor.execute(f'SET SESSION max_execution_time = {int(statement_timeout)}')
+            cursor.close()
+
+    @event.listens_for(engine, 'handle_error')
+    def invalidate_on_disconnect(context):
+        if context.is_disconnect:
+            # Tanpa pre-ping, seluruh pool dibuang saat satu koneksi terbukti putus
+            context.invalidate_pool_on_disconnect = True
+            stats.record_invalidation()
+            logger.warning('Koneksi database terputus, pool diinvalidasi: %s', context.original_exception)
+
+
+def pool_stats():
+    """
+    Snapshot statistik pool untuk proses ini
+    """
+    pool = db.engine.pool
+    snapshot = {
+        'pid': os.getpid(),
+        'pool_class': type(pool).__name__,
+        'checkouts': stats.checkouts,
+        'wait_seconds_total': round(stats.wait_seconds_total, 6),
+        'wait_seconds_max': round(stats.wait_seconds_max, 6),
+        'timeouts': stats.timeouts,
+        'invalidations': stats.invalidations,
+    }
+    if isinstance(pool, QueuePool):
+        snapshot.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+        })
+    return snapshot
@@ -0,0 +1,98 @@
+"""
+Penghapusan workout plan dan klien dengan DELETE massal berurutan
+Menggantikan cascade ORM yang memuat setiap sesi dan detailnya ke memori lalu
+menghapusnya satu per satu. Di sini setiap tabel anak dihapus dengan satu
+DELETE ... WHERE ... IN (SELECT ...) sesuai urutan foreign key, dan jumlah baris
+diambil dari rowcount. Data turunan (counter dashboard, rollup volume, index
+nama, versi halaman, personal record) diperbarui di transaksi yang sama.
+"""
+
+from sqlalchemy import select, delete, update
+from models import (
+    db, User, Client, Assessment, WorkoutPlan, WorkoutPlanDetail, Session, SessionDetail,
+    DailyTrainingVolume, ClientNameToken, Counter, PersonalRecord
+)
+from services.counters import increment, session_month_tally, discount, count_assessments, count_clients
+from services.analytics import refresh_daily_rollups, rollup_keys_for_sessions
+from services.personal_records import records_from_details, recompute_personal_records
+from services.page_versions import bump_client_versions, client_version_key
+from services.calendar_feed import bump_calendar_buckets, calendar_key, ALL_CLIENTS, CALENDAR_PREFIX
+
+
+def delete_sessions(session_filter):
+    """
+    Hapus sesi yang cocok dengan filter beserta detailnya (detail dulu, lalu sesi)
+    Tidak memperbarui data turunan; mengembalikan dict jumlah baris per tabel
+    """
+    session_ids = select(Session.id).where(session_filter)
+    details = db.session.execute(
+        delete(SessionDetail.__table__).where(SessionDetail.session_id.in_(session_ids))
+    ).rowcount
+    sessions = db.session.execute(delete(Session.__table__).where(session_filter)).rowcount
+    return {'session_details': details, 'sessions': sessions}
+
+
+def delete_plan(plan):
+    """
+    Hapus workout plan, detail program, sesi dan detail sesinya
+    Dipanggil di dalam transaksi, sebelum commit; mengembalikan dict jumlah baris per tabel
+    """
+    session_filter = Session.workout_plan_id == plan.id
+    rollup_keys = rollup_keys_for_sessions(session_filter)
+    tally = session_month_tally(session_filter)
+    record_keys = records_from_details(SessionDetail.session_id.in_(select(Session.id).where(session_filter)))
+
+    counts = delete_sessions(session_filter)
+    counts['workout_plan_details'] = db.session.execute(
+        delete(WorkoutPlanDetail.__table__).where(WorkoutPlanDetail.plan_id == plan.id)
+    ).rowcount
+    counts['workout_plans'] = db.session.execute(
+        delete(WorkoutPlan.__table__).where(WorkoutPlan.id == plan.id)
+    ).rowcount
+
+    discount(tally)
+    refresh_daily_rollups(rollup_keys)
+    recompute_personal_records(record_keys)
+    bump_client_versions({plan.client_id} | {client_id for client_id, _ in rollup_keys})
+    bump_calendar_buckets(rollup_keys)
+    db.session.expunge(plan)
+    return counts
+
+
+def delete_client(client):
+    """
+    Hapus klien beserta seluruh riwayatnya (assessment, program, sesi, rollup, index nama)
+    Dipanggil di dalam transaksi, sebelum commit; mengembalikan dict jumlah baris per tabel
+    """
+    client_id = client.id
+    tally = session_month_tally(Session.client_id == client_id)
+
+    counts = delete_sessions(Session.client_id == client_id)
+    plan_ids = select(WorkoutPlan.id).where(WorkoutPlan.client_id == client_id)
+    counts['workout_plan_details'] = db.session.execute(
+        delete(WorkoutPlanDetail.__table__).where(WorkoutPlanDetail.plan_id.in_(plan_ids))
+    ).rowcount
+    for name, model in (
+        ('workout_plans', WorkoutPlan),
+        ('assessments', Assessment),
+        ('daily_training_volumes', DailyTrainingVolume),
+        ('personal_records', PersonalRecord),
+        ('client_name_tokens', ClientNameToken),
+    ):
+        counts[name] = db.session.execute(
+            delete(model.__table__).where(model.client_id == client_id)
+        ).rowcount
+
+    # Akun portal klien tetap ada, hanya tautannya yang dilepas
+    db.session.execute(update(User.__table__).where(User.client_id == client_id).values(client_id=None))
+    counts['clients'] = db.session.execute(delete(Client.__table__).where(Client.id == client_id)).rowcount
+    db.session.execute(delete(Counter.__table__).where(Counter.name == client_version_key(client_id)))
+    db.session.execute(delete(Counter.__table__).where(Counter.name.like(f'{CALENDAR_PREFIX}{client_id}:%')))
+
+    discount(tally)
+    # Kunci tally 'sessions:YYYY-MM' -> bulan kalender seluruh gym yang berisi sesi klien ini
+    increment({calendar_key(ALL_CLIENTS, name.split(':', 1)[1]): 1 for name in tally if name.startswith('sessions:')})
+    count_assessments(counts['assessments'], sign=-1)
+    count_clients([client.created_at], sign=-1)
+    db.session.expunge(client)
+    return counts
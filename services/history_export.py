@@ -0,0 +1,187 @@
+"""
+Ekspor riwayat latihan (sesi + detail sesi + assessment) secara streaming
+Baris dibaca dengan yield_per (server-side cursor di MySQL) dan langsung ditulis
+ke output per potongan kecil, jadi memori tetap datar berapa pun panjang riwayat.
+
+Urutan baris: tanggal, klien, id. Ekspor yang terputus bisa dilanjutkan dengan
+date_from = tanggal terakhir yang diterima lengkap, dan sections = bagian yang
+belum selesai (sesi lebih dulu, lalu assessment).
+"""
+
+import csv
+import io
+import json
+from datetime import date, time, datetime
+from decimal import Decimal
+from sqlalchemy import select
+from models import db, Client, Session, SessionDetail, Assessment
+
+SECTIONS = ('sessions', 'assessments')
+
+# Jumlah baris yang diambil dari database per putaran
+YIELD_PER = 1000
+
+# Jumlah record per potongan output
+CHUNK_ROWS = 500
+
+SESSION_COLUMNS = (
+    'id', 'date', 'start_time', 'end_time', 'duration', 'workout_plan_id', 'completed', 'total_weight',
+    'total_reps', 'calories_burned', 'session_type', 'notes', 'client_feedback', 'trainer_notes'
+)
+DETAIL_COLUMNS = (
+    'id', 'exercise_id', 'exercise_name', 'sets', 'reps', 'weight', 'rest_time', 'notes',
+    'actual_reps_1', 'actual_reps_2', 'actual_reps_3', 'actual_reps_4'
+)
+ASSESSMENT_COLUMNS = (
+    'id', 'date', 'weight', 'height', 'body_fat', 'muscle_mass', 'chest', 'waist', 'hips', 'arm', 'thigh',
+    'neck', 'squat_max', 'bench_max', 'deadlift_max', 'pushup_test', 'pullup_test', 'notes'
+)
+
+# Header CSV: satu baris per detail sesi atau per assessment
+CSV_COLUMNS = (
+    ['record', 'client_id', 'client_name']
+    + [f'session_{column}' for column in SESSION_COLUMNS]
+    + [f'detail_{column}' for column in DETAIL_COLUMNS]
+    + [f'assessment_{column}' for column in ASSESSMENT_COLUMNS]
+)
+
+
+def _labelled(model, columns, prefix):
+    return [getattr(model, column).label(f'{prefix}{column}') for column in columns]
+
+
+def _date_filters(column, date_from, date_to):
+    filters = []
+    if date_from:
+        filters.append(column >= date_from)
+    if date_to:
+        filters.append(column <= date_to)
+    return filters
+
+
+def _stream(statement):
+    """
+    Jalankan SELECT dengan yield_per; baris dibaca per partisi, bukan sekaligus
+    """
+    result = db.session.execute(statement.execution_options(yield_per=YIELD_PER))
+    for row in result:
+        yield row._mapping
+
+
+def session_rows(client_id=None, date_from=None, date_to=None):
+    """
+    Baris sesi digabung dengan detailnya (sesi tanpa detail tetap muncul sekali)
+    """
+    statement = (
+        select(
+            Session.client_id, Client.name.label('client_name'),
+            *_labelled(Session, SESSION_COLUMNS, 'session_'),
+            *_labelled(SessionDetail, DETAIL_COLUMNS, 'detail_')
+        )
+        .join(Client, Client.id == Session.client_id)
+        .outerjoin(SessionDetail, SessionDetail.session_id == Session.id)
+        .where(*_date_filters(Session.date, date_from, date_to))
+        .order_by(Session.date, Session.client_id, Session.id, SessionDetail.id)
+    )
+    if client_id is not None:
+        statement = statement.where(Session.client_id == client_id)
+    return _stream(statement)
+
+
+def assessment_rows(client_id=None, date_from=None, date_to=None):
+    """
+    Baris assessment
+    """
+    statement = (
+        select(Assessment.client_id, Client.name.label('client_name'),
+               *_labelled(Assessment, ASSESSMENT_COLUMNS, 'assessment_'))
+        .join(Client, Client.id == Assessment.client_id)
+        .where(*_date_filters(Assessment.date, date_from, date_to))
+        .order_by(Assessment.date, Assessment.client_id, Assessment.id)
+    )
+    if client_id is not None:
+        statement = statement.where(Assessment.client_id == client_id)
+    return _stream(statement)
+
+
+def _json_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, time, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _csv_records(client_id, date_from, date_to, sections):
+    if 'sessions' in sections:
+        for row in session_rows(client_id, date_from, date_to):
+            yield {'record': 'session', **row}
+    if 'assessments' in sections:
+        for row in assessment_rows(client_id, date_from, date_to):
+            yield {'record': 'assessment', **row}
+
+
+def _jsonl_records(client_id, date_from, date_to, sections):
+    """
+    Satu objek per sesi (detail sebagai list) dan satu objek per assessment
+    Baris join sesi-detail berurutan per sesi, jadi cukup menahan satu sesi di memori
+    """
+    if 'sessions' in sections:
+        current = None
+        for row in session_rows(client_id, date_from, date_to):
+            if current is None or current['id'] != row['session_id']:
+                if current is not None:
+                    yield current
+                current = {
+                    'record': 'session', 'client_id': row['client_id'], 'client_name': row['client_name'],
+                    **{column: _json_value(row[f'session_{column}']) for column in SESSION_COLUMNS},
+                    'details': [],
+                }
+            if row['detail_id'] is not None:
+                current['details'].append(
+                    {column: _json_value(row[f'detail_{column}']) for column in DETAIL_COLUMNS}
+                )
+        if current is not None:
+            yield current
+    if 'assessments' in sections:
+        for row in assessment_rows(client_id, date_from, date_to):
+            yield {
+                'record': 'assessment', 'client_id': row['client_id'], 'client_name': row['client_name'],
+                **{column: _json_value(row[f'assessment_{column}']) for column in ASSESSMENT_COLUMNS},
+            }
+
+
+def export_history(fmt='csv', client_id=None, date_from=None, date_to=None, sections=SECTIONS):
+    """
+    Generator potongan teks CSV atau JSON-lines untuk satu klien atau semua klien
+    """
+    buffer = io.StringIO()
+    pending = 0
+
+    def drain():
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    if fmt == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        for record in _csv_records(client_id, date_from, date_to, sections):
+            writer.writerow(record)
+            pending += 1
+            if pending >= CHUNK_ROWS:
+                yield drain()
+                pending = 0
+    else:
+        for record in _jsonl_records(client_id, date_from, date_to, sections):
+            buffer.write(json.dumps(record, ensure_ascii=False))
+            buffer.write('\n')
+            pending += 1
+            if pending >= CHUNK_ROWS:
+                yield drain()
+                pending = 0
+
+    chunk = drain()
+    if chunk:
+        yield chunk
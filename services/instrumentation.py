@@ -0,0 +1,93 @@
+"""
+Instrumentasi query SQL per request
+Menghitung jumlah statement SQL yang dijalankan setiap request dan
+membandingkannya dengan budget per endpoint (decorator @query_budget).
+Test dapat memakai count_queries() atau header X-Query-Count.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from flask import g, has_app_context, current_app
+from sqlalchemy import event
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# Counter aktif dari count_queries(), per thread
+_local = threading.local()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Dilempar jika request melebihi budget query dan mode strict aktif"""
+
+
+class QueryCounter:
+    """
+    Hasil count_queries(): jumlah dan daftar statement SQL yang dijalankan
+    """
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context():
+        g.query_count = g.get('query_count', 0) + 1
+    for counter in getattr(_local, 'counters', ()):
+        counter.count += 1
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """
+    Hitung query SQL yang dijalankan di dalam blok with
+    Contoh:
+        with count_queries() as counter:
+            client.get('/sessions/1')
+        assert counter.count <= 6
+    """
+    counter = QueryCounter()
+    counters = _local.__dict__.setdefault('counters', [])
+    counters.append(counter)
+    try:
+        yield counter
+    finally:
+        counters.remove(counter)
+
+
+def query_budget(limit):
+    """
+    Decorator untuk menetapkan jumlah maksimum query SQL sebuah endpoint
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            g.query_budget = limit
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def init_query_budget(app):
+    """
+    Pasang penghitung query ke engine dan pemeriksaan budget setelah setiap request
+    """
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+
+    @app.after_request
+    def check_query_budget(response):
+        query_count = g.get('query_count', 0)
+        if current_app.config.get('SQL_QUERY_COUNT_HEADER'):
+            response.headers['X-Query-Count'] = str(query_count)
+
+        budget = g.get('query_budget')
+        if budget is not None and query_count > budget:
+            message = f'{query_count} query melebihi budget {budget}'
+            if current_app.config.get('SQL_QUERY_BUDGET_STRICT'):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
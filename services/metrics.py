@@ -0,0 +1,211 @@
+"""
+Metrik per request dan per query SQL dalam format teks Prometheus
+Jika METRICS_ENABLED aktif, setiap request (semua blueprint) mencatat latensi
+(histogram), jumlah query dan total waktu database per endpoint; query yang
+lebih lambat dari SLOW_QUERY_MS dicatat ke log beserta parameternya. Hasilnya
+tersedia di /metrics: dengan METRICS_TOKEN untuk scraper (Bearer token), tanpa
+token hanya untuk admin yang login. Jika nonaktif, tidak ada listener yang
+dipasang sama sekali.
+
+Metrik disimpan per proses: di Gunicorn setiap worker punya angka sendiri
+(label pid membedakannya).
+"""
+
+import hmac
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from flask import g, has_app_context, has_request_context, request, request_started, request_finished, got_request_exception, abort
+from flask_login import current_user
+from sqlalchemy import event
+from models import db
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger(__name__ + '.slow_query')
+
+# Batas bucket histogram latensi (detik)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Panjang maksimum parameter yang ditulis ke slow-query log
+MAX_LOGGED_PARAMETERS = 500
+
+
+class MetricsRegistry:
+    """
+    Penampung metrik request dan database untuk satu proses
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)          # (endpoint, method, status) -> jumlah
+        self.latency_buckets = defaultdict(lambda: [0] * len(LATENCY_BUCKETS))
+        self.latency_sum = defaultdict(float)     # (endpoint, method) -> detik
+        self.latency_count = defaultdict(int)
+        self.queries = defaultdict(int)           # endpoint -> jumlah query
+        self.db_seconds = defaultdict(float)      # endpoint -> detik
+        self.slow_queries = defaultdict(int)      # endpoint -> jumlah query lambat
+
+    def observe_request(self, endpoint, method, status, seconds, queries, db_seconds, slow_queries):
+        key = (endpoint, method)
+        with self._lock:
+            self.requests[(endpoint, method, status)] += 1
+            buckets = self.latency_buckets[key]
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    buckets[index] += 1
+            self.latency_sum[key] += seconds
+            self.latency_count[key] += 1
+            self.queries[endpoint] += queries
+            self.db_seconds[endpoint] += db_seconds
+            self.slow_queries[endpoint] += slow_queries
+
+
+registry = MetricsRegistry()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def render_metrics():
+    """
+    Susun semua metrik dalam format teks Prometheus (version 0.0.4)
+    """
+    from services.db_pool import pool_stats
+
+    pid = os.getpid()
+    lines = []
+
+    def header(name, kind, help_text):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    with registry._lock:
+        header('http_requests_total', 'counter', 'Jumlah request per endpoint dan status')
+        for (endpoint, method, status), total in sorted(registry.requests.items()):
+            lines.append(f'http_requests_total{_labels(pid=pid, endpoint=endpoint, method=method, status=status)} {total}')
+
+        header('http_request_duration_seconds', 'histogram', 'Latensi request per endpoint')
+        for (endpoint, method), buckets in sorted(registry.latency_buckets.items()):
+            for bound, total in zip(LATENCY_BUCKETS, buckets):
+                labels = _labels(pid=pid, endpoint=endpoint, method=method, le=bound)
+                lines.append(f'http_request_duration_seconds_bucket{labels} {total}')
+            count = registry.latency_count[(endpoint, method)]
+            labels = _labels(pid=pid, endpoint=endpoint, method=method, le='+Inf')
+            lines.append(f'http_request_duration_seconds_bucket{labels} {count}')
+            labels = _labels(pid=pid, endpoint=endpoint, method=method)
+            lines.append(f'http_request_duration_seconds_sum{labels} {registry.latency_sum[(endpoint, method)]:.6f}')
+            lines.append(f'http_request_duration_seconds_count{labels} {count}')
+
+        header('db_queries_total', 'counter', 'Jumlah query SQL per endpoint')
+        for endpoint, total in sorted(registry.queries.items()):
+            lines.append(f'db_queries_total{_labels(pid=pid, endpoint=endpoint)} {total}')
+
+        header('db_query_seconds_total', 'counter', 'Total waktu query SQL per endpoint')
+        for endpoint, seconds in sorted(registry.db_seconds.items()):
+            lines.append(f'db_query_seconds_total{_labels(pid=pid, endpoint=endpoint)} {seconds:.6f}')
+
+        header('db_slow_queries_total', 'counter', 'Jumlah query yang melebihi SLOW_QUERY_MS per endpoint')
+        for endpoint, total in sorted(registry.slow_queries.items()):
+            lines.append(f'db_slow_queries_total{_labels(pid=pid, endpoint=endpoint)} {total}')
+
+    pool = pool_stats()
+    for name, key, kind in (
+        ('db_pool_size', 'size', 'gauge'),
+        ('db_pool_checked_out', 'checked_out', 'gauge'),
+        ('db_pool_overflow', 'overflow', 'gauge'),
+        ('db_pool_checkouts_total', 'checkouts', 'counter'),
+        ('db_pool_wait_seconds_total', 'wait_seconds_total', 'counter'),
+        ('db_pool_wait_seconds_max', 'wait_seconds_max', 'gauge'),
+        ('db_pool_timeouts_total', 'timeouts', 'counter'),
+        ('db_pool_invalidations_total', 'invalidations', 'counter'),
+    ):
+        if key in pool:
+            header(name, kind, f'Connection pool: {key}')
+            lines.append(f'{name}{_labels(pid=pid)} {pool[key]}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+    if not has_app_context():
+        return
+    g.db_seconds = g.get('db_seconds', 0.0) + elapsed
+
+    threshold = g.get('slow_query_seconds')
+    if threshold is not None and elapsed >= threshold:
+        g.slow_queries = g.get('slow_queries', 0) + 1
+        slow_query_logger.warning(
+            'Query lambat %.1f ms di %s: %s | parameter: %s',
+            elapsed * 1000, request.endpoint if has_request_context() else None,
+            statement, repr(parameters)[:MAX_LOGGED_PARAMETERS]
+        )
+
+
+def _request_started(sender, **extra):
+    g.metrics_start = time.perf_counter()
+    g.slow_query_seconds = sender.config['SLOW_QUERY_MS'] / 1000.0
+
+
+def _record(status):
+    start = g.get('metrics_start')
+    if start is None:
+        return
+    g.metrics_start = None
+    registry.observe_request(
+        endpoint=request.endpoint or 'unmatched',
+        method=request.method,
+        status=status,
+        seconds=time.perf_counter() - start,
+        queries=g.get('query_count', 0),
+        db_seconds=g.get('db_seconds', 0.0),
+        slow_queries=g.get('slow_queries', 0)
+    )
+
+
+def _request_finished(sender, response, **extra):
+    _record(response.status_code)
+
+
+def _request_exception(sender, exception, **extra):
+    _record(500)
+
+
+def init_metrics(app):
+    """
+    Pasang pencatat metrik dan endpoint /metrics jika METRICS_ENABLED aktif
+    """
+    if not app.config.get('METRICS_ENABLED'):
+        return
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+
+    request_started.connect(_request_started, app)
+    request_finished.connect(_request_finished, app)
+    got_request_exception.connect(_request_exception, app)
+
+    def metrics():
+        token = app.config.get('METRICS_TOKEN')
+        if token:
+            # Scraper Prometheus: header Authorization: Bearer <METRICS_TOKEN>
+            if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+                abort(401)
+        elif not current_user.is_authenticated:
+            abort(401)
+        elif not current_user.is_admin():
+            abort(403)
+        return render_metrics(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+    app.add_url_rule('/metrics', 'metrics', metrics)
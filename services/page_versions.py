@@ -0,0 +1,152 @@
+"""
+Conditional GET (ETag / Last-Modified) untuk halaman detail
+Setiap perubahan pada data milik klien (klien, assessment, program, sesi dan
+detailnya) menaikkan counter 'client_version:<id>' di transaksi yang sama.
+Halaman detail cukup membaca versi itu (satu query kecil) untuk menjawab 304
+tanpa memuat objek dan tanpa merender template.
+"""
+
+import hashlib
+import time
+from datetime import date, datetime
+from functools import wraps
+from flask import current_app, request, session, make_response
+from flask.globals import request_ctx
+from flask_login import current_user
+from sqlalchemy import event, select, cast, literal, String
+from models import db, Counter, Client, Assessment, WorkoutPlan, WorkoutPlanDetail, Session, SessionDetail
+from services.counters import increment
+
+VERSION_PREFIX = 'client_version:'
+
+# Model halaman detail -> kolom client_id-nya
+PAGE_MODELS = {
+    'client': (Client, Client.id),
+    'assessment': (Assessment, Assessment.client_id),
+    'workout_plan': (WorkoutPlan, WorkoutPlan.client_id),
+    'session': (Session, Session.client_id),
+}
+
+
+def client_version_key(client_id):
+    return f'{VERSION_PREFIX}{client_id}'
+
+
+def bump_client_versions(client_ids):
+    """
+    Naikkan versi halaman untuk klien-klien tertentu
+    Panggil manual untuk penulisan massal yang tidak lewat ORM (insert()/delete())
+    """
+    increment({client_version_key(client_id): 1 for client_id in set(client_ids) if client_id})
+
+
+def _owner_client_id(instance):
+    if isinstance(instance, Client):
+        return instance.id
+    if isinstance(instance, (Assessment, WorkoutPlan, Session)):
+        return instance.client_id
+    if isinstance(instance, WorkoutPlanDetail):
+        return instance.workout_plan.client_id if instance.workout_plan else None
+    if isinstance(instance, SessionDetail):
+        return instance.session.client_id if instance.session else None
+    return None
+
+
+def _before_flush(flush_session, flush_context, instances):
+    changed = [
+        *flush_session.new,
+        *flush_session.deleted,
+        *(instance for instance in flush_session.dirty if flush_session.is_modified(instance))
+    ]
+    with flush_session.no_autoflush:
+        client_ids = {_owner_client_id(instance) for instance in changed}
+    bump_client_versions(client_ids)
+
+
+def page_version(kind, id):
+    """
+    Ambil (client_id, versi, waktu perubahan terakhir) untuk satu halaman detail
+    Mengembalikan None jika baris tidak ditemukan
+    """
+    model, client_id_column = PAGE_MODELS[kind]
+    version_key = literal(VERSION_PREFIX) + cast(client_id_column, String)
+    return db.session.execute(
+        select(client_id_column, Counter.value, Counter.updated_at)
+        .select_from(model)
+        .outerjoin(Counter, Counter.name == version_key)
+        .where(model.id == id)
+    ).first()
+
+
+def _csrf_window():
+    """
+    Jendela waktu token CSRF: halaman yang di-cache tidak boleh membawa token kedaluwarsa
+    """
+    time_limit = current_app.config.get('WTF_CSRF_TIME_LIMIT', 3600)
+    if not current_app.config.get('WTF_CSRF_ENABLED', True) or not time_limit:
+        return 0
+    return int(time.time() // max(time_limit // 2, 1))
+
+
+def _uncacheable(response):
+    """
+    Halaman berisi pesan flash tidak boleh dipakai ulang dari cache browser
+    """
+    response = make_response(response)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+def conditional_page(kind, id_arg='id'):
+    """
+    Decorator untuk halaman detail: jawab 304 jika versi data klien tidak berubah
+    ETag juga bergantung pada user, tanggal hari ini dan jendela token CSRF.
+    Hanya If-None-Match yang bisa menghasilkan 304: Last-Modified tidak membawa
+    identitas user, jadi If-Modified-Since saja tidak cukup di browser bersama.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('CONDITIONAL_GET_ENABLED', True):
+                return view(*args, **kwargs)
+            if session.get('_flashes'):
+                # Pesan flash yang tertunda harus selalu dirender
+                return _uncacheable(view(*args, **kwargs))
+
+            version = page_version(kind, kwargs[id_arg])
+            if version is None:
+                return view(*args, **kwargs)
+
+            client_id, value, updated_at = version
+            today = date.today()
+            etag = hashlib.sha1(
+                f'{request.endpoint}:{kwargs[id_arg]}:{client_id}:{value or 0}:'
+                f'{current_user.get_id()}:{today}:{_csrf_window()}'.encode()
+            ).hexdigest()
+            last_modified = max(updated_at or datetime.min, datetime.combine(today, datetime.min.time()))
+            last_modified = last_modified.replace(microsecond=0)
+
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if request_ctx.flashes:
+                    # View menampilkan pesan flash: halaman ini tidak boleh divalidasi ulang jadi 304
+                    return _uncacheable(response)
+
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.vary.add('Cookie')
+            return response
+        return wrapper
+    return decorator
+
+
+def init_page_versions(app):
+    """
+    Pasang listener yang menaikkan versi klien setiap kali data miliknya di-flush
+    """
+    event.listen(db.session, 'before_flush', _before_flush)
@@ -0,0 +1,136 @@
+"""
+Keyset (seek) pagination dengan token cursor
+Halaman berikutnya dicari dengan kondisi WHERE pada kunci urutan (contoh:
+(date, id) < (cursor)) alih-alih OFFSET, sehingga halaman ke-1000 sama
+murahnya dengan halaman pertama. Jumlah total bersifat opsional dan di-cache.
+"""
+
+import base64
+import json
+import time
+from datetime import date, datetime
+from sqlalchemy import and_, or_
+
+# Cache jumlah total: {kunci: (jumlah, waktu)}
+_count_cache = {}
+COUNT_CACHE_MAX_ENTRIES = 1000
+
+
+class KeysetPage:
+    """
+    Satu halaman hasil keyset pagination
+    Bisa di-iterasi seperti objek Pagination milik Flask-SQLAlchemy
+    """
+    def __init__(self, items, per_page, has_next, has_prev, next_cursor, prev_cursor, total=None):
+        self.items = items
+        self.per_page = per_page
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(values):
+    """
+    Ubah nilai kunci menjadi token cursor yang opaque (base64 URL-safe)
+    """
+    payload = json.dumps([value.isoformat() if isinstance(value, (date, datetime)) else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, keys):
+    """
+    Ubah token cursor kembali menjadi nilai kunci sesuai tipe kolom
+    Mengembalikan None jika token tidak valid
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        if not isinstance(values, list) or len(values) != len(keys):
+            return None
+
+        decoded = []
+        for key, value in zip(keys, values):
+            python_type = key.type.python_type
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+            else:
+                value = python_type(value)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError, NotImplementedError):
+        return None
+
+
+def _seek_condition(keys, values, before):
+    """
+    Kondisi seek untuk urutan menurun pada semua kunci
+    Contoh untuk (date, id): date < d OR (date = d AND id < i)
+    """
+    compare = (lambda key, value: key > value) if before else (lambda key, value: key < value)
+    conditions = []
+    for index, (key, value) in enumerate(zip(keys, values)):
+        equal_prefix = [keys[i] == values[i] for i in range(index)]
+        conditions.append(and_(*equal_prefix, compare(key, value)))
+    return or_(*conditions)
+
+
+def keyset_paginate(query, keys, per_page, after=None, before=None, total=None):
+    """
+    Ambil satu halaman dari query yang diurutkan menurun berdasarkan `keys`
+    `after` / `before` adalah token cursor dari halaman sebelumnya
+    """
+    after_values = decode_cursor(after, keys) if after else None
+    before_values = decode_cursor(before, keys) if before else None
+
+    if before_values:
+        rows = query.filter(_seek_condition(keys, before_values, before=True))\
+            .order_by(*[key.asc() for key in keys])\
+            .limit(per_page + 1).all()
+        has_prev = len(rows) > per_page
+        items = rows[:per_page][::-1]
+        has_next = True
+    else:
+        if after_values:
+            query = query.filter(_seek_condition(keys, after_values, before=False))
+        rows = query.order_by(*[key.desc() for key in keys]).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        items = rows[:per_page]
+        has_prev = after_values is not None
+
+    def cursor_for(item):
+        return encode_cursor([getattr(item, key.key) for key in keys])
+
+    return KeysetPage(
+        items=items,
+        per_page=per_page,
+        has_next=has_next and bool(items),
+        has_prev=has_prev and bool(items),
+        next_cursor=cursor_for(items[-1]) if items else None,
+        prev_cursor=cursor_for(items[0]) if items else None,
+        total=total
+    )
+
+
+def cached_count(key, query, ttl=60):
+    """
+    COUNT(*) untuk query, di-cache per proses selama `ttl` detik
+    """
+    now = time.monotonic()
+    cached = _count_cache.get(key)
+    if cached and now - cached[1] < ttl:
+        return cached[0]
+
+    if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+        _count_cache.clear()
+    total = query.order_by(None).count()
+    _count_cache[key] = (total, now)
+    return total
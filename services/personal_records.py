@@ -0,0 +1,297 @@
+"""
+Personal record (PR) klien per latihan
+Tiga rekor disimpan per (klien, latihan): beban terberat, reps terbanyak dalam
+satu set, dan estimasi 1RM tertinggi. Rekor diperbarui secara inkremental di
+jalur penulisan actual reps: set baru cukup dibandingkan dengan rekor yang
+tersimpan. Riwayat hanya dipindai ulang untuk satu (klien, latihan) jika detail
+sumber sebuah rekor dikoreksi turun atau dihapus.
+
+Halaman klien cukup membaca tabel personal_records (satu query per klien).
+Isi awal dibangun dengan satu pass streaming: flask records-rebuild
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import select, delete, insert, update, or_, tuple_, bindparam
+from models import db, Session, SessionDetail, PersonalRecord
+from services.analytics import ACTUAL_REPS_FIELDS
+from services.page_versions import bump_client_versions
+
+CATEGORIES = ('best_weight', 'best_reps', 'best_e1rm')
+
+# Kolom pembanding per kategori, urut prioritas; seri = rekor lama (tercapai lebih dulu) dipertahankan
+RANK_COLUMNS = {
+    'best_weight': ('best_weight', 'best_weight_reps'),
+    'best_reps': ('best_reps', 'best_reps_weight'),
+    'best_e1rm': ('best_e1rm', 'best_e1rm_weight'),
+}
+
+RECORD_COLUMNS = (
+    'client_id', 'exercise_id', 'exercise_name',
+    'best_weight', 'best_weight_reps', 'best_weight_date', 'best_weight_detail_id',
+    'best_reps', 'best_reps_weight', 'best_reps_date', 'best_reps_detail_id',
+    'best_e1rm', 'best_e1rm_weight', 'best_e1rm_reps', 'best_e1rm_date', 'best_e1rm_detail_id',
+)
+
+# Rumus Epley tidak akurat untuk set panjang; set di atas batas ini tidak dipakai untuk 1RM
+E1RM_MAX_REPS = 12
+
+# Jumlah baris riwayat yang diambil per putaran saat rebuild
+YIELD_PER = 1000
+
+
+def estimate_1rm(weight, reps):
+    """
+    Estimasi 1RM dengan rumus Epley: beban x (1 + reps / 30); 1 rep = beban itu sendiri
+    """
+    if reps == 1:
+        return weight
+    return (weight * (1 + Decimal(reps) / 30)).quantize(Decimal('0.01'))
+
+
+def detail_candidates(detail_id, day, weight, reps_values):
+    """
+    Kandidat rekor terbaik dari satu detail sesi: {kategori: {kolom: nilai}}
+    weight dalam kg (None untuk band/bodyweight), reps_values = actual reps per set
+    """
+    reps = max((int(value) for value in reps_values if value), default=0)
+    if reps <= 0:
+        return {}
+
+    candidates = {
+        'best_reps': {'best_reps': reps, 'best_reps_weight': weight,
+                      'best_reps_date': day, 'best_reps_detail_id': detail_id},
+    }
+    if weight:
+        candidates['best_weight'] = {'best_weight': weight, 'best_weight_reps': reps,
+                                     'best_weight_date': day, 'best_weight_detail_id': detail_id}
+        e1rm_reps = max((int(value) for value in reps_values if value and int(value) <= E1RM_MAX_REPS), default=0)
+        if e1rm_reps > 0:
+            candidates['best_e1rm'] = {'best_e1rm': estimate_1rm(weight, e1rm_reps), 'best_e1rm_weight': weight,
+                                       'best_e1rm_reps': e1rm_reps, 'best_e1rm_date': day,
+                                       'best_e1rm_detail_id': detail_id}
+    return candidates
+
+
+def _rank(values, category):
+    return tuple(values.get(column) or 0 for column in RANK_COLUMNS[category])
+
+
+def _beats(candidate, record, category):
+    """
+    Kandidat menang jika lebih baik, atau seri tetapi tercapai lebih dulu
+    (sama dengan hasil pass riwayat berurutan tanggal)
+    """
+    candidate_rank, record_rank = _rank(candidate, category), _rank(record, category)
+    if candidate_rank != record_rank or record[f'{category}_date'] is None:
+        return candidate_rank > record_rank
+    return (
+        (candidate[f'{category}_date'], candidate[f'{category}_detail_id'])
+        < (record[f'{category}_date'], record[f'{category}_detail_id'])
+    )
+
+
+def _empty_record(client_id, exercise_id, exercise_name):
+    record = dict.fromkeys(RECORD_COLUMNS)
+    record.update(client_id=client_id, exercise_id=exercise_id, exercise_name=exercise_name)
+    return record
+
+
+def _merge(record, candidates):
+    """
+    Gabungkan kandidat ke rekor; kandidat hanya menang jika lebih baik (bukan seri)
+    """
+    for category, candidate in candidates.items():
+        if _rank(candidate, category) > _rank(record, category):
+            record.update(candidate)
+
+
+def _accumulate(rows, records):
+    """
+    Hitung rekor dari baris (client_id, date, detail) berurutan tanggal ke dalam dict records
+    """
+    for row in rows:
+        key = (row.client_id, row.exercise_name)
+        record = records.get(key)
+        if record is None:
+            record = records[key] = _empty_record(row.client_id, row.exercise_id, row.exercise_name)
+        candidates = detail_candidates(
+            row.id, row.date, row.weight_kg, [getattr(row, field) for field in ACTUAL_REPS_FIELDS]
+        )
+        _merge(record, candidates)
+    return records
+
+
+def _history_statement():
+    return (
+        select(Session.client_id, Session.date, SessionDetail.id, SessionDetail.exercise_id,
+               SessionDetail.exercise_name, SessionDetail.weight_kg,
+               *[getattr(SessionDetail, field) for field in ACTUAL_REPS_FIELDS])
+        .join(Session, Session.id == SessionDetail.session_id)
+        .where(or_(*[getattr(SessionDetail, field).isnot(None) for field in ACTUAL_REPS_FIELDS]))
+    )
+
+
+def _delete_records(keys):
+    db.session.execute(
+        delete(PersonalRecord.__table__).where(
+            tuple_(PersonalRecord.client_id, PersonalRecord.exercise_name).in_(keys)
+        )
+    )
+
+
+def _write_records(keys, records, existing=None):
+    """
+    Tulis rekor untuk kunci (client_id, exercise_name) yang berubah
+    existing = kunci yang sudah punya baris: baris itu di-UPDATE, sisanya di-INSERT,
+    dan rekor yang kosong dihapus. None = tidak diketahui, semua baris diganti
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    if existing is None:
+        _delete_records(keys)
+        existing = set()
+    existing = keys & existing
+
+    valid = {key for key in keys if key in records and records[key]['best_reps']}
+    if existing - valid:
+        _delete_records(existing - valid)
+
+    now = datetime.utcnow()
+    table = PersonalRecord.__table__
+    if existing & valid:
+        # executemany: satu statement UPDATE untuk semua rekor yang sudah ada (SET = kunci dict)
+        db.session.execute(
+            update(table).where(table.c.client_id == bindparam('key_client_id'),
+                                table.c.exercise_name == bindparam('key_exercise_name')),
+            [
+                {'key_client_id': key[0], 'key_exercise_name': key[1], 'updated_at': now,
+                 **{column: records[key][column] for column in RECORD_COLUMNS[2:]}}
+                for key in sorted(existing & valid)
+            ]
+        )
+    if valid - existing:
+        db.session.execute(insert(table), [
+            {**{column: records[key][column] for column in RECORD_COLUMNS}, 'updated_at': now}
+            for key in sorted(valid - existing)
+        ])
+
+
+def recompute_personal_records(keys, existing=None):
+    """
+    Hitung ulang rekor (client_id, exercise_name) tertentu dari riwayatnya
+    Dipanggil di dalam transaksi penulisan, sebelum commit; versi halaman klien ikut dinaikkan
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    db.session.flush()
+    records = _accumulate(db.session.execute(
+        _history_statement()
+        .where(tuple_(Session.client_id, SessionDetail.exercise_name).in_(keys))
+        .order_by(Session.date, SessionDetail.id)
+    ), {})
+    _write_records(keys, records, existing)
+    bump_client_versions(client_id for client_id, _ in keys)
+
+
+def record_sets(details):
+    """
+    Perbarui rekor setelah actual reps SessionDetail berubah (detail.session harus dimuat)
+    Kandidat baru dibandingkan dengan rekor tersimpan; riwayat hanya dipindai
+    jika detail yang diubah adalah sumber rekor dan nilainya turun
+    """
+    details = list(details)
+    if not details:
+        return
+
+    keys = {(detail.session.client_id, detail.exercise_name) for detail in details}
+    records = {
+        (row.client_id, row.exercise_name): {column: getattr(row, column) for column in RECORD_COLUMNS}
+        for row in db.session.execute(
+            select(PersonalRecord.__table__).where(
+                tuple_(PersonalRecord.client_id, PersonalRecord.exercise_name).in_(keys)
+            )
+        )
+    }
+
+    existing = set(records)
+    changed = set()
+    stale = set()
+    for detail in details:
+        key = (detail.session.client_id, detail.exercise_name)
+        record = records.get(key)
+        if record is None:
+            record = records[key] = _empty_record(key[0], detail.exercise_id, detail.exercise_name)
+        candidates = detail_candidates(
+            detail.id, detail.session.date, detail.weight_kg,
+            [getattr(detail, field) for field in ACTUAL_REPS_FIELDS]
+        )
+        for category in CATEGORIES:
+            candidate = candidates.get(category)
+            if record[f'{category}_detail_id'] == detail.id:
+                # Detail ini sumber rekor: naik/sama cukup ditimpa, turun harus dihitung ulang
+                if candidate is not None and _rank(candidate, category) >= _rank(record, category):
+                    record.update(candidate)
+                    changed.add(key)
+                else:
+                    stale.add(key)
+            elif candidate is not None and _beats(candidate, record, category):
+                record.update(candidate)
+                changed.add(key)
+
+    if stale:
+        recompute_personal_records(stale, existing)
+    _write_records(changed - stale, records, existing)
+
+
+def records_from_details(detail_filter):
+    """
+    Kunci rekor yang bersumber dari detail sesi yang cocok dengan filter
+    Ambil sebelum detail dihapus/dipindah, lalu hitung ulang dengan recompute_personal_records
+    """
+    detail_ids = select(SessionDetail.id).where(detail_filter)
+    return set(db.session.execute(
+        select(PersonalRecord.client_id, PersonalRecord.exercise_name).where(or_(
+            *[getattr(PersonalRecord, f'{category}_detail_id').in_(detail_ids) for category in CATEGORIES]
+        ))
+    ).all())
+
+
+def client_personal_records(client_id):
+    """
+    Rekor seorang klien, urut nama latihan (satu query ke personal_records)
+    """
+    return db.session.execute(
+        select(PersonalRecord).where(PersonalRecord.client_id == client_id).order_by(PersonalRecord.exercise_name)
+    ).scalars().all()
+
+
+def rebuild_personal_records(batch_size=1000):
+    """
+    Bangun ulang seluruh personal_records dalam satu pass streaming atas riwayat
+    Riwayat dibaca dengan yield_per; memori sebanding jumlah (klien, latihan), bukan jumlah set.
+    Versi halaman semua klien yang rekornya lama atau baru ikut dinaikkan.
+    Mengembalikan jumlah rekor yang ditulis
+    """
+    client_ids = set(db.session.scalars(select(PersonalRecord.client_id).distinct()))
+    db.session.execute(delete(PersonalRecord.__table__))
+    result = db.session.execute(
+        _history_statement()
+        .order_by(Session.date, SessionDetail.id)
+        .execution_options(yield_per=YIELD_PER)
+    )
+    records = _accumulate(result, {})
+
+    now = datetime.utcnow()
+    rows = [
+        {**{column: record[column] for column in RECORD_COLUMNS}, 'updated_at': now}
+        for key, record in sorted(records.items())
+        if record['best_reps']
+    ]
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(insert(PersonalRecord.__table__), rows[start:start + batch_size])
+    bump_client_versions(client_ids | {row['client_id'] for row in rows})
+    db.session.commit()
+    return len(rows)
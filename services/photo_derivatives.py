@@ -0,0 +1,118 @@
+"""
+Turunan foto (thumbnail dan medium) untuk halaman yang tidak butuh file asli
+Setelah upload di-commit, turunan dibuat oleh worker pool di luar thread request
+dan disimpan di samping file asli: ab/cd/<hash>.<ukuran>.jpg. Template memakai
+photo_url(nama, ukuran); file asli hanya dilayani jika diminta dengan 'original'.
+Pillow bersifat opsional: tanpa Pillow turunan tidak dibuat dan photo_url
+kembali ke file asli.
+"""
+
+import importlib.util
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, url_for
+from services.photo_storage import photo_path
+
+# Pillow diimpor di dalam worker agar tidak memperlambat startup aplikasi
+PILLOW_AVAILABLE = importlib.util.find_spec('PIL') is not None
+
+logger = logging.getLogger(__name__)
+
+# Ukuran turunan: nama -> (sisi terpanjang dalam px, potong persegi)
+SIZES = {
+    'thumb': (128, True),
+    'medium': (640, False),
+}
+
+_executor = None
+
+
+def derivative_name(name, size):
+    """
+    Nama relatif file turunan, contoh: 'ab/cd/<hash>.thumb.jpg'
+    """
+    return f"{name.rsplit('.', 1)[0]}.{size}.jpg"
+
+
+def source_name(name):
+    """
+    Awalan nama file asli (tanpa ekstensi) dari nama file turunan
+    Mengembalikan None jika `name` bukan file turunan
+    """
+    stem, _, extension = name.rpartition('.')
+    stem, _, size = stem.rpartition('.')
+    if stem and size in SIZES and extension == 'jpg':
+        return stem
+    return None
+
+
+def render_derivatives(source_path, targets):
+    """
+    Buat turunan untuk satu file asli (dijalankan di worker pool)
+    `targets` berisi {ukuran: path tujuan}; turunan yang sudah ada dilewati
+    """
+    if not PILLOW_AVAILABLE:
+        return []
+    from PIL import Image, ImageOps
+
+    created = []
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original).convert('RGB')
+        for size, target in targets.items():
+            pixels, square = SIZES[size]
+            if os.path.exists(target):
+                continue
+            if square:
+                rendition = ImageOps.fit(image, (pixels, pixels), Image.LANCZOS)
+            else:
+                rendition = image.copy()
+                rendition.thumbnail((pixels, pixels), Image.LANCZOS)
+            temp_path = f'{target}.tmp'
+            rendition.save(temp_path, 'JPEG', quality=85, optimize=True)
+            os.replace(temp_path, target)
+            created.append(target)
+    return created
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=current_app.config.get('PHOTO_DERIVATIVE_WORKERS', 2),
+            thread_name_prefix='photo-derivatives'
+        )
+    return _executor
+
+
+def _log_failure(future):
+    error = future.exception()
+    if error is not None:
+        logger.error('Gagal membuat turunan foto: %s', error)
+
+
+def schedule_derivatives(name):
+    """
+    Jadwalkan pembuatan turunan untuk foto yang baru disimpan
+    Dipanggil setelah commit agar request tidak menunggu proses resize
+    """
+    if not name or not PILLOW_AVAILABLE:
+        return None
+    targets = {size: photo_path(derivative_name(name, size)) for size in SIZES}
+    future = _get_executor().submit(render_derivatives, photo_path(name), targets)
+    future.add_done_callback(_log_failure)
+    return future
+
+
+def photo_url(name, size='thumb'):
+    """
+    URL foto untuk template; size: 'thumb', 'medium' atau 'original'
+    Jika turunan belum tersedia, URL file asli dikembalikan
+    """
+    if not name:
+        return None
+    if size != 'original':
+        derived = derivative_name(name, size)
+        if os.path.exists(photo_path(derived)):
+            name = derived
+    return url_for('main.photo', name=name)
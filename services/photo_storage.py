@@ -0,0 +1,162 @@
+"""
+Penyimpanan foto berbasis hash isi (content-addressed)
+File upload ditulis ke disk per potongan sambil di-hash (SHA-256), lalu disimpan
+sebagai <UPLOAD_FOLDER>/ab/cd/<hash>.<ext>. Foto yang identik hanya disimpan
+sekali. Karena satu file bisa dipakai beberapa klien, file lama tidak
+dihapus di dalam request; sweeper latar belakang menghapus file yang tidak lagi
+direferensikan database.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select
+from werkzeug.utils import secure_filename
+from models import db, Client
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+TEMP_DIR = '.tmp'
+
+# Nama file buatan save_photo: ab/cd/<sha256>[.<ukuran>].<ekstensi>
+SHARD_DIR = re.compile(r'[0-9a-f]{2}')
+STORED_NAME = re.compile(r'([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}(\.[a-z0-9]+)*')
+
+
+def _upload_folder():
+    return current_app.config['UPLOAD_FOLDER']
+
+
+def photo_path(name):
+    """
+    Path absolut file foto dari nilai kolom photo
+    """
+    return os.path.join(_upload_folder(), *name.split('/'))
+
+
+def _extension(filename):
+    filename = secure_filename(filename or '')
+    if '.' not in filename:
+        return ''
+    return filename.rsplit('.', 1)[1].lower()
+
+
+def save_photo(file_storage):
+    """
+    Simpan FileStorage secara streaming dan kembalikan nama relatifnya
+    Contoh hasil: '3f/a2/3fa2...9c.jpg'. Jika isi yang sama sudah ada, file baru tidak ditulis.
+    """
+    upload_folder = _upload_folder()
+    temp_dir = os.path.join(upload_folder, TEMP_DIR)
+    os.makedirs(temp_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            while True:
+                chunk = file_storage.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                temp_file.write(chunk)
+
+        content_hash = digest.hexdigest()
+        extension = _extension(file_storage.filename)
+        filename = f'{content_hash}.{extension}' if extension else content_hash
+        name = f'{content_hash[:2]}/{content_hash[2:4]}/{filename}'
+
+        target = photo_path(name)
+        if os.path.exists(target):
+            # Duplikat: perbarui mtime agar sweeper tidak menghapusnya sebelum commit
+            os.utime(target)
+            os.remove(temp_path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(temp_path, target)
+        return name
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def referenced_photos():
+    """
+    Semua nama foto yang masih direferensikan oleh klien
+    """
+    return set(db.session.execute(
+        select(Client.photo).where(Client.photo.isnot(None)).distinct()
+    ).scalars())
+
+
+def sweep_orphans(grace_seconds=3600, dry_run=False):
+    """
+    Hapus file di folder upload yang tidak direferensikan database
+    Hanya file buatan save_photo (ab/cd/<hash>...) yang diperiksa; file lain
+    seperti .gitkeep atau foto lama di luar direktori hash tidak disentuh.
+    File turunan (thumbnail/medium) ikut dipertahankan selama file aslinya dipakai.
+    File yang lebih muda dari `grace_seconds` dilewati karena mungkin milik
+    transaksi yang belum di-commit. Mengembalikan daftar nama yang dihapus.
+    """
+    from services.photo_derivatives import source_name
+
+    upload_folder = _upload_folder()
+    referenced = referenced_photos()
+    referenced_stems = {name.rsplit('.', 1)[0] for name in referenced}
+    cutoff = time.time() - grace_seconds
+    removed = []
+
+    for root, dirs, files in os.walk(upload_folder):
+        depth = 0 if root == upload_folder else os.path.relpath(root, upload_folder).count(os.sep) + 1
+        # Hanya turun ke direktori shard dua karakter hex (ab/cd)
+        dirs[:] = [directory for directory in dirs if depth < 2 and SHARD_DIR.fullmatch(directory)]
+        for filename in files:
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, upload_folder).replace(os.sep, '/')
+            if not STORED_NAME.fullmatch(name):
+                continue
+            if name in referenced or source_name(name) in referenced_stems:
+                continue
+            if os.path.getmtime(path) > cutoff:
+                continue
+            if not dry_run:
+                try:
+                    os.remove(path)
+                except OSError:
+                    logger.warning('Gagal menghapus foto yatim %s', name)
+                    continue
+            removed.append(name)
+    return removed
+
+
+def start_sweeper(app):
+    """
+    Jalankan sweep_orphans() secara berkala di thread latar belakang
+    Interval diatur lewat PHOTO_SWEEP_INTERVAL (detik, 0 = nonaktif)
+    """
+    interval = app.config.get('PHOTO_SWEEP_INTERVAL', 0)
+    if not interval:
+        return None
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                with app.app_context():
+                    removed = sweep_orphans(app.config.get('PHOTO_ORPHAN_GRACE_SECONDS', 3600))
+                    db.session.remove()
+                if removed:
+                    logger.info('%d foto yatim dihapus', len(removed))
+            except Exception:
+                logger.exception('Sweeper foto gagal')
+
+    thread = threading.Thread(target=run, name='photo-sweeper', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,194 @@
+"""
+Penyalinan workout plan beserta jadwal sesi dan detail sesinya
+Satu program (detail program, sesi, detail sesi) disalin ke satu atau banyak
+klien sekaligus dengan INSERT ... SELECT, opsional dengan pergeseran tanggal.
+Jumlah statement tetap kecil berapa pun jumlah klien dan sesi: satu INSERT
+multi-baris untuk semua program baru, lalu satu INSERT ... SELECT per tabel.
+
+Progres latihan tidak ikut disalin: sesi baru belum selesai, actual reps,
+catatan dan feedback kosong, sehingga rollup volume harian tidak berubah.
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import Table, MetaData, Column, Integer, select, insert, literal, false, true, func, text
+from models import db, WorkoutPlan, WorkoutPlanDetail, Session, SessionDetail
+from services.counters import increment, session_month_tally
+from services.page_versions import bump_client_versions
+from services.calendar_feed import bump_calendar_buckets
+
+# Tabel sementara (per koneksi) pemetaan sesi sumber -> sesi salinan
+clone_map = Table(
+    'session_clone_map', MetaData(),
+    Column('source_id', Integer, nullable=False),
+    Column('target_id', Integer, nullable=False),
+    prefixes=['TEMPORARY']
+)
+
+
+class CloneResult:
+    """
+    Hasil penyalinan: program baru per klien dan jumlah baris yang ditulis
+    """
+    def __init__(self, plans):
+        self.plans = plans              # [(client_id, plan_id baru)]
+        self.sessions = 0
+        self.session_details = 0
+        self.plan_details = 0
+
+
+def shifted_date(column, days):
+    """
+    Ekspresi SQL tanggal + N hari sesuai dialek database
+    """
+    if not days:
+        return column
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return func.date(column, f'{days:+d} days')
+    if dialect == 'mysql':
+        return func.date_add(column, text(f'INTERVAL {int(days)} DAY'))
+    return column + timedelta(days=days)
+
+
+def shift_for_start(source_plan, start_date):
+    """
+    Selisih hari agar salinan dimulai pada start_date
+    Jika program sumber tidak punya tanggal mulai, dipakai tanggal sesi pertamanya
+    """
+    if not start_date:
+        return 0
+    origin = source_plan.start_date or db.session.execute(
+        select(func.min(Session.date)).where(Session.workout_plan_id == source_plan.id)
+    ).scalar()
+    return (start_date - origin).days if origin else 0
+
+
+def _drop_clone_map(connection):
+    # DROP TABLE biasa di MySQL melakukan commit implisit, jadi TEMPORARY wajib
+    if connection.dialect.name == 'mysql':
+        connection.execute(text('DROP TEMPORARY TABLE IF EXISTS session_clone_map'))
+    else:
+        connection.execute(text('DROP TABLE IF EXISTS session_clone_map'))
+
+
+def clone_plan(source_plan, target_client_ids, shift_days=0, plan_name=None):
+    """
+    Salin program ke setiap klien tujuan; dipanggil di dalam transaksi, sebelum commit
+    Mengembalikan CloneResult
+    """
+    target_client_ids = list(dict.fromkeys(target_client_ids))
+    if not target_client_ids:
+        return CloneResult([])
+
+    # Tanpa mikrodetik agar sama persis dengan nilai DATETIME yang tersimpan di MySQL
+    now = datetime.utcnow().replace(microsecond=0)
+    plan_name = (plan_name or f'{source_plan.plan_name} (Copy)')[:100]
+    start_date = source_plan.start_date + timedelta(days=shift_days) if source_plan.start_date else None
+
+    # Satu INSERT multi-baris untuk semua program baru, lalu ID-nya dibaca dengan satu SELECT
+    # (portabel, tanpa RETURNING); jika ada kembaran di detik yang sama, dipakai ID terbesar
+    db.session.execute(insert(WorkoutPlan.__table__), [
+        {
+            'client_id': client_id,
+            'plan_name': plan_name,
+            'notes': source_plan.notes,
+            'duration': source_plan.duration,
+            'days_per_week': source_plan.days_per_week,
+            'start_date': start_date,
+            'created_at': now,
+        }
+        for client_id in target_client_ids
+    ])
+    plan_ids = dict(db.session.execute(
+        select(WorkoutPlan.client_id, func.max(WorkoutPlan.id))
+        .where(WorkoutPlan.client_id.in_(target_client_ids), WorkoutPlan.created_at == now,
+               WorkoutPlan.plan_name == plan_name)
+        .group_by(WorkoutPlan.client_id)
+    ).all())
+    plans = [(client_id, plan_ids[client_id]) for client_id in target_client_ids]
+    new_plan_ids = [plan_id for _, plan_id in plans]
+
+    clone = CloneResult(plans)
+    targets = (
+        select(WorkoutPlan.client_id, WorkoutPlan.id.label('plan_id'))
+        .where(WorkoutPlan.id.in_(new_plan_ids))
+        .subquery('targets')
+    )
+
+    clone.plan_details = db.session.execute(
+        insert(WorkoutPlanDetail.__table__).from_select(
+            ['plan_id', 'day_name', 'exercise_id', 'exercise', 'sets', 'reps', 'weight', 'rest_time', 'notes'],
+            select(
+                targets.c.plan_id, WorkoutPlanDetail.day_name, WorkoutPlanDetail.exercise_id,
+                WorkoutPlanDetail.exercise, WorkoutPlanDetail.sets, WorkoutPlanDetail.reps,
+                WorkoutPlanDetail.weight, WorkoutPlanDetail.rest_time, WorkoutPlanDetail.notes
+            )
+            .join(targets, true())
+            .where(WorkoutPlanDetail.plan_id == source_plan.id)
+            .order_by(targets.c.plan_id, WorkoutPlanDetail.id)
+        )
+    ).rowcount
+
+    # Sesi disisipkan urut (program, tanggal, id sumber); pergeseran tanggal sama untuk semua
+    # sesi, jadi urutan (tanggal, id) di program salinan sama dengan urutan di program sumber
+    clone.sessions = db.session.execute(
+        insert(Session.__table__).from_select(
+            ['client_id', 'date', 'workout_plan_id', 'completed', 'duration', 'session_type', 'notes', 'created_at'],
+            select(
+                targets.c.client_id, shifted_date(Session.date, shift_days), targets.c.plan_id, false(),
+                Session.duration, Session.session_type, literal(''), literal(now)
+            )
+            .join(targets, true())
+            .where(Session.workout_plan_id == source_plan.id)
+            .order_by(targets.c.plan_id, Session.date, Session.id)
+        )
+    ).rowcount
+
+    if clone.sessions:
+        # Pasangan sumber -> salinan: nomor urut (tanggal, id) yang sama di kedua sisi
+        source_sessions = (
+            select(Session.id, func.row_number().over(order_by=(Session.date, Session.id)).label('position'))
+            .where(Session.workout_plan_id == source_plan.id)
+            .subquery('source_sessions')
+        )
+        target_sessions = (
+            select(Session.id, func.row_number().over(
+                partition_by=Session.workout_plan_id, order_by=(Session.date, Session.id)
+            ).label('position'))
+            .where(Session.workout_plan_id.in_(new_plan_ids))
+            .subquery('target_sessions')
+        )
+
+        connection = db.session.connection()
+        _drop_clone_map(connection)
+        clone_map.create(connection)
+        try:
+            connection.execute(insert(clone_map).from_select(
+                ['source_id', 'target_id'],
+                select(source_sessions.c.id, target_sessions.c.id)
+                .join(target_sessions, target_sessions.c.position == source_sessions.c.position)
+            ))
+            clone.session_details = connection.execute(
+                insert(SessionDetail.__table__).from_select(
+                    ['session_id', 'exercise_id', 'exercise_name', 'sets', 'reps', 'weight',
+                     'weight_kg', 'weight_unit', 'weight_band', 'rest_time'],
+                    select(
+                        clone_map.c.target_id, SessionDetail.exercise_id, SessionDetail.exercise_name,
+                        SessionDetail.sets, SessionDetail.reps, SessionDetail.weight, SessionDetail.weight_kg,
+                        SessionDetail.weight_unit, SessionDetail.weight_band, SessionDetail.rest_time
+                    )
+                    .join(clone_map, clone_map.c.source_id == SessionDetail.session_id)
+                    .order_by(clone_map.c.target_id, SessionDetail.id)
+                )
+            ).rowcount
+        finally:
+            _drop_clone_map(connection)
+
+        tally = session_month_tally(Session.workout_plan_id.in_(new_plan_ids))
+        increment(tally)
+        # Kunci tally 'sessions:YYYY-MM' -> bulan kalender yang berisi sesi salinan
+        months = [name.split(':', 1)[1] for name in tally if name.startswith('sessions:')]
+        bump_calendar_buckets((client_id, month) for client_id in target_client_ids for month in months)
+
+    bump_client_versions(target_client_ids)
+    return clone
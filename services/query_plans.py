@@ -0,0 +1,85 @@
+"""
+Pemeriksaan rencana eksekusi (EXPLAIN) untuk query yang sering dipakai
+Memastikan setiap query per-klien memakai index, bukan full table scan.
+Jalankan terhadap database dengan volume data yang realistis, karena
+optimizer MySQL bisa memilih full scan untuk tabel yang hampir kosong.
+"""
+
+import re
+from datetime import date
+from sqlalchemy import select, desc, text
+from models import db, Client, Assessment, WorkoutPlan, Session, SessionDetail, PersonalRecord
+from services.session_navigation import neighbours_query
+from services.calendar_feed import calendar_query
+
+# Baris EXPLAIN QUERY PLAN SQLite untuk full scan: "SCAN sessions" / "SCAN TABLE sessions"
+# (scan atas subquery "anon_N" yang sudah difilter index bukan full scan tabel)
+SQLITE_FULL_SCAN = re.compile(r'^SCAN (TABLE )?(?!anon_)\w+( AS \w+)?$')
+
+
+def hot_queries(client_id=1, workout_plan_id=1, session_id=1):
+    """
+    Daftar (nama, statement) query yang dijalankan di hampir setiap halaman
+    """
+    today = date.today()
+    return [
+        ('sessions.index',
+         select(Session).where(Session.client_id == client_id).order_by(desc(Session.date))),
+        ('clients.view recent_sessions',
+         select(Session).where(Session.client_id == client_id).order_by(desc(Session.date)).limit(5)),
+        ('clients.view latest_assessment',
+         select(Assessment).where(Assessment.client_id == client_id).order_by(desc(Assessment.created_at)).limit(1)),
+        ('clients.view personal_records',
+         select(PersonalRecord).where(PersonalRecord.client_id == client_id).order_by(PersonalRecord.exercise_name)),
+        ('workout_plans.index',
+         select(WorkoutPlan).where(WorkoutPlan.client_id == client_id).order_by(desc(WorkoutPlan.created_at))),
+        ('workout_plans.view upcoming_sessions',
+         select(Session).where(Session.workout_plan_id == workout_plan_id, Session.date >= today).order_by(Session.date)),
+        ('workout_plans.view past_sessions',
+         select(Session).where(Session.workout_plan_id == workout_plan_id, Session.date < today).order_by(desc(Session.date))),
+        ('sessions.view details',
+         select(SessionDetail).where(SessionDetail.session_id == session_id)),
+        ('sessions.view neighbours',
+         neighbours_query(db.session.connection().dialect, client_id, today, session_id)),
+        ('sessions.calendar',
+         calendar_query(today.replace(day=1), today.replace(day=28), client_id)),
+        ('sessions.calendar_all',
+         calendar_query(today.replace(day=1), today.replace(day=28))),
+        ('sessions.today',
+         select(Session).where(Session.date == today)),
+        ('main.dashboard recent_clients',
+         select(Client).order_by(desc(Client.created_at)).limit(5)),
+        ('main.dashboard recent_sessions',
+         select(Session).order_by(desc(Session.created_at)).limit(5)),
+    ]
+
+
+def explain(statement):
+    """
+    Jalankan EXPLAIN untuk statement
+    Mengembalikan (full_scan, baris rencana dalam bentuk teks)
+    """
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+    if dialect.name == 'sqlite':
+        rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).all()
+        details = [row[3] for row in rows]
+        return any(SQLITE_FULL_SCAN.match(detail) for detail in details), details
+
+    rows = db.session.execute(text(f'EXPLAIN {sql}')).mappings().all()
+    details = [f"{row['table']}: type={row['type']} key={row['key']}" for row in rows]
+    # Tabel turunan (<derivedN>) berisi hasil subquery yang sudah difilter index
+    return any(row['type'] == 'ALL' and not str(row['table']).startswith('<derived') for row in rows), details
+
+
+def check_query_plans(**params):
+    """
+    EXPLAIN semua hot query
+    Mengembalikan list dict berisi nama query, status full scan dan rencana eksekusi
+    """
+    results = []
+    for name, statement in hot_queries(**params):
+        full_scan, plan = explain(statement)
+        results.append({'name': name, 'full_scan': full_scan, 'plan': plan})
+    return results
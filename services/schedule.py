@@ -0,0 +1,113 @@
+"""
+Mesin materialisasi jadwal sesi untuk workout plan
+Seluruh kalender tanggal sesi dihitung di awal, lalu semua Session dan
+SessionDetail ditulis dengan INSERT multi-baris tanpa flush per baris
+"""
+
+from datetime import timedelta
+from sqlalchemy import insert, select
+from models import db, Exercise, Session, SessionDetail
+from services.counters import count_sessions
+from services.calendar_feed import bump_calendar_buckets
+from services.weights import exercise_band_loads, normalized_columns
+
+# Map nama hari ke nomor hari (0 = Minggu, 1 = Senin, dst)
+DAY_NAME_TO_NUMBER = {
+    'Minggu': 0,
+    'Senin': 1,
+    'Selasa': 2,
+    'Rabu': 3,
+    'Kamis': 4,
+    'Jumat': 5,
+    'Sabtu': 6
+}
+
+
+def compute_session_dates(start_date, duration, days_per_week, selected_days):
+    """
+    Hitung semua tanggal sesi untuk program latihan
+    Menghasilkan duration * days_per_week tanggal, mulai dari start_date,
+    hanya pada hari-hari yang dipilih
+    """
+    if not (start_date and duration and days_per_week and selected_days):
+        return []
+
+    selected_day_numbers = {DAY_NAME_TO_NUMBER[day] for day in selected_days}
+
+    # Offset hari (0-6) dari start_date yang jatuh pada hari terpilih
+    offsets = []
+    for offset in range(7):
+        day_number = ((start_date + timedelta(days=offset)).weekday() + 1) % 7
+        if day_number in selected_day_numbers:
+            offsets.append(offset)
+
+    total_sessions = duration * days_per_week
+    per_week = len(offsets)
+    return [
+        start_date + timedelta(days=(index // per_week) * 7 + offsets[index % per_week])
+        for index in range(total_sessions)
+    ]
+
+
+def load_exercise_names(exercise_ids):
+    """
+    Ambil nama latihan untuk semua ID sekaligus dalam satu query
+    """
+    if not exercise_ids:
+        return {}
+    rows = db.session.execute(
+        select(Exercise.id, Exercise.name).where(Exercise.id.in_(set(exercise_ids)))
+    ).all()
+    return {exercise_id: name for exercise_id, name in rows}
+
+
+def materialize_sessions(workout_plan, session_dates, selected_exercises):
+    """
+    Tulis semua sesi dan detail latihannya untuk workout plan
+    Menggunakan empat statement: INSERT sesi, SELECT ID sesi, SELECT beban band, INSERT detail
+    Mengembalikan jumlah sesi yang dibuat
+    """
+    if not session_dates:
+        return 0
+
+    db.session.execute(insert(Session), [
+        {
+            'client_id': workout_plan.client_id,
+            'date': session_date,
+            'workout_plan_id': workout_plan.id,
+            'completed': False,
+            'notes': ''
+        }
+        for session_date in session_dates
+    ])
+    count_sessions(session_dates)
+    bump_calendar_buckets((workout_plan.client_id, session_date) for session_date in session_dates)
+
+    if selected_exercises:
+        # Semua sesi milik plan baru ini, jadi cukup satu SELECT untuk ID-nya
+        session_ids = db.session.scalars(
+            select(Session.id).where(Session.workout_plan_id == workout_plan.id)
+        ).all()
+
+        # Beban dinormalisasi sekali per latihan (weight sama di semua sesi)
+        loads_by_exercise = exercise_band_loads(exercise_data['exercise_id'] for exercise_data in selected_exercises)
+        weights = [
+            normalized_columns(exercise_data['weight'], exercise_data['exercise_id'], loads_by_exercise)
+            for exercise_data in selected_exercises
+        ]
+
+        db.session.execute(insert(SessionDetail), [
+            {
+                'session_id': session_id,
+                'exercise_id': exercise_data['exercise_id'],
+                'exercise_name': exercise_data['exercise_name'],
+                'sets': exercise_data['sets'],
+                'weight': exercise_data['weight'],
+                'reps': exercise_data['reps'],
+                **weight
+            }
+            for session_id in session_ids
+            for exercise_data, weight in zip(selected_exercises, weights)
+        ])
+
+    return len(session_dates)
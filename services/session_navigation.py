@@ -0,0 +1,74 @@
+"""
+Navigasi sesi sebelumnya/berikutnya untuk klien yang sama
+Urutan sesi adalah (tanggal, id), jadi sesi pada hari yang sama tetap bisa
+dinavigasi satu per satu. Tetangga diambil dalam satu query: LAG/LEAD jika
+database mendukung window function (MySQL 8+, MariaDB 10.2+, SQLite 3.25+),
+atau dua subquery skalar berbasis index (client_id, date, id) jika tidak.
+"""
+
+from sqlalchemy import select, func, and_, or_
+from models import db, Session
+
+
+def supports_window_functions(dialect):
+    """
+    Cek dukungan LAG/LEAD berdasarkan versi server database
+    """
+    if dialect.name == 'sqlite':
+        return dialect.dbapi.sqlite_version_info >= (3, 25)
+    # Versi server baru terisi setelah koneksi pertama
+    version = dialect.server_version_info or ()
+    if dialect.name == 'mysql':
+        return version >= ((10, 2) if getattr(dialect, 'is_mariadb', False) else (8, 0))
+    return True
+
+
+def window_query(client_id, session_date, session_id):
+    """
+    LAG/LEAD atas sesi klien, diurutkan (tanggal, id)
+    """
+    ordering = (Session.date, Session.id)
+    ranked = (
+        select(
+            Session.id,
+            func.lag(Session.id).over(order_by=ordering).label('prev_id'),
+            func.lead(Session.id).over(order_by=ordering).label('next_id')
+        )
+        .where(Session.client_id == client_id)
+        .subquery()
+    )
+    return select(ranked.c.prev_id, ranked.c.next_id).where(ranked.c.id == session_id)
+
+
+def keyset_query(client_id, session_date, session_id):
+    """
+    Fallback tanpa window function: dua subquery skalar ORDER BY ... LIMIT 1
+    """
+    before = or_(Session.date < session_date, and_(Session.date == session_date, Session.id < session_id))
+    after = or_(Session.date > session_date, and_(Session.date == session_date, Session.id > session_id))
+    prev_id = (
+        select(Session.id).where(Session.client_id == client_id, before)
+        .order_by(Session.date.desc(), Session.id.desc()).limit(1)
+    )
+    next_id = (
+        select(Session.id).where(Session.client_id == client_id, after)
+        .order_by(Session.date, Session.id).limit(1)
+    )
+    return select(prev_id.scalar_subquery().label('prev_id'), next_id.scalar_subquery().label('next_id'))
+
+
+def neighbours_query(dialect, client_id, session_date, session_id):
+    """
+    Pilih query tetangga sesuai kemampuan database
+    """
+    build = window_query if supports_window_functions(dialect) else keyset_query
+    return build(client_id, session_date, session_id)
+
+
+def session_neighbours(session):
+    """
+    Ambil (id sesi sebelumnya, id sesi berikutnya) untuk klien yang sama; None jika tidak ada
+    """
+    query = neighbours_query(db.session.get_bind().dialect, session.client_id, session.date, session.id)
+    row = db.session.execute(query).first()
+    return (row.prev_id, row.next_id) if row else (None, None)
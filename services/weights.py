@@ -0,0 +1,214 @@
+"""
+Normalisasi beban SessionDetail.weight ke kolom numerik
+String bebas seperti "40", "12.5 kg", "25 lb" atau warna band "UNGU" diubah
+menjadi weight_kg (Numeric, selalu dalam kg), weight_unit (kg / lb / band /
+bodyweight) dan weight_band (warna band). Dengan kolom ini volume dan tonase
+bisa dihitung langsung di SQL (SUM(weight_kg * reps)) tanpa memuat baris ke Python.
+
+Beban band diatur per latihan lewat Exercise.weight_options dengan format
+"WARNA=beban", contoh: ["KUNING=5", "MERAH=10", "UNGU=25"]. Band tanpa beban
+("UNGU") tetap tercatat sebagai band dengan weight_kg kosong. Teks yang bukan
+angka dan bukan label weight_options latihannya dibiarkan tidak dinormalisasi.
+"""
+
+import re
+from collections import namedtuple
+from decimal import Decimal
+from sqlalchemy import select, update, bindparam, func
+from models import db, Exercise, Session, SessionDetail
+from services.page_versions import bump_client_versions
+
+LB_TO_KG = Decimal('0.45359237')
+
+# Pemisah label band dan bebannya di weight_options, contoh: "UNGU=25" atau "UNGU: 25 kg"
+BAND_LOAD_SEPARATOR = re.compile(r'\s*[=:]\s*')
+
+# Angka dengan satuan opsional, contoh: "40", "12,5kg", "25 lbs"
+WEIGHT_VALUE = re.compile(r'(\d+(?:[.,]\d+)?)\s*(kg|kgs|kilo|lb|lbs|pound|pounds)?\b', re.IGNORECASE)
+
+BODYWEIGHT_LABELS = {'BW', 'BODYWEIGHT', 'BODY WEIGHT', 'BERAT BADAN'}
+
+# Opsi satuan di weight_options ("kg", "lb") bukan label band
+UNIT_LABELS = {'KG', 'KGS', 'KILO', 'LB', 'LBS', 'POUND', 'POUNDS'}
+
+# Jumlah detail per transaksi saat backfill
+BACKFILL_BATCH = 1000
+
+NormalizedWeight = namedtuple('NormalizedWeight', ['weight_kg', 'weight_unit', 'weight_band'])
+
+EMPTY = NormalizedWeight(None, None, None)
+
+
+def _to_kg(number, unit):
+    value = Decimal(number.replace(',', '.'))
+    if unit and unit.lower().startswith(('lb', 'pound')):
+        return (value * LB_TO_KG).quantize(Decimal('0.01')), 'lb'
+    return value, 'kg'
+
+
+def _options_list(weight_options):
+    """
+    weight_options bisa berupa list JSON atau string dipisah koma (data lama)
+    """
+    if not weight_options:
+        return []
+    if isinstance(weight_options, str):
+        return [option.strip() for option in weight_options.split(',')]
+    return [str(option).strip() for option in weight_options]
+
+
+def _label(text):
+    return ' '.join(text.upper().split())
+
+
+def band_loads(weight_options):
+    """
+    Peta warna band -> beban kg dari Exercise.weight_options
+    Semua opsi non-angka adalah label band; bebannya None jika tidak ditulis "WARNA=beban"
+    """
+    loads = {}
+    for option in _options_list(weight_options):
+        if not option or option[0].isdigit():
+            continue
+        parts = BAND_LOAD_SEPARATOR.split(option, maxsplit=1)
+        label = _label(parts[0])
+        if not label or label in BODYWEIGHT_LABELS or label in UNIT_LABELS:
+            continue
+        match = WEIGHT_VALUE.search(parts[1]) if len(parts) == 2 else None
+        loads[label] = _to_kg(match.group(1), match.group(2))[0] if match else loads.get(label)
+    return loads
+
+
+def normalize_weight(weight, loads=None):
+    """
+    Ubah string weight menjadi NormalizedWeight(weight_kg, weight_unit, weight_band)
+    loads = peta beban band latihan tersebut (lihat band_loads); teks lain yang
+    bukan label di dalamnya menghasilkan EMPTY
+    """
+    text = str(weight).strip() if weight is not None else ''
+    if not text:
+        return EMPTY
+
+    # Nilai opsi lengkap "UNGU=25" tersimpan apa adanya
+    parts = BAND_LOAD_SEPARATOR.split(text, maxsplit=1)
+    if len(parts) == 2 and parts[0] and not parts[0][0].isdigit():
+        label = _label(parts[0])
+        return NormalizedWeight(band_loads([text]).get(label), 'band', label[:30])
+
+    match = WEIGHT_VALUE.search(text)
+    if match:
+        return NormalizedWeight(*_to_kg(match.group(1), match.group(2)), None)
+
+    label = _label(text)
+    if label in BODYWEIGHT_LABELS:
+        return NormalizedWeight(None, 'bodyweight', None)
+    if loads and label in loads:
+        return NormalizedWeight(loads[label], 'band', label[:30])
+    return EMPTY
+
+
+def exercise_band_loads(exercise_ids=None):
+    """
+    Peta {exercise_id: {warna: kg atau None}} dalam satu query (None = semua latihan)
+    """
+    statement = select(Exercise.id, Exercise.weight_options)
+    if exercise_ids is not None:
+        exercise_ids = {exercise_id for exercise_id in exercise_ids if exercise_id}
+        if not exercise_ids:
+            return {}
+        statement = statement.where(Exercise.id.in_(exercise_ids))
+    return {exercise_id: band_loads(options) for exercise_id, options in db.session.execute(statement)}
+
+
+def normalized_columns(weight, exercise_id, loads_by_exercise):
+    """
+    Kolom weight_kg/weight_unit/weight_band untuk satu baris SessionDetail
+    """
+    return normalize_weight(weight, loads_by_exercise.get(exercise_id))._asdict()
+
+
+def backfill_weights(batch_size=BACKFILL_BATCH, exercise_id=None, all_rows=False, on_batch=None):
+    """
+    Isi kolom beban ternormalisasi per batch (keyset pada id, satu commit per batch)
+    Default hanya baris yang belum dinormalisasi; all_rows=True menghitung ulang semua.
+    UPDATE Core tidak lewat listener ORM, jadi versi halaman klien dinaikkan per batch.
+    Mengembalikan jumlah baris yang diperbarui
+    """
+    loads_by_exercise = exercise_band_loads([exercise_id] if exercise_id else None)
+    table = SessionDetail.__table__
+    filters = [SessionDetail.weight.isnot(None)]
+    if exercise_id:
+        filters.append(SessionDetail.exercise_id == exercise_id)
+    if not all_rows:
+        filters.append(SessionDetail.weight_unit.is_(None))
+
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(SessionDetail.id, SessionDetail.exercise_id, SessionDetail.weight, Session.client_id)
+            .join(Session, Session.id == SessionDetail.session_id)
+            .where(SessionDetail.id > last_id, *filters)
+            .order_by(SessionDetail.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        params = [
+            {'detail_id': row.id, **normalized_columns(row.weight, row.exercise_id, loads_by_exercise)}
+            for row in rows
+        ]
+        db.session.execute(
+            update(table).where(table.c.id == bindparam('detail_id')),
+            params
+        )
+        bump_client_versions(row.client_id for row in rows)
+        db.session.commit()
+        updated += len(rows)
+        if on_batch:
+            on_batch(updated)
+    return updated
+
+
+def apply_band_loads(exercise_id, weight_options):
+    """
+    Terapkan label dan beban band baru ke detail sesi latihan ini
+    Baris band dan baris belum ternormalisasi yang teksnya kini label band dinormalisasi
+    ulang; satu UPDATE per hasil normalisasi. Dipanggil di dalam transaksi edit latihan;
+    mengembalikan pasangan (client_id, tanggal) dan (client_id, nama latihan) yang
+    terdampak untuk rollup dan personal record
+    """
+    loads = band_loads(weight_options)
+    candidates = SessionDetail.weight_unit == 'band'
+    if loads:
+        candidates = candidates | (
+            SessionDetail.weight_unit.is_(None) & func.upper(func.trim(SessionDetail.weight)).in_(list(loads))
+        )
+    rows = db.session.execute(
+        select(SessionDetail.id, SessionDetail.weight, SessionDetail.weight_kg, SessionDetail.weight_unit,
+               SessionDetail.weight_band, Session.client_id, Session.date, SessionDetail.exercise_name)
+        .join(Session, Session.id == SessionDetail.session_id)
+        .where(SessionDetail.exercise_id == exercise_id, candidates)
+    ).all()
+
+    changed = {}
+    affected = set()
+    for row in rows:
+        normalized = normalize_weight(row.weight, loads)
+        if normalized != (row.weight_kg, row.weight_unit, row.weight_band):
+            changed.setdefault(normalized, []).append(row.id)
+            affected.add((row.client_id, row.date, row.exercise_name))
+
+    table = SessionDetail.__table__
+    for normalized, detail_ids in changed.items():
+        for start in range(0, len(detail_ids), BACKFILL_BATCH):
+            db.session.execute(
+                update(table).where(table.c.id.in_(detail_ids[start:start + BACKFILL_BATCH]))
+                .values(**normalized._asdict())
+            )
+    return (
+        {(client_id, day) for client_id, day, _ in affected},
+        {(client_id, name) for client_id, _, name in affected},
+    )
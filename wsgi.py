@@ -0,0 +1,14 @@
+"""
+Entry point WSGI untuk Gunicorn: gunicorn wsgi:app
+Aplikasi dibuat di sini, bukan saat app.py diimport, sehingga perintah CLI,
+benchmark dan skrip yang mengimport app tidak membangun aplikasi tambahan.
+Sweeper foto hanya berjalan jika PHOTO_SWEEP_INTERVAL > 0 (satu per worker).
+"""
+
+from app import create_app
+from services.photo_storage import start_sweeper
+
+app = create_app()
+
+# Thread latar belakang hanya untuk proses server, tidak untuk CLI
+start_sweeper(app)